@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 from PyQt5 import QtWidgets, QtCore, QtGui
 from datetime import datetime
-from opentoolcontroller.strings import defaults
-import csv
-from pathlib import Path
+import sys
+from opentoolcontroller.strings import defaults, alr
+from opentoolcontroller.log_writer import LogWriter
+from opentoolcontroller.log_store import LogStore
+from opentoolcontroller.log_query import LogQuery, LogPager, parseLogTime, formatLogTime
 
 
 class AlertView(QtWidgets.QMainWindow):
@@ -14,14 +16,14 @@ class AlertView(QtWidgets.QMainWindow):
         self._allow_clear = False
 
         #For the filter
-        self._proxy_model = QtCore.QSortFilterProxyModel()
-        self._proxy_model.setFilterKeyColumn(-1)
+        self._proxy_model = LogFilterProxyModel()
         self._proxy_model.setSourceModel(self._alert_model)
+        self._proxy_model.setSortRole(QtCore.Qt.UserRole)
         self._proxy_model.sort(1, QtCore.Qt.DescendingOrder)
 
 
         self._alert_search_bar = QtWidgets.QLineEdit()
-        self._alert_search_bar.textChanged.connect(self._proxy_model.setFilterFixedString)
+        self._alert_search_bar.textChanged.connect(self._proxy_model.setSearchText)
 
         self._table = QtWidgets.QTableView()
         self._table.setModel(self._proxy_model)
@@ -39,10 +41,20 @@ class AlertView(QtWidgets.QMainWindow):
         grid.addWidget(self._alert_search_bar, 0, 0, 1, 5)
         grid.addWidget(self._table, 1, 0, 1, 5)
 
+        self._load_older_btn = QtWidgets.QPushButton('Load Older')
+        self._load_older_btn.clicked.connect(self._alert_model.loadOlder)
+        grid.addWidget(self._load_older_btn, 2, 0)
+
+        self._history_btn = QtWidgets.QPushButton('History')
+        self._history_btn.clicked.connect(self.showHistory)
+        grid.addWidget(self._history_btn, 2, 1)
+
         self._clear_btn = QtWidgets.QPushButton('Clear All')
         self._clear_btn.clicked.connect(self.clearAlerts)
         grid.addWidget(self._clear_btn, 2, 4)
 
+        self._history_view = None
+
 
         self.enableClearAlerts(False)
 
@@ -51,6 +63,13 @@ class AlertView(QtWidgets.QMainWindow):
     def clearAlerts(self):
         self._alert_model.clearAlerts()
 
+    def showHistory(self):
+        if self._history_view is None:
+            self._history_view = AlertHistoryView(self._alert_model)
+            self._history_view.setWindowTitle('Alert History')
+        self._history_view.show()
+        self._history_view.raise_()
+
     def enableClearAlerts(self, enable):
         if enable:
             self._clear_btn.setEnabled(True)
@@ -59,32 +78,129 @@ class AlertView(QtWidgets.QMainWindow):
         
 
 
+class LogFilterProxyModel(QtCore.QSortFilterProxyModel):
+    '''Filters the alert and action logs through the source model's LogStore indexes
+        - The matching ids are found once per search instead of checking every cell of every row
+        - Rows added or paged in after the search are outside the searched id range and checked directly
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self._search_text = ''
+        self._column_values = {}
+        self._accepted_ids = None #None accepts every row
+        self._first_searched_id = 0
+        self._next_searched_id = 0
+
+    def setSearchText(self, text):
+        self._search_text = str(text)
+        self.updateAcceptedIds()
+
+    #A value of None removes the filter for that column, the column must be indexed by the store
+    def setColumnFilter(self, column, value):
+        if value is None:
+            self._column_values.pop(column, None)
+        else:
+            self._column_values[column] = value
+        self.updateAcceptedIds()
+
+    def updateAcceptedIds(self):
+        store = self.sourceModel().store()
+        ids = None
+
+        if self._search_text:
+            ids = store.matchingIds(self._search_text)
+
+        for column, value in self._column_values.items():
+            column_ids = store.ids(column, value)
+            ids = column_ids if ids is None else ids & column_ids
+
+        self._accepted_ids = ids
+        self._first_searched_id = store.firstId()
+        self._next_searched_id = store.nextId()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, row_num, source_parent):
+        if self._accepted_ids is None:
+            return True
+
+        store = self.sourceModel().store()
+        row_id = store.rowId(row_num)
+
+        if self._first_searched_id <= row_id < self._next_searched_id:
+            return row_id in self._accepted_ids
+
+        return store.matches(row_id, self._search_text, self._column_values)
+
+
 #TODO change out some of the constanst for string named
 
 class AlertTableModel(QtCore.QAbstractTableModel):
-    def __init__(self):
+    '''Alerts raised by the behaviors, newest rows are appended to the LogStore
+        - An alert matching the type, system, device and text of one seen within ALERT_REPEAT_WINDOW_S
+          is counted on the existing row instead of adding a new one, a behavior looping on an alert
+          would otherwise add a row and a log line every tick
+        - Repeats are written to the log as a single line at most once per ALERT_LOG_INTERVAL_S
+        - Times are stored as timestamps and the type as its alr int, they're only formatted in data()
+          and the UserRole gives the raw value for sorting
+    '''
+
+    def __init__(self, retention=defaults.LOG_RETENTION):
         super().__init__()
-        self._data = []
         self._horizontal_header_labels = ['Type','Time', 'System', 'Device', 'Alert']
 
-        self._log_file = Path(defaults.TOOL_DIR + '/logs/alerts_' + datetime.today().strftime('%Y_%m') + '.csv')
-        if not self._log_file.is_file():
-            self.logToFile(self._horizontal_header_labels)
+        #Rows are [type, time, system, device, alert, user_clear, is_cleared, count, last_seen]
+        #type/system/device are indexed, system and device strings are interned since they repeat
+        self._store = LogStore(retention, [0, 2, 3], range(5), self.cellText)
+        self._log_writer = LogWriter(defaults.TOOL_DIR + '/logs', 'alerts', self._horizontal_header_labels)
+        self._log_writer.setDroppedCallback(self.logDropped)
+
+        self._repeats = {} #(type, system, device, alert): [alert_id, last_seen, last_logged, repeats_not_logged]
+
+        self._log_query = LogQuery(defaults.TOOL_DIR + '/logs', 'alerts', self._horizontal_header_labels, [0, 2, 3], 1)
+        self._log_pager = LogPager(self._log_query)
+
+    def store(self):
+        return self._store
+
+    #Text the search matches against, the time is the first time the alert was seen
+    def cellText(self, row, column):
+        if   column == 0: return alr.name(row[0])
+        elif column == 1: return formatLogTime(row[1])
+        return row[column]
+
+    #The line written to the log when the alert is first seen
+    def loggedRow(self, row):
+        return [self.cellText(row, column) for column in range(5)]
 
     def data(self, index, role):
         if role == QtCore.Qt.DisplayRole:
-            return self._data[index.row()][index.column()]
+            row = self._store.row(index.row())
+            if   index.column() == 0: return alr.name(row[0])
+            elif index.column() == 1: return formatLogTime(row[8])
+            elif index.column() == 4 and row[7] > 1: return row[4] + ' (x%d)' % row[7]
+            return row[index.column()]
+
+        elif role == QtCore.Qt.UserRole:
+            row = self._store.row(index.row())
+            if index.column() == 1: return row[8]
+            return row[index.column()]
+
+        elif role == QtCore.Qt.ToolTipRole:
+            row = self._store.row(index.row())
+            if row[7] > 1:
+                return 'First seen ' + formatLogTime(row[1])
 
         elif role == QtCore.Qt.FontRole:
             font = QtGui.QFont()
-            if self._data[index.row()][6] == True:
+            if self._store.row(index.row())[6] == True:
                 font.setWeight(QtGui.QFont.Light)
             else:
                 font.setWeight(QtGui.QFont.ExtraBold)
             return font
 
     def rowCount(self, index=QtCore.QModelIndex()):
-        return  0 if index.isValid() else len(self._data)
+        return  0 if index.isValid() else self._store.rowCount()
 
     def columnCount(self, index=QtCore.QModelIndex()):
         return 5
@@ -98,59 +214,283 @@ class AlertTableModel(QtCore.QAbstractTableModel):
 
 
     def addAlert(self, alert_type=None, system=None, device=None, alert=None, user_clear=True):
-        current_time = datetime.now().strftime("%m/%d/%Y, %H:%M:%S")
+        now = datetime.now().timestamp()
+
+        if alert_type not in [alr.MESSAGE, alr.WARNING, alr.ALARM]:
+            alert_type = None
 
-        alert_text = ''
-        if alert_type == 0:
-            alert_text = 'Message'
-        elif alert_type == 1:
-            alert_text = 'Warning'
-        elif alert_type == 2:
-            alert_text = 'Alarm'
+        system = sys.intern(str(system))
+        device = sys.intern(str(device))
+
+        key = (alert_type, system, device, str(alert))
+        repeat = self._repeats.get(key)
+
+        if repeat is not None:
+            row = self._store.position(repeat[0])
+            if row is not None and now - repeat[1] <= defaults.ALERT_REPEAT_WINDOW_S:
+                self.repeatAlert(key, row, now, user_clear)
+                return self.alertCallbacks(repeat[0])
+
+            self.logRepeats(key)
 
         is_cleared = False
 
-        new_row = [alert_text, current_time, str(system), str(device), str(alert), bool(user_clear), bool(is_cleared)]
+        new_row = [alert_type, now, system, device, str(alert), bool(user_clear), bool(is_cleared), 1, now]
 
         #insert at end, soring done by proxy view
         row_count = self.rowCount(QtCore.QModelIndex())
         self.beginInsertRows(QtCore.QModelIndex(), row_count, row_count)
-        self._data.append(new_row)
+        alert_id = self._store.append(new_row)
         self.endInsertRows()
 
-        self.logToFile([str(alert_text), str(current_time), str(system), str(device), str(alert)])
+        self._repeats[key] = [alert_id, now, now, 0]
+        self.trimRows()
 
-        clear_alarm_callback = lambda y=row_count: self.clearAlertByRow(y)
-        set_user_clearable = lambda y=row_count: self.setUserClearByRow(y)
+        self.logToFile(self.loggedRow(new_row))
+
+        return self.alertCallbacks(alert_id)
+
+    #By id since the rows move as old alerts are dropped
+    def alertCallbacks(self, alert_id):
+        clear_alarm_callback = lambda y=alert_id: self.clearAlert(y)
+        set_user_clearable = lambda y=alert_id: self.setUserClear(y)
 
         return clear_alarm_callback, set_user_clearable
+
+    #The alert is raised again so it's shown as not cleared even if it was
+    def repeatAlert(self, key, row, now, user_clear):
+        repeat = self._repeats[key]
+        repeat[1] = now
+        repeat[3] += 1
+
+        store_row = self._store.row(row)
+        store_row[5] = bool(user_clear)
+        store_row[6] = False
+        store_row[7] += 1
+        store_row[8] = now
+
+        if now - repeat[2] >= defaults.ALERT_LOG_INTERVAL_S:
+            self.logRepeats(key)
+
+        index_1 = self.index(row, 0)
+        index_2 = self.index(row, self.columnCount()-1)
+        self.dataChanged.emit(index_1, index_2, [QtCore.Qt.DisplayRole, QtCore.Qt.FontRole])
+
+    #Writes a single line for the repeats that haven't been logged yet
+    def logRepeats(self, key):
+        repeat = self._repeats[key]
+        if repeat[3] > 0:
+            alert_type, system, device, alert = key
+            self.logToFile([alr.name(alert_type), formatLogTime(repeat[1]), system, device, alert + ' (repeated %d times)' % repeat[3]])
+            repeat[3] = 0
+
+        repeat[2] = datetime.now().timestamp()
+
+    #The oldest live rows go first, rows paged in by the user are kept
+    def trimRows(self):
+        count = self._store.overflow()
+        if count > 0:
+            first = self._store.pagedCount()
+            self.beginRemoveRows(QtCore.QModelIndex(), first, first+count-1)
+            self._store.trim(count)
+            self.endRemoveRows()
+
+            for key in [key for key, repeat in self._repeats.items() if self._store.position(repeat[0]) is None]:
+                self.logRepeats(key)
+                del self._repeats[key]
+
+    #Pages older alerts in from the csv logs through the log index, they're shown as cleared
+    def loadOlder(self, count=defaults.LOG_PAGE_SIZE):
+        self._log_writer.flush()
+        store = self._store
+        held_rows = (self.loggedRow(store.row(i)) for i in range(store.pagedCount(), store.rowCount()))
+
+        rows = []
+        for row in reversed(self._log_pager.page(count, held_rows)):
+            try:
+                logged_time = parseLogTime(row[1]).timestamp()
+            except (IndexError, ValueError):
+                continue
+            rows.append([alr.alertType(row[0]), logged_time, sys.intern(row[2]), sys.intern(row[3]), row[4],
+                         True, True, 1, logged_time])
+
+        if rows:
+            self.beginInsertRows(QtCore.QModelIndex(), 0, len(rows)-1)
+            self._store.prepend(rows)
+            self.endInsertRows()
+            self.trimPagedRows()
+
+        return len(rows)
+
+    #Past the limit the newest paged rows go, they're the ones furthest from where the user is paging
+    def trimPagedRows(self):
+        count = self._store.pagedOverflow()
+        if count > 0:
+            last = self._store.pagedCount() - 1
+            self.beginRemoveRows(QtCore.QModelIndex(), last-count+1, last)
+            self._store.trimPaged(count)
+            self.endRemoveRows()
     
 
+    #Written by a background thread, see LogWriter
     def logToFile(self, row):
-        with open(str(self._log_file), 'a') as f:
-            csv_writer = csv.writer(f)
-            csv_writer.writerow(row)
+        self._log_writer.write(row)
+
+    #Logged alerts between the start and end datetimes newest first, see LogQuery
+    def queryLog(self, start=None, end=None, column_values={}):
+        self._log_writer.flush()
+        return self._log_query.query(start, end, column_values)
 
+    def headerLabels(self):
+        return self._horizontal_header_labels
 
-    def clearAlertByRow(self, row):
-        self._data[row][6] = True
+    #Raised when a LogWriter's queue is full, the rows it drops are never written
+    def logDropped(self, prefix, dropped_rows):
+        self.addAlert(alr.WARNING, 'Logs', prefix, 'Dropped %d log rows, the disk is not keeping up' % dropped_rows)
+
+    def closeLog(self):
+        for key in self._repeats:
+            self.logRepeats(key)
+        self._log_writer.close()
+
+
+    def clearAlert(self, alert_id):
+        row = self._store.position(alert_id)
+        if row is None:
+            return
+
+        self._store.row(row)[6] = True
         index_1 = self.index(row, 0)
         index_2 = self.index(row, self.columnCount()-1)
         self.dataChanged.emit(index_1, index_2, [QtCore.Qt.FontRole])
 
-    def setUserClearByRow(self, row):
-        self._data[row][5] = True
+    def setUserClear(self, alert_id):
+        row = self._store.position(alert_id)
+        if row is not None:
+            self._store.row(row)[5] = True
 
     def clearAlerts(self):
-        for i, row in enumerate(self._data):
+        for row in self._store.rows():
             if row[5]:
-                self._data[i][6] = True
+                row[6] = True
 
         index_1 = self.index(0, 0)
         index_2 = self.index(self.rowCount()-1, self.columnCount()-1)
         self.dataChanged.emit(index_1, index_2, [QtCore.Qt.FontRole])
 
-        
+
+
+class AlertHistoryView(QtWidgets.QMainWindow):
+    '''Browses the logged alerts between two dates, optionally for one type, system or device'''
+
+    def __init__(self, alert_model):
+        super().__init__()
+        self._alert_model = alert_model
+        self._query_model = LogQueryTableModel(alert_model.headerLabels())
+
+        today = QtCore.QDate.currentDate()
+        self._start_edit = QtWidgets.QDateEdit(today.addDays(-90))
+        self._start_edit.setCalendarPopup(True)
+        self._end_edit = QtWidgets.QDateEdit(today)
+        self._end_edit.setCalendarPopup(True)
+
+        self._type_box = QtWidgets.QComboBox()
+        self._type_box.addItems(['', 'Message', 'Warning', 'Alarm'])
+        self._system_edit = QtWidgets.QLineEdit()
+        self._system_edit.setPlaceholderText('System')
+        self._device_edit = QtWidgets.QLineEdit()
+        self._device_edit.setPlaceholderText('Device')
+
+        self._search_btn = QtWidgets.QPushButton('Search')
+        self._search_btn.clicked.connect(self.search)
+        self._count_label = QtWidgets.QLabel()
+
+        self._table = QtWidgets.QTableView()
+        self._table.setModel(self._query_model)
+        self._table.horizontalHeader().setStretchLastSection(True)
+        self._table.setColumnWidth(0, 70)
+        self._table.setColumnWidth(1, 170)
+        self._table.setColumnWidth(2, 100)
+        self._table.setColumnWidth(3, 100)
+
+        grid = QtWidgets.QGridLayout()
+        wid = QtWidgets.QWidget(self)
+        wid.setLayout(grid)
+        self.setCentralWidget(wid)
+
+        grid.addWidget(self._start_edit, 0, 0)
+        grid.addWidget(self._end_edit, 0, 1)
+        grid.addWidget(self._type_box, 0, 2)
+        grid.addWidget(self._system_edit, 0, 3)
+        grid.addWidget(self._device_edit, 0, 4)
+        grid.addWidget(self._search_btn, 0, 5)
+        grid.addWidget(self._table, 1, 0, 1, 6)
+        grid.addWidget(self._count_label, 2, 0, 1, 6)
+
+    def search(self):
+        start = datetime.combine(self._start_edit.date().toPyDate(), datetime.min.time())
+        end = datetime.combine(self._end_edit.date().toPyDate(), datetime.max.time())
+
+        column_values = {}
+        if self._type_box.currentText():
+            column_values[0] = self._type_box.currentText()
+        if self._system_edit.text():
+            column_values[2] = self._system_edit.text()
+        if self._device_edit.text():
+            column_values[3] = self._device_edit.text()
+
+        result = self._alert_model.queryLog(start, end, column_values)
+        self._query_model.setResult(result)
+        self._count_label.setText(str(len(result)) + ' alerts')
+
+
+class LogQueryTableModel(QtCore.QAbstractTableModel):
+    '''Shows a LogQueryResult, rows are read from the logs a page at a time as the view scrolls'''
+
+    def __init__(self, header_labels):
+        super().__init__()
+        self._horizontal_header_labels = header_labels
+        self._result = None
+        self._rows = []
+
+    def setResult(self, result):
+        self.beginResetModel()
+        self._result = result
+        self._rows = []
+        self.endResetModel()
+
+    def data(self, index, role):
+        if role == QtCore.Qt.DisplayRole:
+            row = self._rows[index.row()]
+            if index.column() < len(row):
+                return row[index.column()]
+
+    def rowCount(self, index=QtCore.QModelIndex()):
+        return  0 if index.isValid() else len(self._rows)
+
+    def columnCount(self, index=QtCore.QModelIndex()):
+        return len(self._horizontal_header_labels)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self._horizontal_header_labels[section]
+
+    def canFetchMore(self, index):
+        if index.isValid() or self._result is None:
+            return False
+        return len(self._rows) < len(self._result)
+
+    def fetchMore(self, index):
+        if index.isValid() or self._result is None:
+            return
+
+        rows = self._result.rows(len(self._rows), defaults.LOG_PAGE_SIZE)
+        if rows:
+            self.beginInsertRows(QtCore.QModelIndex(), len(self._rows), len(self._rows) + len(rows) - 1)
+            self._rows += rows
+            self.endInsertRows()
+
+
 class ActionLogView(QtWidgets.QMainWindow):
     def __init__(self, action_log_model):
         super().__init__()
@@ -159,14 +499,14 @@ class ActionLogView(QtWidgets.QMainWindow):
         self._allow_clear = False
 
         #For the filter
-        self._proxy_model = QtCore.QSortFilterProxyModel()
-        self._proxy_model.setFilterKeyColumn(-1)
+        self._proxy_model = LogFilterProxyModel()
         self._proxy_model.setSourceModel(self._model)
+        self._proxy_model.setSortRole(QtCore.Qt.UserRole)
         self._proxy_model.sort(0, QtCore.Qt.DescendingOrder)
 
 
         self._alert_search_bar = QtWidgets.QLineEdit()
-        self._alert_search_bar.textChanged.connect(self._proxy_model.setFilterFixedString)
+        self._alert_search_bar.textChanged.connect(self._proxy_model.setSearchText)
 
         self._table = QtWidgets.QTableView()
         self._table.setModel(self._proxy_model)
@@ -182,19 +522,25 @@ class ActionLogView(QtWidgets.QMainWindow):
         grid.addWidget(self._alert_search_bar, 0, 0, 1, 3)
         grid.addWidget(self._table, 1, 0, 1, 3)
 
+        self._load_older_btn = QtWidgets.QPushButton('Load Older')
+        self._load_older_btn.clicked.connect(self._model.loadOlder)
+        grid.addWidget(self._load_older_btn, 2, 0)
+
 
 
 
 class ActionLogTableModel(QtCore.QAbstractTableModel):
-    def __init__(self):
+    def __init__(self, retention=defaults.LOG_RETENTION):
         super().__init__()
-        self._data = []
         self._horizontal_header_labels = ['Time','User', 'Action']
         self._current_user_callback = None
 
-        self._log_file = Path(defaults.TOOL_DIR + '/logs/actions_' + datetime.today().strftime('%Y_%m') + '.csv')
-        if not self._log_file.is_file():
-            self.logToFile(self._horizontal_header_labels)
+        #Rows are [time, user, action], time is a timestamp, user is indexed and interned
+        self._store = LogStore(retention, [1], range(3), self.cellText)
+
+        self._log_writer = LogWriter(defaults.TOOL_DIR + '/logs', 'actions', self._horizontal_header_labels)
+        self._log_query = LogQuery(defaults.TOOL_DIR + '/logs', 'actions', self._horizontal_header_labels, [1], 0)
+        self._log_pager = LogPager(self._log_query)
 
     def currentUser(self):
         return self._current_user()
@@ -202,12 +548,25 @@ class ActionLogTableModel(QtCore.QAbstractTableModel):
     def setCurrentUser(self, user):
         self._current_user = user
 
+    def store(self):
+        return self._store
+
+    def cellText(self, row, column):
+        if column == 0: return formatLogTime(row[0])
+        return row[column]
+
+    def loggedRow(self, row):
+        return [self.cellText(row, column) for column in range(3)]
+
     def data(self, index, role):
         if role == QtCore.Qt.DisplayRole:
-            return self._data[index.row()][index.column()]
+            return self.cellText(self._store.row(index.row()), index.column())
+
+        elif role == QtCore.Qt.UserRole:
+            return self._store.row(index.row())[index.column()]
 
     def rowCount(self, index=QtCore.QModelIndex()):
-        return  0 if index.isValid() else len(self._data)
+        return  0 if index.isValid() else self._store.rowCount()
 
     def columnCount(self, index=QtCore.QModelIndex()):
         return 3
@@ -218,24 +577,69 @@ class ActionLogTableModel(QtCore.QAbstractTableModel):
 
 
     def addAction(self, action_text):
-        current_time = datetime.now().strftime("%m/%d/%Y, %H:%M:%S")
-        user = str(self.currentUser())
+        current_time = datetime.now().timestamp()
+        user = sys.intern(str(self.currentUser()))
 
         new_row = [current_time, user, str(action_text)]
 
         #insert at end, soring done by proxy view
         row_count = self.rowCount(QtCore.QModelIndex())
         self.beginInsertRows(QtCore.QModelIndex(), row_count, row_count)
-        self._data.append(new_row)
+        self._store.append(new_row)
         self.endInsertRows()
-
-        self.logToFile([str(current_time), str(user), str(action_text)])
+        self.trimRows()
+
+        self.logToFile(self.loggedRow(new_row))
+
+    #The oldest live rows go first, rows paged in by the user are kept
+    def trimRows(self):
+        count = self._store.overflow()
+        if count > 0:
+            first = self._store.pagedCount()
+            self.beginRemoveRows(QtCore.QModelIndex(), first, first+count-1)
+            self._store.trim(count)
+            self.endRemoveRows()
+
+    #Pages older actions in from the csv logs through the log index
+    def loadOlder(self, count=defaults.LOG_PAGE_SIZE):
+        self._log_writer.flush()
+        store = self._store
+        held_rows = (self.loggedRow(store.row(i)) for i in range(store.pagedCount(), store.rowCount()))
+
+        rows = []
+        for row in reversed(self._log_pager.page(count, held_rows)):
+            try:
+                rows.append([parseLogTime(row[0]).timestamp(), sys.intern(row[1]), row[2]])
+            except (IndexError, ValueError):
+                continue
+
+        if rows:
+            self.beginInsertRows(QtCore.QModelIndex(), 0, len(rows)-1)
+            self._store.prepend(rows)
+            self.endInsertRows()
+            self.trimPagedRows()
+
+        return len(rows)
+
+    #Past the limit the newest paged rows go, they're the ones furthest from where the user is paging
+    def trimPagedRows(self):
+        count = self._store.pagedOverflow()
+        if count > 0:
+            last = self._store.pagedCount() - 1
+            self.beginRemoveRows(QtCore.QModelIndex(), last-count+1, last)
+            self._store.trimPaged(count)
+            self.endRemoveRows()
     
+    #Written by a background thread, see LogWriter
     def logToFile(self, row):
-        #remove the str in python 3.6
-        with open(str(self._log_file), 'a') as f:
-            csv_writer = csv.writer(f)
-            csv_writer.writerow(row)
+        self._log_writer.write(row)
+
+    #Usually the alert model's logDropped so dropped actions are raised as an alert
+    def setLogDroppedCallback(self, callback):
+        self._log_writer.setDroppedCallback(callback)
+
+    def closeLog(self):
+        self._log_writer.close()
 
 
 
@@ -8,6 +8,9 @@ from string import Formatter
 import time
 
 class BaseNode:
+    __slots__ = ('_parent', '_children', '_root_node', '__weakref__') #Qt signal connections hold weak references to the nodes
+    _property_names = {} #class -> property names, see propertyNames()
+
     def __init__(self, parent=None):
         super().__init__()
         self._parent = parent
@@ -34,11 +37,22 @@ class BaseNode:
     def reset(self):
         pass
 
+    #Same keys and order as attrs() without calling every getter, cached since this runs for every loaded node
+    def propertyNames(self):
+        cls = self.__class__
+        if cls not in BaseNode._property_names:
+            names = []
+            for c in cls.__mro__:
+                for key, val in sorted(iter(c.__dict__.items())):
+                    if isinstance(val, property) and key not in names:
+                        names.append(key)
+            BaseNode._property_names[cls] = names
+
+        return BaseNode._property_names[cls]
+
     def loadAttrs(self, data):
         try:
-            #Get all the attributes of the node
-            attrs = iter(self.attrs().items())
-            for key, value in attrs:
+            for key in self.propertyNames():
                 if key in data:
                     setattr(self, key, data[key])
 
@@ -136,13 +150,17 @@ class BaseNode:
 
 
 class Node(BaseNode):
+    __slots__ = ('_pos', '_status', '_status_serial')
+    status_serial = 0 #Bumped on every status change of any node, see setStatus()
+
     def __init__(self, parent=None):
         super().__init__()
         self._pos = (0,0)
         self._status = None #Success/Failure/Running
+        self._status_serial = 0
 
     def reset(self):
-        self._status = None
+        self.setStatus(None)
         for child in self.children():
             child.reset()
 
@@ -163,6 +181,17 @@ class Node(BaseNode):
     def status(self):
         return self._status
 
+    #A node that changes status takes the next serial, a view that keeps the serial from its
+    #last refresh only has to update the nodes with a newer one
+    def setStatus(self, status):
+        if status != self._status:
+            self._status = status
+            Node.status_serial += 1
+            self._status_serial = Node.status_serial
+
+    def statusSerial(self):
+        return self._status_serial
+
     def x(self):
         return self._pos[0]
 
@@ -192,6 +221,8 @@ class Node(BaseNode):
 
 # Runs each child until one fails, if one fails returns failure.  If all succeed return success
 class SequenceNode(Node):
+    __slots__ = ('_current_child',)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._current_child = 0
@@ -215,17 +246,19 @@ class SequenceNode(Node):
                 result = child.tick()
 
                 if result in [bt.RUNNING, bt.FAILURE]:
-                    self._status = result
+                    self.setStatus(result)
                     return self._status
 
                 self._current_child = i
 
-            self._status = bt.SUCCESS
+            self.setStatus(bt.SUCCESS)
             return self._status
 
 
 
 class SelectorNode(Node):
+    __slots__ = ('_current_child',)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._current_child = 0
@@ -249,20 +282,22 @@ class SelectorNode(Node):
                 result = child.tick()
 
                 if result == bt.RUNNING:
-                    self._status = bt.RUNNING
+                    self.setStatus(bt.RUNNING)
                     return self._status
 
                 elif result == bt.SUCCESS:
-                    self._status = bt.SUCCESS
+                    self.setStatus(bt.SUCCESS)
                     return self._status
 
                 self._current_child = i
 
-            self._status = bt.FAILURE
+            self.setStatus(bt.FAILURE)
             return self._status
 
 
 class RootSequenceNode(SequenceNode):
+    __slots__ = ('_name', '_file', '_manual_button_new_line', '_manual_button_span_col_end', '_info_text')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._name = "Behavior Name"
@@ -326,6 +361,8 @@ class RootSequenceNode(SequenceNode):
 
 
 class RepeatNode(Node):
+    __slots__ = ('_current_child_index', '_current_child_result')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._current_child_index = 0
@@ -351,13 +388,13 @@ class RepeatNode(Node):
 
     def tick(self):
         if not self._children:
-            self._status = bt.SUCCESS
+            self.setStatus(bt.SUCCESS)
 
         if self._status in [bt.SUCCESS, bt.FAILURE]:
             return self._status
 
         else:
-            self._status = bt.RUNNING
+            self.setStatus(bt.RUNNING)
             
             #Reset first in order to display status of children
             if self._current_child_index >= len(self._children)-1 and self._current_child_result is bt.SUCCESS:
@@ -372,11 +409,11 @@ class RepeatNode(Node):
                     self._current_child_index += 1
 
                 elif self._current_child_result is bt.RUNNING:
-                    self._status = bt.RUNNING
+                    self.setStatus(bt.RUNNING)
                     return self._status
 
                 elif self._current_child_result is bt.FAILURE:
-                    self._status = bt.FAILURE
+                    self.setStatus(bt.FAILURE)
                     return self._status
 
             
@@ -385,6 +422,9 @@ class RepeatNode(Node):
 
 
 class RepeatNumberNode(Node):
+    __slots__ = ('_number_repeats', '_number_repeats_remaining', '_ignore_failure', '_current_child_index',
+                 '_current_child_result')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._number_repeats = 0
@@ -421,13 +461,13 @@ class RepeatNumberNode(Node):
     '''
     def tick(self):
         if not self._children:
-            self._status = bt.SUCCESS
+            self.setStatus(bt.SUCCESS)
 
         if self._status in [bt.SUCCESS, bt.FAILURE]:
             return self._status
 
         else:
-            self._status = bt.RUNNING
+            self.setStatus(bt.RUNNING)
             
             #Reset first in order to display status of children
             if self._current_child_index >= len(self._children)-1 and self._current_child_result is bt.SUCCESS:
@@ -448,24 +488,24 @@ class RepeatNumberNode(Node):
                     self._current_child_index += 1
 
                 elif self._current_child_result is bt.RUNNING:
-                    self._status = bt.RUNNING
+                    self.setStatus(bt.RUNNING)
                     return self._status
 
                 elif self._current_child_result is bt.FAILURE:
                     if self._ignore_failure:
                         break
                     else:
-                        self._status = bt.FAILURE
+                        self.setStatus(bt.FAILURE)
                         return self._status
 
 
             self._number_repeats_remaining -= 1
 
             if self._current_child_index >= len(self._children)-1 and self._number_repeats_remaining <= 0 and self._current_child_result == bt.SUCCESS:
-                self._status = bt.SUCCESS
+                self.setStatus(bt.SUCCESS)
             
             if self._number_repeats_remaining <= 0 and self._current_child_result == bt.FAILURE:
-                self._status = bt.FAILURE
+                self.setStatus(bt.FAILURE)
 
             return self._status
 
@@ -486,6 +526,8 @@ class RepeatNumberNode(Node):
 
 
 class FailureNode(Node):
+    __slots__ = ()
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -496,10 +538,12 @@ class FailureNode(Node):
         return bt.LEAF
 
     def tick(self):
-        self._status = bt.FAILURE
+        self.setStatus(bt.FAILURE)
         return self._status
 
 class SuccessNode(Node):
+    __slots__ = ()
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -510,11 +554,13 @@ class SuccessNode(Node):
         return bt.LEAF
 
     def tick(self):
-        self._status = bt.SUCCESS
+        self.setStatus(bt.SUCCESS)
         return self._status
 
 
 class WaitTimeNode(Node):
+    __slots__ = ('_wait_time', '_timer')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._wait_time = 0
@@ -538,7 +584,7 @@ class WaitTimeNode(Node):
         if   column is col.WAIT_TIME: self.wait_time = value
 
     def tmr(self):
-        self._status = bt.SUCCESS
+        self.setStatus(bt.SUCCESS)
 
     def setInfoText(self, value):
         text = "Wait: %0.1f sec" % value
@@ -548,7 +594,7 @@ class WaitTimeNode(Node):
         if self._status == None:
             self._timer.setInterval(int(self._wait_time * 1000))
             self._timer.start()
-            self._status = bt.RUNNING
+            self.setStatus(bt.RUNNING)
             self.setInfoText(self._wait_time)
             return self._status
 
@@ -613,6 +659,8 @@ Tolerancepoint(SetpointBase)
 
 
 class SetpointBase(BaseNode):
+    __slots__ = ('_set_type', '_set_index', '_set_name')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._set_type = bt.NO_SET
@@ -654,6 +702,8 @@ class SetpointBase(BaseNode):
 
 #A set node has a setpoint for each IO that can be set
 class Setpoint(SetpointBase):
+    __slots__ = ('_value', '_var_index', '_var_name')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._value = 0
@@ -701,6 +751,8 @@ class Setpoint(SetpointBase):
     varName = property(**varName())
 
 class RunBehaviorSetpoint(SetpointBase):
+    __slots__ = ('_behavior', '_behavior_name')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         #Runs a behavior of a device
@@ -742,6 +794,8 @@ class RunBehaviorSetpoint(SetpointBase):
     behaviorName = property(**behaviorName())
 
 class WaitStateSetpoint(SetpointBase):
+    __slots__ = ('_state',)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._state = ''
@@ -770,6 +824,8 @@ class WaitStateSetpoint(SetpointBase):
 #Used to set properties instead of IO.  SetIcon node has a PropertySetpoint for each property that is set
 #maybe use property as part of this class name? SetProperty?
 class PropertySetpoint(BaseNode):
+    __slots__ = ('_set_type', '_name', '_value', '_var_index', '_var_name')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         #Similar to Setpoint but has a fixed name
@@ -837,6 +893,8 @@ class PropertySetpoint(BaseNode):
 #The SetNode gets a list of tool nodes then we check if any are in save_values, and if so use the setpoint
 # Having the node reference lets it actually set the node
 class SetNode(Node):
+    __slots__ = ('_tool_model',)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._tool_model = None
@@ -905,10 +963,12 @@ class SetNode(Node):
 
                 #self.setInfoText(info_names)
 
-        self._status = bt.SUCCESS
+        self.setStatus(bt.SUCCESS)
         return self._status
 
 class WaitNode(Node): #This one is used by the device on IO
+    __slots__ = ('_tool_model', '_timeout_sec', '_start_time')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._tool_model = None
@@ -958,7 +1018,7 @@ class WaitNode(Node): #This one is used by the device on IO
     def tick(self):
         if not self._status:
             self._start_time = time.time()
-            self._status = bt.RUNNING
+            self.setStatus(bt.RUNNING)
 
 
         if self._status == bt.RUNNING:
@@ -1018,7 +1078,7 @@ class WaitNode(Node): #This one is used by the device on IO
 
 
             if all(child_result == True for child_result in children_results.values()):
-                self._status = bt.SUCCESS
+                self.setStatus(bt.SUCCESS)
 
             self.setInfoText(children_text)
 
@@ -1041,9 +1101,9 @@ class WaitNode(Node): #This one is used by the device on IO
         #Check timeout after incase it's at 0 so it doesn't fail the first round
         if self._status == bt.RUNNING:
             if (time.time() - self._start_time)  > self._timeout_sec:
-                self._status = bt.FAILURE
+                self.setStatus(bt.FAILURE)
 
-        #self._status = bt.SUCCESS
+        #self.setStatus(bt.SUCCESS)
         return self._status
 
     def timeoutSec():
@@ -1054,6 +1114,11 @@ class WaitNode(Node): #This one is used by the device on IO
 
 
 class Tolerancepoint(BaseNode):
+    __slots__ = ('_set_type', '_set_type_scale', '_set_type_offset', '_compare_1_index', '_compare_1_name',
+                 '_compare_2_index', '_compare_2_name', '_tolerance_scale_index', '_tolerance_scale_name',
+                 '_tolerance_scale_value', '_tolerance_offset_index', '_tolerance_offset_name',
+                 '_tolerance_offset_value')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         #We set a node (set_index) to either a value or to the value of another node (var_index)
@@ -1211,6 +1276,8 @@ class Tolerancepoint(BaseNode):
 
 #change to toleranceNode
 class ToleranceNode(Node):
+    __slots__ = ('_tool_model', '_timeout_sec', '_start_time')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._tool_model = None
@@ -1259,7 +1326,7 @@ class ToleranceNode(Node):
     def tick(self):
         if not self._status:
             self._start_time = time.time()
-            self._status = bt.RUNNING
+            self.setStatus(bt.RUNNING)
 
 
         if self._status == bt.RUNNING:
@@ -1297,14 +1364,14 @@ class ToleranceNode(Node):
 
             #keeping like this so its possible to log what one didn't hit tolerance?
             if all(child_result == True for child_result in children_results.values()):
-                self._status = bt.SUCCESS
+                self.setStatus(bt.SUCCESS)
 
             self.setInfoText(children_text)
 
         #Check timeout after incase it's at 0 so it doesn't fail the first round
         if self._status == bt.RUNNING:
             if (time.time() - self._start_time)  > self._timeout_sec:
-                self._status = bt.FAILURE
+                self.setStatus(bt.FAILURE)
 
         return self._status
 
@@ -1317,6 +1384,8 @@ class ToleranceNode(Node):
 
 
 class SetIconNode(Node):
+    __slots__ = ('_tool_model', '_icon_index', '_tool_value_methods')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._tool_model = None
@@ -1393,10 +1462,12 @@ class SetIconNode(Node):
 
 
 
-        self._status = bt.SUCCESS
+        self.setStatus(bt.SUCCESS)
         return self._status
 
 class RunBehaviorNode(Node):
+    __slots__ = ('_tool_model', '_icon_index')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._tool_model = None
@@ -1441,10 +1512,12 @@ class RunBehaviorNode(Node):
 
             self.setInfoText(behavior_names)
 
-        self._status = bt.SUCCESS
+        self.setStatus(bt.SUCCESS)
         return self._status
 
 class WaitStateNode(Node):
+    __slots__ = ('_tool_model', '_timeout_sec', '_start_time')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._tool_model = None
@@ -1492,7 +1565,7 @@ class WaitStateNode(Node):
     def tick(self):
         if not self._status:
             self._start_time = time.time()
-            self._status = bt.RUNNING
+            self.setStatus(bt.RUNNING)
 
 
         if self._status == bt.RUNNING:
@@ -1524,14 +1597,14 @@ class WaitStateNode(Node):
                     children_text[child.setName] = state_setpoint
 
             if all(child_result == True for child_result in children_results.values()):
-                self._status = bt.SUCCESS
+                self.setStatus(bt.SUCCESS)
 
             self.setInfoText(children_text)
 
         #Check timeout after incase it's at 0 so it doesn't fail the first round
         if self._status == bt.RUNNING:
             if (time.time() - self._start_time)  > self._timeout_sec:
-                self._status = bt.FAILURE
+                self.setStatus(bt.FAILURE)
 
         return self._status
 
@@ -1543,6 +1616,9 @@ class WaitStateNode(Node):
 
 
 class AlertNode(Node):
+    __slots__ = ('_tool_model', '_tool_index', '_tool_value_methods', '_text', '_alert_type', '_alert_callback',
+                 '_system_name', '_device_name')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._tool_model = None
@@ -1620,14 +1696,14 @@ class AlertNode(Node):
 
     def tick(self):
         if self._status == None:
-            self._status = bt.RUNNING
+            self.setStatus(bt.RUNNING)
 
             message = self.message()
 
             if self._alert_callback is not None:
                 self._alert_callback(alert_type=self._alert_type, system=self._system_name, device=self._device_name, alert=message)
 
-        self._status = bt.SUCCESS
+        self.setStatus(bt.SUCCESS)
         return self._status
 
     def text():
@@ -1645,6 +1721,10 @@ class AlertNode(Node):
 
 #Clears its alert if children return success
 class AlertSequenceNode(Node):
+    __slots__ = ('_tool_model', '_tool_index', '_tool_value_methods', '_current_child', '_text', '_alert_type',
+                 '_alert_callback', '_clear_alert_callback', '_set_user_clearable_callback', '_system_name',
+                 '_device_name')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._tool_model = None
@@ -1753,12 +1833,12 @@ class AlertSequenceNode(Node):
                 result = child.tick()
 
                 if result in [bt.RUNNING, bt.FAILURE]:
-                    self._status = result
+                    self.setStatus(result)
                     return self._status
 
                 self._current_child = i
 
-            self._status = bt.SUCCESS
+            self.setStatus(bt.SUCCESS)
             self._clear_alert_callback()
             return self._status
 
@@ -1778,6 +1858,8 @@ class AlertSequenceNode(Node):
 
 #Displays a message, non-blocking
 class MessageNode(Node):
+    __slots__ = ('_tool_model', '_tool_index', '_tool_value_methods', '_text', '_system_name', '_device_name')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._tool_model = None
@@ -1849,7 +1931,7 @@ class MessageNode(Node):
 
     def tick(self):
         if self._status == None:
-            self._status = bt.SUCCESS
+            self.setStatus(bt.SUCCESS)
             message = self.message()
 
             #Shows the message but doesn't block anything
@@ -1878,6 +1960,8 @@ class MessageNode(Node):
 
 #Displays a dialog box w/ two buttons, returns success/failure based on input
 class DialogNode(MessageNode):
+    __slots__ = ('_success_text', '_fail_text')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._success_text = ""
@@ -1903,7 +1987,7 @@ class DialogNode(MessageNode):
             return self._status
 
         elif self._status == None:
-            self._status = bt.RUNNING
+            self.setStatus(bt.RUNNING)
             message = self.message()
 
             #Shows the message but doesn't block anything
@@ -1924,9 +2008,9 @@ class DialogNode(MessageNode):
             button = dlg.exec()
         
             if button == dlg.AcceptRole:
-                self._status = bt.SUCCESS
+                self.setStatus(bt.SUCCESS)
             else:
-                self._status = bt.FAILURE
+                self.setStatus(bt.FAILURE)
 
         return self._status
 
@@ -1945,6 +2029,8 @@ class DialogNode(MessageNode):
 
 
 class SetDeviceStateNode(Node):
+    __slots__ = ('_device_state', '_device_state_callback', '_device_state_index')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._device_state = ""
@@ -1979,7 +2065,7 @@ class SetDeviceStateNode(Node):
         else:
             if self._device_state_callback and self._device_state_index:
                 self._device_state_callback(self._device_state_index, self._device_state)
-            self._status = bt.SUCCESS
+            self.setStatus(bt.SUCCESS)
             return self._status
 
     def device_state():
@@ -1995,6 +2081,8 @@ class SetDeviceStateNode(Node):
 
 #~~not used right now~~
 class BehaviorInput(BaseNode):
+    __slots__ = ('_set_type', '_text', '_new_line', '_node', '_node_name')
+
     def __init__(self, name=None, parent=None):
         super().__init__(parent)
         self._set_type = bt.NO_SET
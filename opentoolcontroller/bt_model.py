@@ -1,4 +1,4 @@
-from PyQt5 import QtCore, QtGui
+from PyQt5 import QtCore, QtGui, QtWidgets
 
 from opentoolcontroller.strings import bt, col, typ
 from opentoolcontroller.bt_data import *
@@ -8,14 +8,72 @@ from opentoolcontroller.strings import defaults
 import json
 import os.path
 import time
+import math
 import pickle
 
 
+class TickRecorder():
+    '''Tick times in fixed log scaled buckets like an HDR histogram so recording is O(1) and never allocates
+        - Each power of two microseconds is split into SUB_BUCKETS buckets, a few percent resolution
+        - Percentiles are the upper edge of the bucket they fall in, capped at the max
+    '''
+
+    SUB_BUCKETS = 16
+    MAX_EXPONENT = 27 #2**27 us is a bit over 2 minutes, anything longer goes in the last bucket
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._counts = [0] * ((self.MAX_EXPONENT + 1) * self.SUB_BUCKETS)
+        self._count = 0
+        self._max_us = 0.0
+        self._total_us = 0.0
+
+    def record(self, elapsed_us):
+        if elapsed_us < 1.0:
+            elapsed_us = 1.0
+
+        mantissa, exponent = math.frexp(elapsed_us) #elapsed_us = mantissa * 2**exponent, 0.5 <= mantissa < 1
+        index = exponent * self.SUB_BUCKETS + int((mantissa - 0.5) * 2 * self.SUB_BUCKETS)
+        if index >= len(self._counts):
+            index = len(self._counts) - 1
+
+        self._counts[index] += 1
+        self._count += 1
+        self._total_us += elapsed_us
+        if elapsed_us > self._max_us:
+            self._max_us = elapsed_us
+
+    def count(self):
+        return self._count
 
-import sys
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+    def maxUS(self):
+        return self._max_us
+
+    def meanUS(self):
+        return self._total_us / self._count if self._count else 0.0
+
+    def bucketLimitUS(self, index):
+        exponent, sub_bucket = divmod(index, self.SUB_BUCKETS)
+        return (0.5 + (sub_bucket + 1) / (2.0 * self.SUB_BUCKETS)) * 2.0**exponent
+
+    def percentileUS(self, percentile):
+        if self._count == 0:
+            return 0.0
+
+        target = math.ceil(self._count * percentile / 100.0)
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= target:
+                return min(self.bucketLimitUS(index), self._max_us)
+
+        return self._max_us
+
+    #Returns [(upper_limit_us, count)] for the buckets that have anything in them
+    def buckets(self):
+        return [(self.bucketLimitUS(i), count) for i, count in enumerate(self._counts) if count]
 
 
 class BehaviorRunner():
@@ -28,8 +86,7 @@ class BehaviorRunner():
         self._timer.start(self._tick_rate_ms)
 
         self._running_behaviors = []
-        self._max_elapsed_ms = 0
-        self._histogram_window = None
+        self._tick_recorder = TickRecorder()
 
 
     def behaviorRunnerNumber(self):
@@ -38,9 +95,9 @@ class BehaviorRunner():
     def tickRateMS(self):
         return self._tick_rate_ms
 
-    def launchHistogram(self):
-        self._histogram_window = LiveHistogramWindow()
-        self._histogram_window.show()
+    #Every tick's time is recorded, see TickTimeWindow for showing them
+    def tickRecorder(self):
+        return self._tick_recorder
 
 
     def runAbortSiblings(self, new_behavior):
@@ -65,7 +122,7 @@ class BehaviorRunner():
     def tick(self):
         behaviors_to_stop = []
 
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         for behavior in self._running_behaviors:
             try:
@@ -82,81 +139,73 @@ class BehaviorRunner():
             self.stopBehavior(behavior)
 
 
-        elapsed_sec = time.time() - start_time
-        elapsed_ms = elapsed_sec * 1e3
-        
-        if self._histogram_window:
-            self._histogram_window.update([elapsed_ms])
+        self._tick_recorder.record((time.perf_counter() - start_time) * 1e6)
 
 
                 
-class LiveHistogramWindow(QtWidgets.QWidget):
-    def __init__(self):
-        super().__init__()
+class TickTimeWindow(QtWidgets.QWidget):
+    '''Tick time percentiles of each BehaviorRunner, refreshed on its own slow timer so watching
+       the tick times doesn't add to them'''
 
-        self.max_points = 50
+    COLUMNS = ['Runner', 'Period (ms)', 'Ticks', 'Mean (ms)', 'p50 (ms)', 'p90 (ms)', 'p99 (ms)', 'Max (ms)']
 
+    def __init__(self, behavior_runners, refresh_ms=500):
+        super().__init__()
         self.setWindowTitle("Tick Time")
-        self.setGeometry(100, 100, 400, 400)
-
-        self._layout = QtWidgets.QVBoxLayout()
-        self.setLayout(self._layout)
-
-        self.figure, self.ax = plt.subplots()
-        self.canvas = FigureCanvas(self.figure)
-        self._layout.addWidget(self.canvas)
-
-        self.data = []  # List to store the data points for the histogram
-
-        # Create the initial histogram
-        self.bins = np.arange(1, 11)
-        self.bars = self.ax.bar(self.bins[:-1], np.zeros_like(self.bins[:-1]), align='edge', edgecolor='black')
-
-       
-        # Set labels and title
-        self.ax.set_xlabel('Time (ms)')
-        self.ax.set_ylabel('Frequency')
-        self.ax.set_title('Tick Time')
-
+        self.setGeometry(100, 100, 700, 200)
 
-    def update(self, new_values=None):
-        if new_values is None:
-            new_values = []
-
-        # Add new values to the data
-        self.data.extend(new_values)
-
-        if len(self.data) > self.max_points:
-            self.data = self.data[-self.max_points:]
-
-
-        # Calculate bins dynamically based on the range of the data
-        min_value = min(self.data)
-        max_value = max(self.data)
-        self.bins = np.linspace(min_value, max_value, 11)
-
-        # Update the existing bars in the histogram
-        hist, _ = np.histogram(self.data, bins=self.bins)
-        for bar, h, bin_left, bin_right in zip(self.bars, hist, self.bins[:-1], self.bins[1:]):
-            bin_width = bin_right - bin_left
-            bin_center = (bin_left + bin_right) / 2
-            bar.set_height(h)
-            bar.set_x(bin_left)
-            bar.set_width(bin_width)
-
-
-        self.ax.set_ylim(0, max(hist))
-        self.ax.set_xlim(0, max_value)
-        self.canvas.draw()
+        self._behavior_runners = behavior_runners
 
+        self._table = QtWidgets.QTableWidget(len(behavior_runners), len(self.COLUMNS))
+        self._table.setHorizontalHeaderLabels(self.COLUMNS)
+        self._table.verticalHeader().hide()
+        self._table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
 
+        self._reset_btn = QtWidgets.QPushButton('Reset')
+        self._reset_btn.clicked.connect(self.resetRecorders)
 
+        self._layout = QtWidgets.QVBoxLayout()
+        self.setLayout(self._layout)
+        self._layout.addWidget(self._table)
+        self._layout.addWidget(self._reset_btn)
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start(refresh_ms)
+        self.refresh()
+
+    def resetRecorders(self):
+        for runner in self._behavior_runners:
+            runner.tickRecorder().reset()
+        self.refresh()
+
+    def refresh(self):
+        for row, runner in enumerate(self._behavior_runners):
+            recorder = runner.tickRecorder()
+            values = [str(runner.behaviorRunnerNumber() + 1),
+                      str(runner.tickRateMS()),
+                      str(recorder.count()),
+                      '%.3f' % (recorder.meanUS() / 1e3),
+                      '%.3f' % (recorder.percentileUS(50) / 1e3),
+                      '%.3f' % (recorder.percentileUS(90) / 1e3),
+                      '%.3f' % (recorder.percentileUS(99) / 1e3),
+                      '%.3f' % (recorder.maxUS() / 1e3)]
+
+            for column, value in enumerate(values):
+                item = self._table.item(row, column)
+                if item is None:
+                    item = QtWidgets.QTableWidgetItem()
+                    self._table.setItem(row, column, item)
+                item.setText(value)
 
 
 
 class BTModel(QtCore.QAbstractItemModel):
     #behaviorRunner = None
 
+    #Adding or removing these doesn't change which leaves depend on the tool, a stale var name only costs an extra resync
+    _setpoint_types = [typ.SETPOINT, typ.RUN_BEHAVIOR_SETPOINT, typ.WAIT_STATE_SETPOINT, typ.TOLERANCEPOINT, typ.PROPERTY_SETPOINT]
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._root_node = RootSequenceNode()
@@ -167,6 +216,7 @@ class BTModel(QtCore.QAbstractItemModel):
 
         self._tool_model = None
         self._tool_index = None
+        self._tool_dependencies = None #See toolDependencies()
 
 
     '''The tool needs a single timer that all the behaviors use, or maybe per System?
@@ -216,17 +266,19 @@ class BTModel(QtCore.QAbstractItemModel):
 
         names = []
 
+        #Setpoints by the name they're set to, the first one wins like the old scan
+        setpoints = {}
+        for setpoint_index in self.indexesOfType(setpoint_type, leaf_index):
+            setpoint_node = setpoint_index.internalPointer()
+            setpoints.setdefault(setpoint_node.setName, setpoint_node)
+
         # Add ones we don't have
         for tool_index in self.toolModel().indexesOfTypes(leaf_node.toolTypes(), self.toolIndex(), 1):
             tool_node = tool_index.internalPointer()
             names.append(tool_node.name)
 
-            for setpoint_index in self.indexesOfType(setpoint_type, leaf_index):
-                setpoint_node = setpoint_index.internalPointer()
-
-                if setpoint_node.setName == tool_node.name:
-                    setpoint_node.setSetIndex(tool_index)
-                    break
+            if tool_node.name in setpoints:
+                setpoints[tool_node.name].setSetIndex(tool_index)
 
             else:
                 new_setpoint_index = self.insertChild(leaf_index, setpoint_type)
@@ -250,9 +302,9 @@ class BTModel(QtCore.QAbstractItemModel):
         for setpoint_index in self.indexesOfType(typ.SETPOINT, leaf_index):
             setpoint_node = setpoint_index.internalPointer()
 
-            for tool_index in self.toolModel().childrenIndexes(self.toolIndex()):
-                if tool_index.internalPointer().name == setpoint_node.varName:
-                    setpoint_node.setVarIndex(tool_index)
+            var_index = self.toolModel().childIndexByName(self.toolIndex(), setpoint_node.varName)
+            if var_index is not None:
+                setpoint_node.setVarIndex(var_index)
 
 
 
@@ -290,17 +342,18 @@ class BTModel(QtCore.QAbstractItemModel):
         leaf_node.setToolModel(self.toolModel())
         names = []
 
+        points = {}
+        for point_index in self.indexesOfType(typ.TOLERANCEPOINT, leaf_index):
+            point_node = point_index.internalPointer()
+            points.setdefault(point_node.compare1Name, point_node)
+
         # Add ones we don't have and set the models
         for tool_index in self.toolModel().indexesOfTypes(leaf_node.toolTypes(), self.toolIndex(), 1):
             tool_node = tool_index.internalPointer()
             names.append(tool_node.name)
 
-            for point_index in self.indexesOfType(typ.TOLERANCEPOINT, leaf_index):
-                point_node = point_index.internalPointer()
-
-                if point_node.compare1Name == tool_node.name:
-                    point_node.setCompare1Index(tool_index)
-                    break
+            if tool_node.name in points:
+                points[tool_node.name].setCompare1Index(tool_index)
 
             else:
                 new_point_index = self.insertChild(leaf_index, typ.TOLERANCEPOINT)
@@ -319,15 +372,17 @@ class BTModel(QtCore.QAbstractItemModel):
         for point_index in self.indexesOfType(typ.TOLERANCEPOINT, leaf_index):
             point_node = point_index.internalPointer()
 
-            for tool_index in self.toolModel().childrenIndexes(self.toolIndex()):
-                if tool_index.internalPointer().name == point_node.compare2Name:
-                    point_node.setCompare2Index(tool_index)
+            compare2_index = self.toolModel().childIndexByName(self.toolIndex(), point_node.compare2Name)
+            if compare2_index is not None:
+                point_node.setCompare2Index(compare2_index)
 
-                if tool_index.internalPointer().name == point_node.toleranceScaleName:
-                    point_node.setToleranceScaleIndex(tool_index)
+            scale_index = self.toolModel().childIndexByName(self.toolIndex(), point_node.toleranceScaleName)
+            if scale_index is not None:
+                point_node.setToleranceScaleIndex(scale_index)
 
-                if tool_index.internalPointer().name == point_node.toleranceOffsetName:
-                    point_node.setToleranceOffsetIndex(tool_index)
+            offset_index = self.toolModel().childIndexByName(self.toolIndex(), point_node.toleranceOffsetName)
+            if offset_index is not None:
+                point_node.setToleranceOffsetIndex(offset_index)
 
 
 
@@ -392,9 +447,9 @@ class BTModel(QtCore.QAbstractItemModel):
 
 
             #sync the varNodeVariable
-            for tool_index in self.toolModel().childrenIndexes(self.toolIndex()):
-                if tool_index.internalPointer().name == named_setpoint_node.varName:
-                    named_setpoint_node.setVarIndex(tool_index)
+            var_index = self.toolModel().childIndexByName(self.toolIndex(), named_setpoint_node.varName)
+            if var_index is not None:
+                named_setpoint_node.setVarIndex(var_index)
 
 
         #Remove excess children
@@ -409,36 +464,86 @@ class BTModel(QtCore.QAbstractItemModel):
         node.setDeviceStateCallback(self._tool_model.setData, self.toolIndex().siblingAtColumn(col.STATE))
 
 
+    #Tool node type or referenced var name -> [(leaf_node, sync method)], rebuilt after the behavior is edited
+    def toolDependencies(self):
+        if self._tool_dependencies is None:
+            dependencies = {}
+            leaf_syncs = {typ.SET_NODE          : self.syncLeafSetpoints,
+                          typ.RUN_BEHAVIOR_NODE : self.syncLeafRunBehaviorSetpoints,
+                          typ.WAIT_STATE_NODE   : self.syncLeafWaitStateSetpoints,
+                          typ.WAIT_NODE         : self.syncLeafSetpoints,
+                          typ.TOLERANCE_NODE    : self.syncLeafTolerancepoints,
+                          typ.SET_ICON_NODE     : self.syncIconIndex}
+
+            #Walks the nodes directly, going through indexesOfType for each leaf type costs more than the resync
+            nodes = [self._root_node]
+            while nodes:
+                leaf_node = nodes.pop()
+                nodes.extend(leaf_node.children())
+
+                sync = leaf_syncs.get(leaf_node.typeInfo())
+                if sync is None:
+                    continue
+
+                keys = set(leaf_node.toolTypes()) if sync != self.syncIconIndex else set([typ.DEVICE_ICON_NODE])
+
+                for child in leaf_node.children():
+                    if child.typeInfo() in [typ.SETPOINT, typ.PROPERTY_SETPOINT]:
+                        keys.add(child.varName)
+
+                    elif child.typeInfo() == typ.TOLERANCEPOINT:
+                        keys.update([child.compare2Name, child.toleranceScaleName, child.toleranceOffsetName])
+
+                for key in keys:
+                    dependencies.setdefault(key, []).append((leaf_node, sync))
+
+            self._tool_dependencies = dependencies
+
+        return self._tool_dependencies
+
+    #Only resyncs the leaves that can use the tool node, called by the tool model when one is added or removed
+    def syncToToolNode(self, tool_node):
+        dependencies = self.toolDependencies()
+        leaves = dependencies.get(tool_node.typeInfo(), []) + dependencies.get(tool_node.name, [])
+
+        synced = []
+        for leaf_node, sync in leaves:
+            if leaf_node not in synced:
+                synced.append(leaf_node)
+                sync(self.createIndex(leaf_node.row(), 0, leaf_node))
+
+    #The leaves are found in one walk, syncing only adds and removes the setpoints below them
     def syncToTool(self):
+        leaves = self.indexesByType()
 
-        for index in self.indexesOfType(typ.SET_DEVICE_STATE_NODE):
+        for index in leaves.get(typ.SET_DEVICE_STATE_NODE, []):
             self.syncDeviceStateIndex(index)
 
-        for index in self.indexesOfType(typ.SET_NODE):
+        for index in leaves.get(typ.SET_NODE, []):
             self.syncLeafSetpoints(index)
 
-        for index in self.indexesOfType(typ.RUN_BEHAVIOR_NODE):
+        for index in leaves.get(typ.RUN_BEHAVIOR_NODE, []):
             self.syncLeafRunBehaviorSetpoints(index)
 
-        for index in self.indexesOfType(typ.WAIT_STATE_NODE):
+        for index in leaves.get(typ.WAIT_STATE_NODE, []):
             self.syncLeafWaitStateSetpoints(index)
 
-        for index in self.indexesOfType(typ.WAIT_NODE):
+        for index in leaves.get(typ.WAIT_NODE, []):
             self.syncLeafSetpoints(index)
 
-        for index in self.indexesOfType(typ.TOLERANCE_NODE):
+        for index in leaves.get(typ.TOLERANCE_NODE, []):
             self.syncLeafTolerancepoints(index)
 
-        for icon_index in self.indexesOfType(typ.SET_ICON_NODE):
+        for icon_index in leaves.get(typ.SET_ICON_NODE, []):
             self.syncIconIndex(icon_index)
         
-        for index in self.indexesOfType(typ.MESSAGE_NODE):
+        for index in leaves.get(typ.MESSAGE_NODE, []):
             self.syncMessageIndex(index)
 
-        for index in self.indexesOfType(typ.ALERT_NODE):
+        for index in leaves.get(typ.ALERT_NODE, []):
             self.syncAlertIndex(index)
 
-        for index in self.indexesOfType(typ.ALERT_SEQUENCE_NODE):
+        for index in leaves.get(typ.ALERT_SEQUENCE_NODE, []):
             self.syncAlertIndex(index)
 
 
@@ -467,26 +572,33 @@ class BTModel(QtCore.QAbstractItemModel):
     def loadJSON(self, json):
         try:
             if json['type_info'] == typ.ROOT_SEQUENCE_NODE:
-                self._root_node.loadAttrs(json)
-
-                if 'children' in json:
-                    for child in json['children']:
-                        index = self.insertChild(self._root_index, child['type_info'], None, True)
-                        index.internalPointer().loadAttrs(child)
-                        self._recurseJSON(index, child)
+                #Build the whole tree then tell the views once, instead of an insert per node
+                self.beginResetModel()
+                try:
+                    self._tool_dependencies = None
+                    self._root_node.loadAttrs(json)
+                    self._recurseJSON(self._root_node, json)
+                finally:
+                    self.endResetModel()
 
+            return True
 
         except Exception as e:
             MessageBox("Failed to behavior from JSON", e)
             return False
 
 
-    def _recurseJSON(self, parent_index, json):
+    #Nodes go straight into the tree, syncing to the tool is left to syncToTool
+    def _recurseJSON(self, parent_node, json):
         if 'children' in json:
             for child in json['children']:
-                index = self.insertChild(parent_index, child['type_info'], None, True)
-                index.internalPointer().loadAttrs(child)
-                self._recurseJSON(index, child)
+                node = self.newNode(child['type_info'])
+                if node is None:
+                    continue
+
+                parent_node.insertChild(parent_node.childCount(), node)
+                node.loadAttrs(child)
+                self._recurseJSON(node, child)
 
 
 
@@ -516,6 +628,7 @@ class BTModel(QtCore.QAbstractItemModel):
         if insert_row is not False:
             self.beginInsertRows(parent_index, insert_row, insert_row) #parent, first, last
             parent_node.insertChild(insert_row, node)
+            self._tool_dependencies = None
             self.endInsertRows()
 
 
@@ -536,6 +649,37 @@ class BTModel(QtCore.QAbstractItemModel):
         return new_child_index
 
 
+    def newNode(self, node_type):
+        if    node_type == typ.SEQUENCE_NODE         : return SequenceNode()
+        elif  node_type == typ.REPEAT_NODE           : return RepeatNode()
+        elif  node_type == typ.REPEAT_NUMBER_NODE    : return RepeatNumberNode()
+        elif  node_type == typ.SELECTOR_NODE         : return SelectorNode()
+        elif  node_type == typ.WHILE_NODE            : return WhileNode()
+        elif  node_type == typ.SET_NODE              : return SetNode()
+        elif  node_type == typ.RUN_BEHAVIOR_NODE     : return RunBehaviorNode()
+        elif  node_type == typ.WAIT_STATE_NODE       : return WaitStateNode()
+        elif  node_type == typ.WAIT_NODE             : return WaitNode()
+        elif  node_type == typ.TOLERANCE_NODE        : return ToleranceNode()
+        elif  node_type == typ.ALERT_NODE            : return AlertNode()
+        elif  node_type == typ.ALERT_SEQUENCE_NODE   : return AlertSequenceNode()
+        elif  node_type == typ.MESSAGE_NODE          : return MessageNode()
+        elif  node_type == typ.DIALOG_NODE           : return DialogNode()
+        elif  node_type == typ.WAIT_TIME_NODE        : return WaitTimeNode()
+        elif  node_type == typ.SET_DEVICE_STATE_NODE : return SetDeviceStateNode()
+        elif  node_type == typ.SUCCESS_NODE          : return SuccessNode()
+        elif  node_type == typ.FAILURE_NODE          : return FailureNode()
+        elif  node_type == typ.SET_ICON_NODE         : return SetIconNode()
+        elif  node_type == typ.SETPOINT              : return Setpoint()
+        elif  node_type == typ.RUN_BEHAVIOR_SETPOINT : return RunBehaviorSetpoint()
+        elif  node_type == typ.WAIT_STATE_SETPOINT   : return WaitStateSetpoint()
+        elif  node_type == typ.TOLERANCEPOINT        : return Tolerancepoint()
+        elif  node_type == typ.PROPERTY_SETPOINT     : return PropertySetpoint()
+        elif  node_type == typ.BEHAVIOR_INPUT        : return BehaviorInput()
+
+        MessageBox('Attempting to insert unknown node of type', node_type)
+        return None
+
+
     def insertChild(self, parent_index, child_type, insert_row = None, from_load = False):
         parent_node  = parent_index.internalPointer()
 
@@ -543,35 +687,15 @@ class BTModel(QtCore.QAbstractItemModel):
             insert_row = parent_index.internalPointer().childCount()
 
         if insert_row is not False:
+            new_node = self.newNode(child_type)
+            if new_node is None:
+                return None
+
             self.beginInsertRows(parent_index, insert_row, insert_row) #(parent, first, last)
 
-            if    child_type == typ.SEQUENCE_NODE         : parent_node.insertChild(insert_row, SequenceNode())
-            elif  child_type == typ.REPEAT_NODE           : parent_node.insertChild(insert_row, RepeatNode())
-            elif  child_type == typ.REPEAT_NUMBER_NODE    : parent_node.insertChild(insert_row, RepeatNumberNode())
-            elif  child_type == typ.SELECTOR_NODE         : parent_node.insertChild(insert_row, SelectorNode())
-            elif  child_type == typ.WHILE_NODE            : parent_node.insertChild(insert_row, WhileNode())
-            elif  child_type == typ.SET_NODE              : parent_node.insertChild(insert_row, SetNode())
-            elif  child_type == typ.RUN_BEHAVIOR_NODE     : parent_node.insertChild(insert_row, RunBehaviorNode())
-            elif  child_type == typ.WAIT_STATE_NODE       : parent_node.insertChild(insert_row, WaitStateNode())
-            elif  child_type == typ.WAIT_NODE             : parent_node.insertChild(insert_row, WaitNode())
-            elif  child_type == typ.TOLERANCE_NODE        : parent_node.insertChild(insert_row, ToleranceNode())
-            elif  child_type == typ.ALERT_NODE            : parent_node.insertChild(insert_row, AlertNode())
-            elif  child_type == typ.ALERT_SEQUENCE_NODE   : parent_node.insertChild(insert_row, AlertSequenceNode())
-            elif  child_type == typ.MESSAGE_NODE          : parent_node.insertChild(insert_row, MessageNode())
-            elif  child_type == typ.DIALOG_NODE           : parent_node.insertChild(insert_row, DialogNode())
-            elif  child_type == typ.WAIT_TIME_NODE        : parent_node.insertChild(insert_row, WaitTimeNode())
-            elif  child_type == typ.SET_DEVICE_STATE_NODE : parent_node.insertChild(insert_row, SetDeviceStateNode())
-            elif  child_type == typ.SUCCESS_NODE          : parent_node.insertChild(insert_row, SuccessNode())
-            elif  child_type == typ.FAILURE_NODE          : parent_node.insertChild(insert_row, FailureNode())
-            elif  child_type == typ.SET_ICON_NODE         : parent_node.insertChild(insert_row, SetIconNode())
-            elif  child_type == typ.SETPOINT              : parent_node.insertChild(insert_row, Setpoint())
-            elif  child_type == typ.RUN_BEHAVIOR_SETPOINT : parent_node.insertChild(insert_row, RunBehaviorSetpoint())
-            elif  child_type == typ.WAIT_STATE_SETPOINT   : parent_node.insertChild(insert_row, WaitStateSetpoint())
-            elif  child_type == typ.TOLERANCEPOINT        : parent_node.insertChild(insert_row, Tolerancepoint())
-            elif  child_type == typ.PROPERTY_SETPOINT     : parent_node.insertChild(insert_row, PropertySetpoint())
-            elif  child_type == typ.BEHAVIOR_INPUT        : parent_node.insertChild(insert_row, BehaviorInput())
-
-            else: MessageBox('Attempting to insert unknown node of type', child_type)
+            parent_node.insertChild(insert_row, new_node)
+            if child_type not in self._setpoint_types:
+                self._tool_dependencies = None
 
             new_child_index = self.index(insert_row, 0, parent_index)
             new_child_node = new_child_index.internalPointer()
@@ -646,7 +770,10 @@ class BTModel(QtCore.QAbstractItemModel):
         self.beginRemoveRows(parent_index, row, row+count-1)
 
         for i in list(range(count)):
-            parent_node.removeChild(row)
+            node = parent_node.removeChild(row)
+
+            if node is False or node.typeInfo() not in self._setpoint_types:
+                self._tool_dependencies = None
 
         self.endRemoveRows()
         #self.modelReset.emit()
@@ -725,35 +852,41 @@ class BTModel(QtCore.QAbstractItemModel):
 
 
     #TODO might be buggy casue not all nodes have position now
+    #Children with a position are put in order left to right in the rows they already take, as one
+    #layout change. Persistent indexes on the moved children are pointed at their new rows
     def sortChildrenByXPos(self, index):
         node = index.internalPointer()
-        if node is not None:
-            moved = False
-            x_positions = []
+        if node is None:
+            return
+
+        children = node.children()
+        rows = [row for row, child in enumerate(children) if hasattr(child, 'pos')]
+        sorted_children = sorted([children[row] for row in rows], key=lambda child: child.pos[0])
 
-            for child in node.children():
-                if hasattr(child, 'pos'):
-                    x_positions.append((child.row(), child.pos[0]))
+        new_rows = {} #id(child): row, for the children that move
+        for row, child in zip(rows, sorted_children):
+            if children[row] is not child:
+                new_rows[id(child)] = row
 
-            x_sorted = sorted(x_positions, key=lambda x: x[1])
+        if not new_rows:
+            return
 
-            while x_sorted != x_positions:
-                i = 0
-                for row, x_pos in x_sorted:
-                    if row != i:
-                        moved = True
-                        self.moveRow(index, row, index, i)
-                        break
-                    i += 1
+        parents = [QtCore.QPersistentModelIndex(index)]
+        self.layoutAboutToBeChanged.emit(parents, QtCore.QAbstractItemModel.VerticalSortHint)
 
-                x_positions = []
-                for child in node.children():
-                    if hasattr(child, 'pos'):
-                        x_positions.append((child.row(), child.pos[0]))
-                x_sorted = sorted(x_positions, key=lambda x: x[1])
+        for row, child in zip(rows, sorted_children):
+            children[row] = child
 
-            if moved:
-                node.reset()
+        from_indexes, to_indexes = [], []
+        for p_index in self.persistentIndexList():
+            row = new_rows.get(id(p_index.internalPointer()))
+            if row is not None:
+                from_indexes.append(p_index)
+                to_indexes.append(self.createIndex(row, p_index.column(), p_index.internalPointer()))
+        self.changePersistentIndexList(from_indexes, to_indexes)
+
+        self.layoutChanged.emit(parents, QtCore.QAbstractItemModel.VerticalSortHint)
+        node.reset()
 
 
     def setData(self, index, value, role=QtCore.Qt.EditRole):
@@ -766,27 +899,29 @@ class BTModel(QtCore.QAbstractItemModel):
         if index.isValid() and role == QtCore.Qt.EditRole:
             node.setData(index.column(), value)
 
+            if index.column() in [col.VAR_NODE_NAME, col.COMPARE_2_NAME, col.TOLERANCE_SCALE_NAME, col.TOLERANCE_OFFSET_NAME]:
+                self._tool_dependencies = None
 
             if index.column() == col.VAR_NODE_NAME:
-                for tool_index in self.toolModel().childrenIndexes(self.toolIndex()):
-                    if tool_index.internalPointer().name == value:
-                        node.setVarIndex(tool_index)
+                tool_index = self.toolModel().childIndexByName(self.toolIndex(), value)
+                if tool_index is not None:
+                    node.setVarIndex(tool_index)
 
             #Some day convert the tolerance node to use the VAR_NODE_NAME style
             elif index.column() == col.COMPARE_2_NAME:
-                for tool_index in self.toolModel().childrenIndexes(self.toolIndex()):
-                    if tool_index.internalPointer().name == value:
-                        node.setCompare2Index(tool_index)
+                tool_index = self.toolModel().childIndexByName(self.toolIndex(), value)
+                if tool_index is not None:
+                    node.setCompare2Index(tool_index)
 
             elif index.column() == col.TOLERANCE_SCALE_NAME:
-                for tool_index in self.toolModel().childrenIndexes(self.toolIndex()):
-                    if tool_index.internalPointer().name == value:
-                        node.setToleranceScaleIndex(tool_index)
+                tool_index = self.toolModel().childIndexByName(self.toolIndex(), value)
+                if tool_index is not None:
+                    node.setToleranceScaleIndex(tool_index)
 
             elif index.column() == col.TOLERANCE_OFFSET_NAME:
-                for tool_index in self.toolModel().childrenIndexes(self.toolIndex()):
-                    if tool_index.internalPointer().name == value:
-                        node.setToleranceOffsetIndex(tool_index)
+                tool_index = self.toolModel().childIndexByName(self.toolIndex(), value)
+                if tool_index is not None:
+                    node.setToleranceOffsetIndex(tool_index)
             
             elif index.column() == col.BEHAVIOR_NAME: #Only for Tool/System RUN BEHAVIOR nodes TODO refine
                 device_node = node.setIndex().internalPointer()
@@ -852,21 +987,31 @@ class BTModel(QtCore.QAbstractItemModel):
         try:
             parent_node = parent_index.internalPointer() if parent_index.isValid() else self._root_node
         except:
-            parent_index = self.index(0, 0, QtCore.QModelIndex())
             parent_node = self._root_node
 
         indexes = []
+        self._recurseIndexesOfType(index_type, parent_node, indexes)
+        return indexes
 
-        for row in range(self.rowCount(parent_index)):
-            index = parent_index.child(row, 0)
-
-            if index.internalPointer().typeInfo() == index_type:
-                indexes.append(index)
+    #Walks the nodes directly instead of going through QModelIndex.child() for every row, like the ToolModel
+    def _recurseIndexesOfType(self, index_type, parent_node, indexes):
+        for row, node in enumerate(parent_node.children()):
+            if node.typeInfo() == index_type:
+                indexes.append(self.createIndex(row, 0, node))
 
-            indexes += self.indexesOfType(index_type, index)
+            self._recurseIndexesOfType(index_type, node, indexes)
 
+    #Type -> indexes of every node below the root in a single walk
+    def indexesByType(self):
+        indexes = {}
+        self._recurseIndexesByType(self._root_node, indexes)
         return indexes
 
+    def _recurseIndexesByType(self, parent_node, indexes):
+        for row, node in enumerate(parent_node.children()):
+            indexes.setdefault(node.typeInfo(), []).append(self.createIndex(row, 0, node))
+            self._recurseIndexesByType(node, indexes)
+
     
 
     def tick(self):
@@ -4,7 +4,43 @@ from PyQt5 import QtCore
 
 import copy
 import numpy as np
-from scipy.interpolate import interp1d
+
+#Checks a calibration table in the dataArray() format and returns a copy of its rows as floats, raises ValueError if it's malformed
+def validatedDataArray(data):
+    if data[0] != ['hal_value', 'gui_value']:
+        raise ValueError("First row must be ['hal_value', 'gui_value']")
+
+    data_main = []
+    data_main = data[1:]
+
+
+    #min 2 points to draw a line
+    if len(data_main) < 2:
+        raise ValueError("Must have 2 or more rows in calibration table")
+
+
+    #Check that these are all floats
+    for row in data_main:
+        if not all(isinstance(i, (int, float)) for i in row):
+            raise ValueError('Calibration table data must be of type int or float')
+
+
+    #Check that these are all increasing values
+    hal_values = [row[0] for row in data_main]
+    gui_values = [row[1] for row in data_main]
+
+    hal_is_increasing = all(i < j for i, j in zip(hal_values, hal_values[1:]))
+    gui_is_increasing = all(i < j for i, j in zip(gui_values, gui_values[1:]))
+    gui_is_decreasing = all(i > j for i, j in zip(gui_values, gui_values[1:]))
+
+    if not (hal_is_increasing):
+        raise ValueError('Calibration table hal values must increasing in order')
+
+    if not (gui_is_increasing ^ gui_is_decreasing):
+        raise ValueError('Calibration table gui values must ordered either increasing or decreasing')
+
+    return [[float(row[0]), float(row[1])] for row in data_main]
+
 
 class CalibrationTableModel(QtCore.QAbstractTableModel):
     '''Stores analog value calibration, i.e. HAL units to software units
@@ -67,47 +103,11 @@ class CalibrationTableModel(QtCore.QAbstractTableModel):
                         [        5.0,       46.00 ],
                         [        9.0,        9183 ] ]
         '''
-
-        if data[0] != ['hal_value', 'gui_value']:
-            raise ValueError("First row must be ['hal_value', 'gui_value']")
-
-        data_main = []
-        data_main = data[1:]
-
-
-        #min 2 points to draw a line
-        if len(data_main) < 2:
-            raise ValueError("Must have 2 or more rows in calibration table")
-
-
-        #Check that these are all floats
-        for row in data_main:
-            if not all(isinstance(i, (int, float)) for i in row):
-                raise ValueError('Calibration table data must be of type int or float')
-
-
-        #Check that these are all increasing values
-        hal_values = [row[0] for row in data_main]
-        gui_values = [row[1] for row in data_main]
-
-        hal_is_increasing = all(i < j for i, j in zip(hal_values, hal_values[1:]))
-        gui_is_increasing = all(i < j for i, j in zip(gui_values, gui_values[1:]))
-        gui_is_decreasing = all(i > j for i, j in zip(gui_values, gui_values[1:]))
-
-        if not (hal_is_increasing):
-            raise ValueError('Calibration table hal values must increasing in order')
-
-        if not (gui_is_increasing ^ gui_is_decreasing):
-            raise ValueError('Calibration table gui values must ordered either increasing or decreasing')
-
+        data_main = validatedDataArray(data)
 
         #Set the data now
         self.beginResetModel()
-        for i, row in enumerate(data_main):
-            data_main[i][0] = float(row[0])
-            data_main[i][1] = float(row[1])
-
-        self._data = copy.deepcopy(data_main)
+        self._data = data_main
         self.endResetModel()
 
 
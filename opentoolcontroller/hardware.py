@@ -25,6 +25,7 @@ class HalReaderGroup():
         self._hal_config_file = '/hal/hal_config.hal'
         self._hal_exists = False
         self._hal_readers = []
+        self._historian = None
         self._running = False
 
         try:
@@ -45,6 +46,19 @@ class HalReaderGroup():
         for i, period_ms in enumerate(self._hal_reader_periods_ms):
             self._hal_readers.append(HalReader(period_ms, i))
 
+        for reader in self._hal_readers:
+            reader.setHistorian(self._historian)
+
+    #Every sampled value gets recorded, see Historian
+    def setHistorian(self, historian):
+        self._historian = historian
+
+        for reader in self._hal_readers:
+            reader.setHistorian(historian)
+
+    def historian(self):
+        return self._historian
+
 
 
     def setupHal(self):
@@ -200,6 +214,10 @@ class HalReader():
         self._previous_stream = []
         self._running = False
 
+        self._historian = None
+        self._history = None #HistoryGroup with a column per sampled node
+        self._first_sample = None #(time, sample number) to convert sample numbers to times
+
         self._sampler_cfg = ''
         self._streamer_cfg = ''
         self._connected_sampler_pins = ''
@@ -213,6 +231,9 @@ class HalReader():
     def model(self):
         return self._tool_model
 
+    def setHistorian(self, historian):
+        self._historian = historian
+
     def running(self):
         return self._running
 
@@ -228,6 +249,13 @@ class HalReader():
         if len(self._connected_streamer_pins) > 0:
             self._previous_stream = self.baseStream(self.streamerCFG())
 
+        if self._historian is not None and self._history is None:
+            names = []
+            for pin in self._connected_sampler_pins:
+                for index in self._connected_sampler_pins[pin]:
+                    names.append(self._tool_model.nodePath(index))
+            self._history = self._historian.addGroup(names)
+
         self.timer.start(self._hal_period_ms)
         self._running = True
 
@@ -408,6 +436,7 @@ class HalReader():
             data.pop(-1) #remove trailing b'\n'
             current_sample = int(data[0])
             data.pop(0)
+            sample_values = []
 
             #read pin value then send to model
             for i, pin in enumerate(self._connected_sampler_pins):
@@ -422,15 +451,30 @@ class HalReader():
                     val = float(data[i])
 
                 for index in self._connected_sampler_pins[pin]:
+                    sample_values.append(val)
                     if val != self._tool_model.data(index.siblingAtColumn(col.HAL_VALUE), QtCore.Qt.DisplayRole):
                         self._tool_model.setData(index.siblingAtColumn(col.HAL_VALUE), val)
                         #print("setting: ", 
                         #      index.internalPointer().name,  ': ', val, ' was ', 
                         #      self._tool_model.data(index.siblingAtColumn(col.HAL_VALUE), QtCore.Qt.DisplayRole))
 
+            if self._history is not None:
+                self._history.append(self.sampleTime(current_sample), sample_values)
+
         if number_reads > 1:
             print(number_reads, " sampler reads")
 
+        if self._historian is not None:
+            self._historian.spill()
+
+    #The sampler runs in the realtime thread so its sample count is a better clock than when the line is read
+    def sampleTime(self, sample_number):
+        if self._first_sample is None:
+            self._first_sample = (time.time(), sample_number)
+
+        first_time, first_number = self._first_sample
+        return first_time + (sample_number - first_number) * self._hal_period_ms / 1000.0
+
     def baseStream(self, cfg):
         stream = []
         for item in cfg:
@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+from threading import Thread
+from queue import Queue, Full
+import os
+import struct
+
+import numpy as np
+
+from opentoolcontroller.strings import defaults
+
+
+#Each block in a day file is a header, the column channel ids, the times then the values row by row
+BLOCK_HEADER = struct.Struct('<dII') #first time, rows, columns
+INDEX_DTYPE = np.dtype([('first_time', '<f8'), ('last_time', '<f8'), ('offset', '<i8')])
+
+
+class HistoryGroup():
+    '''Samples of the nodes read together by one HalReader, one ring buffer row per sample
+        - times and values are fixed size rings, the oldest samples are overwritten
+        - Every sample is also folded into min/max/mean buckets of bucket_s, kept in their own ring
+          so a trend covering hours doesn't need the full rate samples
+        - spillRows() hands over the samples added since the last call to be written to disk
+    '''
+
+    def __init__(self, names, capacity=None, bucket_s=None, bucket_capacity=None):
+        if capacity is None: capacity = defaults.HISTORY_SAMPLES
+        if bucket_s is None: bucket_s = defaults.HISTORY_BUCKET_S
+        if bucket_capacity is None: bucket_capacity = defaults.HISTORY_BUCKETS
+
+        self._names = list(names)
+        self._columns = {name: i for i, name in enumerate(self._names)}
+        columns = len(self._names)
+
+        self._times = np.zeros(capacity)
+        self._values = np.zeros((capacity, columns))
+        self._total = 0 #samples ever added, the next one goes in row total % capacity
+        self._spilled = 0 #total when spillRows was last called
+
+        self._bucket_s = float(bucket_s)
+        self._bucket_times = np.zeros(bucket_capacity)
+        self._bucket_mins = np.zeros((bucket_capacity, columns))
+        self._bucket_maxs = np.zeros((bucket_capacity, columns))
+        self._bucket_means = np.zeros((bucket_capacity, columns))
+        self._bucket_total = 0
+
+        #The bucket being filled
+        self._bucket_start = None
+        self._bucket_min = np.zeros(columns)
+        self._bucket_max = np.zeros(columns)
+        self._bucket_sum = np.zeros(columns)
+        self._bucket_count = 0
+
+    def names(self):
+        return self._names
+
+    def hasName(self, name):
+        return name in self._columns
+
+    def sampleCount(self):
+        return min(self._total, len(self._times))
+
+    def append(self, sample_time, values):
+        row = self._total % len(self._times)
+        self._times[row] = sample_time
+        self._values[row] = values
+        self._total += 1
+
+        values = self._values[row]
+        if self._bucket_start is None or sample_time >= self._bucket_start + self._bucket_s:
+            self._closeBucket()
+            self._bucket_start = sample_time - sample_time % self._bucket_s
+            self._bucket_min[:] = values
+            self._bucket_max[:] = values
+            self._bucket_sum[:] = values
+            self._bucket_count = 1
+
+        else:
+            np.minimum(self._bucket_min, values, out=self._bucket_min)
+            np.maximum(self._bucket_max, values, out=self._bucket_max)
+            self._bucket_sum += values
+            self._bucket_count += 1
+
+    #Time of the oldest sample still in the ring or None
+    def firstTime(self):
+        if self._total == 0:
+            return None
+        return self._times[self._ringRows(self._times, self._total)[0]]
+
+    #Returns (times, values) oldest first for the samples still in the ring
+    def samples(self, name, start=None, end=None):
+        rows = self._ringRows(self._times, self._total, start, end)
+        return self._times[rows], self._values[rows, self._columns[name]]
+
+    #Returns (times, mins, maxs, means) oldest first, the bucket being filled is included
+    def buckets(self, name, start=None, end=None):
+        column = self._columns[name]
+        rows = self._ringRows(self._bucket_times, self._bucket_total, start, end)
+
+        times = self._bucket_times[rows]
+        mins = self._bucket_mins[rows, column]
+        maxs = self._bucket_maxs[rows, column]
+        means = self._bucket_means[rows, column]
+
+        if self._bucket_count > 0 and (start is None or self._bucket_start >= start) and (end is None or self._bucket_start <= end):
+            times = np.append(times, self._bucket_start)
+            mins = np.append(mins, self._bucket_min[column])
+            maxs = np.append(maxs, self._bucket_max[column])
+            means = np.append(means, self._bucket_sum[column] / self._bucket_count)
+
+        return times, mins, maxs, means
+
+    #Returns (times, values) for the samples added since the last call, samples overwritten before
+    #they could be spilled are skipped
+    def spillRows(self):
+        capacity = len(self._times)
+        first = max(self._spilled, self._total - capacity)
+        rows = np.arange(first, self._total) % capacity
+        self._spilled = self._total
+        return self._times[rows], self._values[rows]
+
+    def _closeBucket(self):
+        if self._bucket_count == 0:
+            return
+
+        row = self._bucket_total % len(self._bucket_times)
+        self._bucket_times[row] = self._bucket_start
+        self._bucket_mins[row] = self._bucket_min
+        self._bucket_maxs[row] = self._bucket_max
+        self._bucket_means[row] = self._bucket_sum / self._bucket_count
+        self._bucket_total += 1
+        self._bucket_count = 0
+
+    #Ring rows oldest first with times between start and end, the ring is two sorted runs
+    #so each is searched on its own instead of putting the whole ring in order first
+    def _ringRows(self, times, total, start=None, end=None):
+        capacity = len(times)
+        if total <= capacity:
+            runs = [(0, total)]
+        else:
+            head = total % capacity
+            runs = [(head, capacity), (0, head)]
+
+        rows = []
+        for first, last in runs:
+            run = times[first:last]
+            low = 0 if start is None else np.searchsorted(run, start, 'left')
+            high = len(run) if end is None else np.searchsorted(run, end, 'right')
+            rows.append(np.arange(first + low, first + high))
+
+        return np.concatenate(rows)
+
+
+class HistoryFile():
+    '''One day of spilled samples, history_dir/history_YYYY_MM_DD with .bin, .idx and .channels files
+        - .bin is append only blocks, see BLOCK_HEADER
+        - .idx has the first and last time and byte offset of each block so a time range only reads
+          the blocks it overlaps
+        - .channels has one node name per line, the line number is the channel id used in the blocks
+    '''
+
+    def __init__(self, path):
+        self._path = path
+        self._channel_ids = None
+
+    def path(self):
+        return self._path
+
+    def channelIds(self):
+        if self._channel_ids is None:
+            self._channel_ids = {}
+            try:
+                with open(self._path + '.channels') as f:
+                    for i, name in enumerate(f.read().splitlines()):
+                        self._channel_ids[name] = i
+            except OSError:
+                pass
+
+        return self._channel_ids
+
+    def appendBlock(self, names, times, values):
+        if len(times) == 0:
+            return
+
+        channel_ids = self.channelIds()
+        new_names = [name for name in names if name not in channel_ids]
+        if new_names:
+            with open(self._path + '.channels', 'a') as f:
+                for name in new_names:
+                    channel_ids[name] = len(channel_ids)
+                    f.write(name + '\n')
+
+        ids = np.array([channel_ids[name] for name in names], dtype='<u4')
+        times = np.ascontiguousarray(times, dtype='<f8')
+        values = np.ascontiguousarray(values, dtype='<f8')
+
+        with open(self._path + '.bin', 'ab') as f:
+            offset = f.tell()
+            f.write(BLOCK_HEADER.pack(times[0], len(times), len(ids)))
+            f.write(ids.tobytes())
+            f.write(times.tobytes())
+            f.write(values.tobytes())
+
+        entry = np.array([(times[0], times[-1], offset)], dtype=INDEX_DTYPE)
+        with open(self._path + '.idx', 'ab') as f:
+            f.write(entry.tobytes())
+
+    #Returns (times, values) for the node between start and end timestamps, either can be None
+    def read(self, name, start=None, end=None):
+        channel_id = self.channelIds().get(name)
+        if channel_id is None:
+            return np.zeros(0), np.zeros(0)
+
+        try:
+            index = np.fromfile(self._path + '.idx', dtype=INDEX_DTYPE)
+        except OSError:
+            return np.zeros(0), np.zeros(0)
+
+        low  = -np.inf if start is None else start
+        high =  np.inf if end is None else end
+        blocks = index[(index['last_time'] >= low) & (index['first_time'] <= high)]
+
+        all_times = []
+        all_values = []
+        with open(self._path + '.bin', 'rb') as f:
+            for offset in blocks['offset']:
+                f.seek(offset)
+                first_time, rows, columns = BLOCK_HEADER.unpack(f.read(BLOCK_HEADER.size))
+                ids = np.frombuffer(f.read(4*columns), dtype='<u4')
+
+                matching = np.nonzero(ids == channel_id)[0]
+                if len(matching) == 0:
+                    continue
+
+                times = np.frombuffer(f.read(8*rows), dtype='<f8')
+                values = np.frombuffer(f.read(8*rows*columns), dtype='<f8').reshape(rows, columns)[:, matching[0]]
+
+                keep = (times >= low) & (times <= high)
+                all_times.append(times[keep])
+                all_values.append(values[keep])
+
+        if not all_times:
+            return np.zeros(0), np.zeros(0)
+
+        times = np.concatenate(all_times)
+        values = np.concatenate(all_values)
+        order = np.argsort(times, kind='stable') #Blocks from different readers interleave
+        return times[order], values[order]
+
+
+class Historian():
+    '''Keeps the recent values of the HAL nodes and spills everything to a file per day
+        - Each HalReader gets a HistoryGroup with a column per node it samples
+        - spill() is called from the reader timers, at most once every spill_period_s it queues the
+          new samples of every group for a background thread so the gui never waits on the disk
+        - A block is written to the file of the day its first sample is in
+    '''
+
+    FILE_PREFIX = 'history_'
+
+    def __init__(self, history_dir, spill_period_s=None, max_queue_size=100):
+        if spill_period_s is None: spill_period_s = defaults.HISTORY_SPILL_PERIOD_S
+
+        self._history_dir = history_dir
+        self._spill_period_s = spill_period_s
+        self._last_spill = None
+        self._groups = []
+        self._files = {} #day: HistoryFile, only used by the writer thread
+        self._dropped_blocks = 0
+
+        self._queue = Queue(maxsize=max_queue_size)
+        self._thread = Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def addGroup(self, names):
+        group = HistoryGroup(names)
+        self._groups.append(group)
+        return group
+
+    def groups(self):
+        return self._groups
+
+    def group(self, name):
+        for group in self._groups:
+            if group.hasName(name):
+                return group
+        return None
+
+    def samples(self, name, start=None, end=None):
+        group = self.group(name)
+        if group is None:
+            return np.zeros(0), np.zeros(0)
+        return group.samples(name, start, end)
+
+    def buckets(self, name, start=None, end=None):
+        group = self.group(name)
+        if group is None:
+            return np.zeros(0), np.zeros(0), np.zeros(0), np.zeros(0)
+        return group.buckets(name, start, end)
+
+    def firstSampleTime(self, name):
+        group = self.group(name)
+        if group is None:
+            return None
+        return group.firstTime()
+
+    def historyFile(self, day):
+        return HistoryFile(self._history_dir + '/' + self.FILE_PREFIX + day)
+
+    def dayOf(self, timestamp):
+        return datetime.fromtimestamp(timestamp).strftime('%Y_%m_%d')
+
+    #Spilled samples between start and end timestamps, only the day files in the range are read
+    def read(self, name, start, end):
+        all_times = []
+        all_values = []
+
+        day = datetime.fromtimestamp(start).date()
+        while day <= datetime.fromtimestamp(end).date():
+            times, values = self.historyFile(day.strftime('%Y_%m_%d')).read(name, start, end)
+            all_times.append(times)
+            all_values.append(values)
+            day += timedelta(days=1)
+
+        return np.concatenate(all_times), np.concatenate(all_values)
+
+    def spill(self, now=None, force=False):
+        if now is None:
+            now = datetime.now().timestamp()
+
+        if not force and self._last_spill is not None and now - self._last_spill < self._spill_period_s:
+            return
+        self._last_spill = now
+
+        for group in self._groups:
+            times, values = group.spillRows()
+            if len(times) > 0:
+                try:
+                    self._queue.put_nowait((group.names(), times, values))
+                except Full:
+                    self._dropped_blocks += 1
+
+    #Blocks until everything queued so far has been written
+    def flush(self):
+        if self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        self.spill(force=True)
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+        if self._dropped_blocks > 0:
+            print("Historian dropped", self._dropped_blocks, "blocks")
+
+    def _run(self):
+        while True:
+            block = self._queue.get()
+            if block is None:
+                self._queue.task_done()
+                return
+
+            names, times, values = block
+            try:
+                os.makedirs(self._history_dir, exist_ok=True)
+                day = self.dayOf(times[0])
+                if day not in self._files:
+                    self._files[day] = self.historyFile(day)
+                self._files[day].appendBlock(names, times, values)
+
+            except OSError as e:
+                print("Failed to write history")
+                print(e)
+
+            self._queue.task_done()
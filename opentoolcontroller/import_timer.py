@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import sys
+import time
+
+
+class ImportTimer():
+    '''Times every module imported while it's installed, for --StartupReport
+        - It sits first in sys.meta_path, finds the spec through the finders after it and wraps
+          the loader so create_module and exec_module are timed, an extension module does most of
+          its work in create_module
+        - Like python -X importtime each module gets its cumulative time and its self time, which
+          leaves out the modules it imported
+    '''
+
+    def __init__(self):
+        self._times = {} #name: (self time, cumulative time) in seconds
+        self._stack = [] #[name, start, time of the modules it imported]
+        self._finding = False
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def times(self):
+        return dict(self._times)
+
+    def find_spec(self, name, path, target=None):
+        if self._finding:
+            return None
+
+        self._finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding = False
+
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = TimedLoader(spec.loader, name, self)
+        return spec
+
+    def start(self, name):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def stop(self):
+        name, start, children = self._stack.pop()
+        total = time.perf_counter() - start
+        self._times[name] = (total - children, total)
+        if self._stack:
+            self._stack[-1][2] += total
+
+    #Lines for the count slowest modules by self time
+    def report(self, count=15):
+        lines = ['  self ms   total ms  module']
+        slowest = sorted(self._times.items(), key=lambda item: item[1][0], reverse=True)
+        for name, (self_time, total) in slowest[:count]:
+            lines.append('%8.1f   %8.1f  %s' % (self_time*1000, total*1000, name))
+        return lines
+
+
+class TimedLoader():
+    '''Loader wrapper for the ImportTimer, the timer starts in create_module and stops after exec_module,
+       anything else goes to the wrapped loader'''
+
+    def __init__(self, loader, name, timer):
+        self._loader = loader
+        self._name = name
+        self._timer = timer
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        self._timer.start(self._name)
+        try:
+            return getattr(self._loader, 'create_module', lambda spec: None)(spec)
+        except BaseException:
+            self._timer.stop()
+            raise
+
+    def exec_module(self, module):
+        #The module keeps the real loader so get_data and tracebacks don't go through here
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer.stop()
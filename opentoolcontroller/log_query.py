@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+import csv
+import json
+import os
+import sys
+
+
+LOG_TIME_FORMAT = "%m/%d/%Y, %H:%M:%S"
+
+
+def logRecords(f):
+    '''Yields (offset, raw bytes) for each csv record of a log opened in binary, a quoted field
+       can hold a newline so a record runs until its quotes are balanced'''
+    offset = f.tell()
+    record = b''
+    while True:
+        line = f.readline()
+        if not line:
+            return
+
+        if not line.endswith(b'\n'):
+            return #Partial record at the end of the file, it's picked up once the rest is written
+
+        record += line
+        if record.count(b'"') % 2 == 0:
+            yield offset, record
+            offset += len(record)
+            record = b''
+
+
+def parseRecord(record):
+    return next(csv.reader([record.decode()]))
+
+
+#Same as strptime with LOG_TIME_FORMAT, slicing is several times faster when indexing a whole month
+def parseLogTime(text):
+    if len(text) == 20 and text[2] == '/' and text[5] == '/' and text[10] == ',':
+        return datetime(int(text[6:10]), int(text[0:2]), int(text[3:5]), int(text[12:14]), int(text[15:17]), int(text[18:20]))
+    return datetime.strptime(text, LOG_TIME_FORMAT)
+
+
+def formatLogTime(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime(LOG_TIME_FORMAT)
+
+
+class LogFileIndex():
+    '''Sidecar index of a single monthly csv log, saved next to it as <log>.idx
+        - times and offsets are in file order, offsets are the byte position of each record
+        - postings are column: {value: array of record numbers}
+        - Only the part of the log written since the last update is read, if the log is
+          smaller than what's indexed it was replaced and the index is rebuilt
+    '''
+
+    VERSION = 2
+
+    def __init__(self, log_file, header, indexed_columns, time_column):
+        self._log_file = log_file
+        self._header = list(header)
+        self._indexed_columns = list(indexed_columns)
+        self._time_column = time_column
+        self.clear()
+
+    def clear(self):
+        self._size = 0
+        self._times = array('d')
+        self._offsets = array('q')
+        self._postings = {column: {} for column in self._indexed_columns}
+        self._sorted = True #True while the times are in order so a time range can be bisected
+
+    def indexFile(self):
+        return self._log_file + '.idx'
+
+    def logFile(self):
+        return self._log_file
+
+    def recordCount(self):
+        return len(self._offsets)
+
+    def offset(self, number):
+        return self._offsets[number]
+
+    #The index is a json line then the times, offsets and postings as raw arrays, nothing in it is executable,
+    #the json gives each posting's value and length in the order they're stored
+    def load(self):
+        try:
+            with open(self.indexFile(), 'rb') as f:
+                index = json.loads(f.readline())
+                if (index['version'] != self.VERSION or index['indexed_columns'] != self._indexed_columns
+                        or index['time_column'] != self._time_column or index['itemsize'] != array('l').itemsize):
+                    return
+
+                times = array('d')
+                offsets = array('q')
+                numbers = array('l')
+                times.fromfile(f, index['count'])
+                offsets.fromfile(f, index['count'])
+                numbers.fromfile(f, sum(length for column, value, length in index['postings']))
+
+            if index['byteorder'] != sys.byteorder:
+                times.byteswap()
+                offsets.byteswap()
+                numbers.byteswap()
+
+            postings = {column: {} for column in self._indexed_columns}
+            start = 0
+            for column, value, length in index['postings']:
+                postings[column][value] = numbers[start:start+length]
+                start += length
+
+            self._size = index['size']
+            self._times = times
+            self._offsets = offsets
+            self._postings = postings
+            self._sorted = index['sorted']
+
+        except Exception:
+            self.clear()
+
+    def save(self):
+        index = {'version': self.VERSION,
+                 'indexed_columns': self._indexed_columns,
+                 'time_column': self._time_column,
+                 'size': self._size,
+                 'count': len(self._offsets),
+                 'byteorder': sys.byteorder,
+                 'itemsize': array('l').itemsize,
+                 'sorted': self._sorted,
+                 'postings': [[column, value, len(numbers)] for column, values in self._postings.items()
+                                                            for value, numbers in values.items()]}
+
+        tmp_file = self.indexFile() + '.tmp'
+        try:
+            with open(tmp_file, 'wb') as f:
+                f.write(json.dumps(index).encode() + b'\n')
+                self._times.tofile(f)
+                self._offsets.tofile(f)
+                for column, values in self._postings.items():
+                    for numbers in values.values():
+                        numbers.tofile(f)
+            os.replace(tmp_file, self.indexFile())
+
+        except OSError as e:
+            print("Failed to save log index", self.indexFile())
+            print(e)
+
+    #Indexes anything written since the last update, returns True if the index changed
+    def update(self):
+        try:
+            size = os.path.getsize(self._log_file)
+        except OSError:
+            return False
+
+        if size == self._size:
+            return False
+
+        if size < self._size:
+            self.clear()
+
+        with open(self._log_file, 'rb') as f:
+            f.seek(self._size)
+            for offset, record in logRecords(f):
+                self._size = offset + len(record)
+                self._indexRecord(offset, record)
+
+        return True
+
+    #Record numbers in file order between start and end datetimes, either can be None
+    def numbers(self, start=None, end=None, column_values={}):
+        low  = float('-inf') if start is None else start.timestamp()
+        high = float('inf')  if end is None else end.timestamp()
+
+        postings = []
+        for column, value in column_values.items():
+            postings.append(self._postings[column].get(value, ()))
+
+        if postings:
+            postings.sort(key=len)
+            others = [set(p) for p in postings[1:]]
+            times = self._times
+            return [n for n in postings[0] if low <= times[n] <= high and all(n in p for p in others)]
+
+        if self._sorted:
+            return range(bisect_left(self._times, low), bisect_right(self._times, high))
+
+        return [n for n, t in enumerate(self._times) if low <= t <= high]
+
+    def _indexRecord(self, offset, record):
+        try:
+            row = parseRecord(record)
+        except (UnicodeDecodeError, csv.Error, StopIteration):
+            return
+
+        if row == self._header:
+            return
+
+        try:
+            time = parseLogTime(row[self._time_column]).timestamp()
+        except (IndexError, ValueError):
+            return
+
+        number = len(self._offsets)
+        if self._times and time < self._times[-1]:
+            self._sorted = False
+
+        self._times.append(time)
+        self._offsets.append(offset)
+
+        for column, values in self._postings.items():
+            if column < len(row):
+                values.setdefault(row[column], array('l')).append(number)
+
+
+class LogQueryResult():
+    '''Locations of the rows a query matched, newest first, rows are only read when asked for'''
+
+    def __init__(self, locations):
+        self._locations = locations #[(log file, offset)]
+
+    def __len__(self):
+        return len(self._locations)
+
+    def rows(self, start, count):
+        rows = []
+        files = {}
+        try:
+            for log_file, offset in self._locations[start:start+count]:
+                if log_file not in files:
+                    files[log_file] = open(log_file, 'rb')
+
+                f = files[log_file]
+                f.seek(offset)
+                for record_offset, record in logRecords(f):
+                    rows.append(parseRecord(record))
+                    break
+
+        except OSError as e:
+            print("Failed to read log")
+            print(e)
+
+        finally:
+            for f in files.values():
+                f.close()
+
+        return rows
+
+
+class LogQuery():
+    '''Queries the monthly csv logs of a LogWriter, log_dir/prefix_YYYY_MM.csv
+        - Only the files for the months in the time range are opened
+        - Each file gets a LogFileIndex so finding the rows for a system or device doesn't read the log
+    '''
+
+    def __init__(self, log_dir, prefix, header, indexed_columns=(), time_column=0):
+        self._log_dir = log_dir
+        self._prefix = prefix
+        self._header = header
+        self._indexed_columns = indexed_columns
+        self._time_column = time_column
+        self._indexes = {} #log file: LogFileIndex
+
+    def timeColumn(self):
+        return self._time_column
+
+    def logFiles(self, start=None, end=None):
+        try:
+            names = os.listdir(self._log_dir)
+        except OSError:
+            return []
+
+        first = '' if start is None else start.strftime('%Y_%m')
+        last  = '9999_99' if end is None else end.strftime('%Y_%m')
+
+        log_files = []
+        for name in sorted(names):
+            if name.startswith(self._prefix + '_') and name.endswith('.csv'):
+                month = name[len(self._prefix)+1:-4]
+                if first <= month <= last:
+                    log_files.append(self._log_dir + '/' + name)
+
+        return log_files
+
+    def fileIndex(self, log_file):
+        if log_file not in self._indexes:
+            index = LogFileIndex(log_file, self._header, self._indexed_columns, self._time_column)
+            index.load()
+            self._indexes[log_file] = index
+
+        index = self._indexes[log_file]
+        if index.update():
+            index.save()
+
+        return index
+
+    #column_values is {column: value} for indexed columns, returns a LogQueryResult newest first
+    def query(self, start=None, end=None, column_values={}):
+        locations = []
+        for log_file in reversed(self.logFiles(start, end)):
+            index = self.fileIndex(log_file)
+            numbers = index.numbers(start, end, column_values)
+            locations += [(log_file, index.offset(n)) for n in reversed(numbers)]
+
+        return LogQueryResult(locations)
+
+
+class LogPager():
+    '''Pages backwards through the logs of a LogQuery from the oldest rows a model holds in memory
+        - The first page queries up to the second the oldest held row was logged, held rows logged in
+          that second are the newest records of the result and are skipped by comparing their text
+        - Later pages read on through the same result by offset, so rows dropped from memory or logged
+          after paging started can't shift which records come next
+    '''
+
+    def __init__(self, log_query):
+        self._log_query = log_query
+        self._result = None
+        self._next = 0
+
+    #held_rows are the oldest rows in memory as they're logged, oldest first, returns rows newest first
+    def page(self, count, held_rows=()):
+        if self._result is None:
+            self.start(held_rows)
+
+        rows = self._result.rows(self._next, count)
+        self._next += len(rows)
+        return rows
+
+    def start(self, held_rows=()):
+        time_column = self._log_query.timeColumn()
+        boundary = None
+        held = []
+        for row in held_rows:
+            if boundary is None:
+                boundary = row[time_column]
+            elif row[time_column] != boundary:
+                break
+            held.append(list(row))
+
+        self._next = 0
+        if boundary is None:
+            self._result = self._log_query.query()
+            return
+
+        self._result = self._log_query.query(end=parseLogTime(boundary))
+        for row in self._result.rows(0, len(held)):
+            if row not in held:
+                break
+            held.remove(row)
+            self._next += 1
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+
+class LogStore():
+    '''Bounded in memory rows for the alert and action logs, oldest first
+        - Each row keeps the same id while it's stored, see position() and rowId()
+        - Once the store is trim_size rows past its limit the oldest rows get dropped, the model asks for
+          overflow() and removes them from the view before calling trim()
+        - Rows paged in from the csv are prepended ahead of the live rows and don't count against the limit,
+          trim() drops the oldest live rows after them so what the user paged in stays in view
+        - Paged rows have a limit of their own, past it pagedOverflow() of the newest paged rows are
+          dropped by trimPaged() so paging keeps moving back through the logs
+        - Live row ids count up from 0 and paged row ids count down from -1, an id is never
+          given out twice so a callback holding the id of a dropped row finds nothing
+        - indexed_columns keep value -> ids, text_columns are split into trigrams so a search only
+          checks the rows holding every trigram of the search text
+        - cell_text(row, column) gives the text searched for a cell, for rows that don't store
+          the displayed string like a timestamp, it defaults to str() of the value
+    '''
+
+    def __init__(self, retention, indexed_columns=(), text_columns=(), cell_text=None):
+        self._rows = [] #Paged rows oldest first then the live rows oldest first
+        self._first_id = 0 #Id of the first live row
+        self._first_paged_id = 0
+        self._min_id = 0 #Lowest id given out so far, paged rows are numbered below it
+        self._retention = int(retention)
+        self._paged = 0
+        self._trim_size = max(1, self._retention // 10)
+
+        self._text_columns = text_columns
+        self._cell_text = cell_text if cell_text is not None else lambda row, column: str(row[column])
+        self._column_index = {column: {} for column in indexed_columns} #column: {value: set(ids)}
+        self._trigram_index = {} #trigram: set(ids)
+
+    def rowCount(self):
+        return len(self._rows)
+
+    def row(self, position):
+        return self._rows[position]
+
+    def rows(self):
+        return self._rows
+
+    #Paged rows are at the front, the live rows start at this position
+    def pagedCount(self):
+        return self._paged
+
+    #Lowest id stored, rows paged in later get lower ids
+    def firstId(self):
+        return self._first_paged_id if self._paged else self._first_id
+
+    def nextId(self):
+        return self._first_id + len(self._rows) - self._paged
+
+    def rowId(self, position):
+        if position < self._paged:
+            return self._first_paged_id + position
+        return self._first_id + position - self._paged
+
+    #Returns None if the row has been dropped
+    def position(self, row_id):
+        if self._first_id <= row_id < self.nextId():
+            return row_id - self._first_id + self._paged
+
+        if self._first_paged_id <= row_id < self._first_paged_id + self._paged:
+            return row_id - self._first_paged_id
+
+        return None
+
+    def append(self, row):
+        row_id = self.nextId()
+        self._rows.append(row)
+        self._indexRow(row_id, row)
+        return row_id
+
+    #rows are oldest first and older than any stored
+    def prepend(self, rows):
+        self._min_id -= len(rows)
+        self._first_paged_id = self._min_id
+        self._rows[0:0] = rows
+        self._paged += len(rows)
+
+        for i, row in enumerate(rows):
+            self._indexRow(self._first_paged_id + i, row)
+
+    #Number of old live rows that should be dropped, 0 until there's a full trim_size past the limit
+    def overflow(self):
+        count = len(self._rows) - (self._retention + self._paged)
+        if count >= self._trim_size:
+            return count
+        return 0
+
+    #Drops the oldest count live rows, they're at positions pagedCount() to pagedCount() + count - 1
+    def trim(self, count):
+        for i in range(count):
+            self._unindexRow(self._first_id + i, self._rows[self._paged + i])
+
+        del self._rows[self._paged:self._paged + count]
+        self._first_id += count
+
+    #Number of the newest paged rows past the limit, they're at positions pagedCount() - count to pagedCount() - 1
+    def pagedOverflow(self):
+        return max(0, self._paged - self._retention)
+
+    def trimPaged(self, count):
+        first = self._paged - count
+        for i in range(first, self._paged):
+            self._unindexRow(self._first_paged_id + i, self._rows[i])
+
+        del self._rows[first:self._paged]
+        self._paged = first
+
+    def ids(self, column, value):
+        return set(self._column_index[column].get(value, ()))
+
+    #Ids of the rows with text in any one of the text columns, case sensitive like QSortFilterProxyModel
+    def matchingIds(self, text):
+        if len(text) < 3:
+            candidates = [self.rowId(position) for position in range(len(self._rows))]
+
+        else:
+            postings = []
+            for trigram in self._trigrams(text):
+                if trigram not in self._trigram_index:
+                    return set()
+                postings.append(self._trigram_index[trigram])
+
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for ids in postings[1:]:
+                candidates &= ids
+
+        matches = set()
+        for row_id in candidates:
+            row = self._rows[self.position(row_id)]
+            if any(text in self._cell_text(row, column) for column in self._text_columns):
+                matches.add(row_id)
+
+        return matches
+
+    def matches(self, row_id, text=None, column_values={}):
+        row = self._rows[self.position(row_id)]
+
+        if text and not any(text in self._cell_text(row, column) for column in self._text_columns):
+            return False
+
+        for column, value in column_values.items():
+            if row[column] != value:
+                return False
+
+        return True
+
+
+    def _trigrams(self, text):
+        return set(text[i:i+3] for i in range(len(text)-2))
+
+    def _rowTrigrams(self, row):
+        trigrams = set()
+        for column in self._text_columns:
+            trigrams |= self._trigrams(self._cell_text(row, column))
+        return trigrams
+
+    def _indexRow(self, row_id, row):
+        for column, index in self._column_index.items():
+            index.setdefault(row[column], set()).add(row_id)
+
+        for trigram in self._rowTrigrams(row):
+            self._trigram_index.setdefault(trigram, set()).add(row_id)
+
+    def _unindexRow(self, row_id, row):
+        for column, index in self._column_index.items():
+            ids = index[row[column]]
+            ids.discard(row_id)
+            if not ids:
+                del index[row[column]]
+
+        for trigram in self._rowTrigrams(row):
+            ids = self._trigram_index[trigram]
+            ids.discard(row_id)
+            if not ids:
+                del self._trigram_index[trigram]
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+from threading import Thread
+from queue import Queue, Full, Empty
+import csv
+import os
+
+
+class LogWriter():
+    '''Appends rows to a monthly csv log, log_dir/prefix_YYYY_MM.csv, from a background thread
+        - write() only queues the row so the gui thread never waits on the disk, rows are dropped
+          and counted if the queue fills up
+        - A drop is reported right away through the dropped callback, then at most once per
+          report_period_s with the total so a storm doesn't add to itself
+        - Rows are written in batches and flushed, fsync happens every fsync_period_s
+        - The file stays open until the month changes, the header is written when a new file is started
+        - close() writes everything still queued, it has to be called before the program exits
+    '''
+
+    def __init__(self, log_dir, prefix, header, max_queue_size=10000, fsync_period_s=5.0, report_period_s=10.0):
+        self._log_dir = log_dir
+        self._prefix = prefix
+        self._header = header
+        self._fsync_period_s = fsync_period_s
+        self._report_period_s = report_period_s
+
+        self._queue = Queue(maxsize=max_queue_size)
+        self._dropped_rows = 0
+        self._dropped_callback = None
+        self._last_report = None
+
+        self._file = None
+        self._csv_writer = None
+        self._month = None
+        self._last_fsync = datetime.now()
+
+        self._thread = Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def droppedRows(self):
+        return self._dropped_rows
+
+    #Called as callback(prefix, dropped_rows) from write(), so on the thread writing the rows
+    def setDroppedCallback(self, callback):
+        self._dropped_callback = callback
+
+    def logFile(self, month=None):
+        if month is None:
+            month = self.month()
+        return self._log_dir + '/' + self._prefix + '_' + month + '.csv'
+
+    def month(self):
+        return datetime.today().strftime('%Y_%m')
+
+    def write(self, row):
+        try:
+            self._queue.put_nowait(list(row))
+        except Full:
+            self._dropped_rows += 1
+            self._reportDropped()
+
+    def _reportDropped(self):
+        now = datetime.now()
+        if self._last_report is not None and (now - self._last_report).total_seconds() < self._report_period_s:
+            return
+
+        #Set first, the callback can log the report and drop it again
+        self._last_report = now
+        if self._dropped_callback is not None:
+            self._dropped_callback(self._prefix, self._dropped_rows)
+        else:
+            print("Log writer dropped", self._dropped_rows, "rows for", self._prefix)
+
+    #Blocks until everything queued so far has been written
+    def flush(self):
+        if self._thread.is_alive():
+            self._queue.join()
+
+    #Blocks until everything queued has been written, nothing is written after this
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+        if self._dropped_rows > 0:
+            print("Log writer dropped", self._dropped_rows, "rows for", self._prefix)
+
+    def _run(self):
+        running = True
+        while running:
+            try:
+                rows = [self._queue.get(timeout=self._fsync_period_s)]
+            except Empty:
+                rows = []
+
+            #Take whatever else is waiting so a burst is a single write
+            while True:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except Empty:
+                    break
+
+            taken = list(rows)
+            if None in rows:
+                rows = rows[:rows.index(None)]
+                running = False
+
+            try:
+                self._writeRows(rows)
+            except OSError as e:
+                print("Failed to write log", self.logFile())
+                print(e)
+
+            for i in range(len(taken)):
+                self._queue.task_done()
+
+        self._closeFile()
+
+    def _writeRows(self, rows):
+        if rows:
+            month = self.month()
+            if month != self._month:
+                self._openFile(month)
+
+            self._csv_writer.writerows(rows)
+            self._file.flush()
+
+        if self._file is not None and (datetime.now() - self._last_fsync).total_seconds() >= self._fsync_period_s:
+            os.fsync(self._file.fileno())
+            self._last_fsync = datetime.now()
+
+    def _openFile(self, month):
+        self._closeFile()
+
+        log_file = self.logFile(month)
+        is_new = not os.path.isfile(log_file)
+
+        self._file = open(log_file, 'a', newline='')
+        self._csv_writer = csv.writer(self._file)
+        self._month = month
+
+        if is_new:
+            self._csv_writer.writerow(self._header)
+
+    def _closeFile(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+        self._file = None
+        self._csv_writer = None
+        self._month = None
@@ -3,7 +3,8 @@
 Login system module for OpenToolController.
 Handles user authentication, session management and access control.
 """
-from PyQt5 import QtWidgets, QtCore, QtGui, uic
+from PyQt5 import QtWidgets, QtCore, QtGui
+from opentoolcontroller.ui_cache import loadUiType
 from datetime import datetime, timedelta
 from enum import IntEnum
 from typing import Optional, List, Tuple, Callable, Dict
@@ -12,7 +13,7 @@ import re
 import os
 import json
 
-login_base, login_form = uic.loadUiType("opentoolcontroller/views/Login.ui")
+login_base, login_form = loadUiType("opentoolcontroller/views/Login.ui")
 
 class UserPrivilege(IntEnum):
     """Enumeration of user privilege types"""
@@ -2,29 +2,62 @@
 # -.- coding: utf-8 -.-
 import sys, json, os
 import argparse
+import time
+
+import_start_time = time.perf_counter() #Before the heavy imports, for --StartupReport
+
+#Parsed before argparse so the imports below are timed
+import_timer = None
+if __name__ == '__main__' and ('-R' in sys.argv or '--StartupReport' in sys.argv):
+    from opentoolcontroller.import_timer import ImportTimer
+    import_timer = ImportTimer()
+    import_timer.install()
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 
 import xml.etree.ElementTree as ET
 from opentoolcontroller.tool_model import ToolModel, HalNode
-from opentoolcontroller.tool_editor import CommonEditor
-from opentoolcontroller.recipe_editor import RecipeEditor
 from opentoolcontroller.tool_control_view import ToolControlView
 from opentoolcontroller.alert_view import AlertView, AlertTableModel, ActionLogView, ActionLogTableModel
 from opentoolcontroller.login import LoginView, LoginModel
 
-from opentoolcontroller.bt_model import BTModel, BehaviorRunner
+from opentoolcontroller.bt_model import BTModel, BehaviorRunner, TickTimeWindow
 
 from opentoolcontroller.hardware import HalReaderGroup
+from opentoolcontroller.historian import Historian
 from opentoolcontroller.strings import defaults, col
 
 import gc, pprint
 
+import_end_time = time.perf_counter()
+
 # sudo halcompile --install opentoolcontroller/HAL/hardware_sim.comp
 # clear; pytest 'tests/test_device_control_view.py' -k 'test_two' -s
 
+class LazyDockWidget(QtWidgets.QDockWidget):
+    '''Dock whose widget is only built the first time it's shown, build() returns the widget'''
+
+    def __init__(self, title, object_name, build, parent=None):
+        super().__init__(title, parent, objectName=object_name)
+        self._build = build
+        self.visibilityChanged.connect(self.buildWidget)
+
+    def isBuilt(self):
+        return self._build is None
+
+    def buildWidget(self, visible=True):
+        if visible and self._build is not None:
+            build = self._build
+            self._build = None
+            self.setWidget(build())
+
+
 class Window(QtWidgets.QMainWindow):
-    def __init__(self, tool_dir, parent=None):
+    '''The docks other than Control are built the first time their tab is shown, their models are
+       created here so alerts and actions are recorded from the start. With editors=False the tool
+       and recipe editors aren't created at all, for the operator panels'''
+
+    def __init__(self, tool_dir, editors=True, parent=None):
         super().__init__()
 
         json_data = None
@@ -46,18 +79,22 @@ class Window(QtWidgets.QMainWindow):
 
         '''Add something to select where to save if we start a new one '''
         self._login_model = LoginModel(tool_auth_file)
-        self._login_view = LoginView(self._login_model)
-        self._login_view.setWindowTitle('Login')
-
         self._alert_model = AlertTableModel()
-        self._alert_view = AlertView(self._alert_model)
-        self._alert_view.setWindowTitle('Alerts')
-        self._login_model.addLoginChangedCallback(self._alert_view.enableClearAlerts, self._login_model.CLEAR_ALERTS)
-
         self._action_log_model = ActionLogTableModel()
         self._action_log_model.setCurrentUser(self._login_model.currentUser)
-        self._action_log_view = ActionLogView(self._action_log_model)
-        self._action_log_view.setWindowTitle('Action Log')
+        self._action_log_model.setLogDroppedCallback(self._alert_model.logDropped)
+
+        #Built by their docks
+        self._login_view = None
+        self._alert_view = None
+        self._action_log_view = None
+        self._tool_editor = None
+        self._recipe_editor = None
+
+        #The login view checks the session timeout, until it's built this does
+        self._session_timer = QtCore.QTimer(self)
+        self._session_timer.timeout.connect(self.checkSessionTimeout)
+        self._session_timer.start(60000)
 
 
         self.tool_model = ToolModel()
@@ -78,6 +115,12 @@ class Window(QtWidgets.QMainWindow):
         self.tool_model.loadBehaviors()
 
 
+        self._historian = None
+        if tool_dir:
+            self._historian = Historian(tool_dir + '/history')
+            self.reader_group.setHistorian(self._historian)
+            self.tool_model.setHistorian(self._historian)
+
         self.reader_group.buildReaders()
         self.reader_group.setModel(self.tool_model)
 
@@ -85,6 +128,7 @@ class Window(QtWidgets.QMainWindow):
         for i, period_ms in enumerate(gui_periods):
             self.behavior_runners.append(BehaviorRunner(period_ms, i))
         self.tool_model.setBehaviorRunners(self.behavior_runners)
+        self._tick_time_window = None
 
             
         '''FIXME '''
@@ -100,55 +144,27 @@ class Window(QtWidgets.QMainWindow):
         self._login_model.addLoginChangedCallback(self._control_view.enableRunDeviceBehaviors, self._login_model.RUN_BEHAVIORS)
         self._login_model.addLoginChangedCallback(self._control_view.enableEditBehaviors, self._login_model.EDIT_BEHAVIOR)
 
-        self._tool_editor = CommonEditor()
-        self._tool_editor.setModel(self.tool_model)
-        self._tool_editor.setWindowTitle('Tool Editor')
-        self._login_model.addLoginChangedCallback(self._tool_editor.enableEditTool, self._login_model.EDIT_TOOL)
-        self._login_model.addLoginChangedCallback(self._tool_editor.enableEditBehaviors, self._login_model.EDIT_BEHAVIOR)
-
-        dock1 = QtWidgets.QDockWidget('Control', self, objectName='control')
-        dock1.setWidget(self._control_view)
-        dock1.setContextMenuPolicy(QtCore.Qt.PreventContextMenu)
-
-        dock2 = QtWidgets.QDockWidget('Tool Editor', self, objectName='editor')
-        dock2.setWidget(self._tool_editor)
-        dock2.setContextMenuPolicy(QtCore.Qt.PreventContextMenu)
-
-        dock3 = QtWidgets.QDockWidget('Alerts', self, objectName='alerts')
-        dock3.setWidget(self._alert_view)
-        dock3.setContextMenuPolicy(QtCore.Qt.PreventContextMenu)
-
-        dock4 = QtWidgets.QDockWidget('Login', self, objectName='login')
-        dock4.setWidget(self._login_view)
-        dock4.setContextMenuPolicy(QtCore.Qt.PreventContextMenu)
-        
-        dock5 = QtWidgets.QDockWidget('Action Log', self, objectName='action_log')
-        dock5.setWidget(self._action_log_view)
-        dock5.setContextMenuPolicy(QtCore.Qt.PreventContextMenu)
-
-        self._recipe_editor = RecipeEditor()
-        self._recipe_editor.setModel(self.tool_model)
-        dock6 = QtWidgets.QDockWidget('Recipe Editor', self, objectName='recipe_editor')
-        dock6.setWidget(self._recipe_editor)
-        dock6.setContextMenuPolicy(QtCore.Qt.PreventContextMenu)
-
-        dock1.setFeatures(QtWidgets.QDockWidget.DockWidgetFloatable | QtWidgets.QDockWidget.DockWidgetMovable)
-        dock2.setFeatures(QtWidgets.QDockWidget.DockWidgetFloatable | QtWidgets.QDockWidget.DockWidgetMovable)
-        dock3.setFeatures(QtWidgets.QDockWidget.DockWidgetFloatable | QtWidgets.QDockWidget.DockWidgetMovable)
-        dock4.setFeatures(QtWidgets.QDockWidget.DockWidgetFloatable | QtWidgets.QDockWidget.DockWidgetMovable)
-        dock5.setFeatures(QtWidgets.QDockWidget.DockWidgetFloatable | QtWidgets.QDockWidget.DockWidgetMovable)
-        dock6.setFeatures(QtWidgets.QDockWidget.DockWidgetFloatable | QtWidgets.QDockWidget.DockWidgetMovable)
-
-        self.addDockWidget(QtCore.Qt.TopDockWidgetArea, dock1)
-        self.addDockWidget(QtCore.Qt.TopDockWidgetArea, dock2)
-        self.addDockWidget(QtCore.Qt.TopDockWidgetArea, dock3)
-        self.addDockWidget(QtCore.Qt.TopDockWidgetArea, dock4)
-        self.addDockWidget(QtCore.Qt.TopDockWidgetArea, dock5)
-        self.tabifyDockWidget(dock1, dock2)
-        self.tabifyDockWidget(dock2, dock3)
-        self.tabifyDockWidget(dock3, dock4)
-        self.tabifyDockWidget(dock4, dock5)
-        self.tabifyDockWidget(dock5, dock6)
+        control_dock = QtWidgets.QDockWidget('Control', self, objectName='control')
+        control_dock.setWidget(self._control_view)
+
+        docks = [control_dock]
+        if editors:
+            docks.append(LazyDockWidget('Tool Editor', 'editor', self.buildToolEditor, self))
+        docks.append(LazyDockWidget('Alerts', 'alerts', self.buildAlertView, self))
+        docks.append(LazyDockWidget('Login', 'login', self.buildLoginView, self))
+        docks.append(LazyDockWidget('Action Log', 'action_log', self.buildActionLogView, self))
+        if editors:
+            docks.append(LazyDockWidget('Recipe Editor', 'recipe_editor', self.buildRecipeEditor, self))
+
+        for dock in docks:
+            dock.setContextMenuPolicy(QtCore.Qt.PreventContextMenu)
+            dock.setFeatures(QtWidgets.QDockWidget.DockWidgetFloatable | QtWidgets.QDockWidget.DockWidgetMovable)
+            self.addDockWidget(QtCore.Qt.TopDockWidgetArea, dock)
+
+        for first, second in zip(docks, docks[1:]):
+            self.tabifyDockWidget(first, second)
+        control_dock.raise_()
+        self._docks = docks
         self.setDockNestingEnabled(True) #needed for left/right arranging
 
 
@@ -215,6 +231,54 @@ class Window(QtWidgets.QMainWindow):
         self._login_model.runLoginChangedCallbacks()
 
 
+    def docks(self):
+        return self._docks
+
+    def buildLoginView(self):
+        self._login_view = LoginView(self._login_model)
+        self._login_view.setWindowTitle('Login')
+        return self._login_view
+
+    def buildAlertView(self):
+        self._alert_view = AlertView(self._alert_model)
+        self._alert_view.setWindowTitle('Alerts')
+        self._login_model.addLoginChangedCallback(self._alert_view.enableClearAlerts, self._login_model.CLEAR_ALERTS)
+        self._login_model.runLoginChangedCallbacks()
+        return self._alert_view
+
+    def buildActionLogView(self):
+        self._action_log_view = ActionLogView(self._action_log_model)
+        self._action_log_view.setWindowTitle('Action Log')
+        return self._action_log_view
+
+    #The editors are imported here so operator panels never load them
+    def buildToolEditor(self):
+        from opentoolcontroller.tool_editor import CommonEditor
+        self._tool_editor = CommonEditor()
+        self._tool_editor.setModel(self.tool_model)
+        self._tool_editor.setWindowTitle('Tool Editor')
+        self._login_model.addLoginChangedCallback(self._tool_editor.enableEditTool, self._login_model.EDIT_TOOL)
+        self._login_model.addLoginChangedCallback(self._tool_editor.enableEditBehaviors, self._login_model.EDIT_BEHAVIOR)
+        self._login_model.runLoginChangedCallbacks()
+        return self._tool_editor
+
+    def buildRecipeEditor(self):
+        from opentoolcontroller.recipe_editor import RecipeEditor
+        self._recipe_editor = RecipeEditor()
+        self._recipe_editor.setModel(self.tool_model)
+        return self._recipe_editor
+
+    def checkSessionTimeout(self):
+        if self._login_view is not None:
+            self._session_timer.stop() #The view has its own timer
+        elif self._login_model.is_session_expired():
+            self._login_model.logout()
+
+    def closeViews(self):
+        for view in [self._tool_editor, self._control_view, self._alert_view, self._recipe_editor]:
+            if view is not None:
+                view.close()
+
     def updateWindowTitle(self, _=None):
         """Update window title with app name and current user"""
         app_name = 'Open Tool Controller'
@@ -258,15 +322,16 @@ class Window(QtWidgets.QMainWindow):
 
     #fast close for testing
     def closeEvent(self, event):
-        self._tool_editor.close()
-        self._control_view.close()
-        self._alert_view.close()
-        self._recipe_editor.close()
+        self.closeViews()
         geometry = self.saveGeometry()
         self._settings.setValue('main_window_geometry', geometry)
         state = self.saveState()
         self._settings.setValue('main_window_state', state)
         self.reader_group.stop()
+        self._alert_model.closeLog()
+        self._action_log_model.closeLog()
+        if self._historian is not None:
+            self._historian.close()
         super().closeEvent(event)
 
     #normal close
@@ -276,14 +341,16 @@ class Window(QtWidgets.QMainWindow):
 
         if reply == QtWidgets.QMessageBox.Yes:
             self.reader_group.stop()
-            self._tool_editor.close()
-            self._control_view.close()
-            self._alert_view.close()
+            self.closeViews()
 
             geometry = self.saveGeometry()
             self._settings.setValue('main_window_geometry', geometry)
             state = self.saveState()
             self._settings.setValue('main_window_state', state)
+            self._alert_model.closeLog()
+            self._action_log_model.closeLog()
+            if self._historian is not None:
+                self._historian.close()
             super().closeEvent(event)
 
         else:
@@ -313,7 +380,10 @@ class Window(QtWidgets.QMainWindow):
             self._control_view.setMovableIcons(True)
 
     def launchTickTimeHistogram(self):
-        self.behavior_runner.launchHistogram()
+        if self._tick_time_window is None:
+            self._tick_time_window = TickTimeWindow(self.behavior_runners)
+        self._tick_time_window.show()
+        self._tick_time_window.raise_()
 
 
 
@@ -327,6 +397,8 @@ if __name__ == '__main__':
 
     parser.add_argument('tool_dir', help='The directory containing the tool definition.')
     parser.add_argument('-S', '--Start', action='store_true', help='Starts HAL reader on launch')
+    parser.add_argument('-O', '--Operator', action='store_true', help="Doesn't create the tool and recipe editors")
+    parser.add_argument('-R', '--StartupReport', action='store_true', help='Prints how long building the window and each import took, the slowest imports first')
     #TODO add option to start a tool behavior?
     #TODO add option to allow or not allow editing, maybe hide the editor tab, or hide it depending on login level
     #parser.add_argument('-v', '--verbose')
@@ -338,10 +410,19 @@ if __name__ == '__main__':
 
     app = QtWidgets.QApplication(sys.argv)
     app.setWindowIcon(QtGui.QIcon(os.path.join(os.path.dirname(__file__), 'resources/app_icon.svg')))
-    w = Window(tool_dir)
+    window_start_time = time.perf_counter()
+    w = Window(tool_dir, not args.Operator)
     if args.Start:
         w.startHalReader()
     w.show()
+
+    if args.StartupReport:
+        print("Imports: %.0f ms" % ((import_end_time - import_start_time)*1000))
+        print("Window:  %.0f ms" % ((time.perf_counter() - window_start_time)*1000))
+        import_timer.uninstall()
+        print("Slowest imports, including those made while building the window:")
+        for line in import_timer.report():
+            print(line)
     sys.exit(app.exec_())
 
 
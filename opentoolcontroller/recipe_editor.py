@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
-from PyQt5 import QtCore, QtGui, uic, QtWidgets
+from PyQt5 import QtCore, QtGui, QtWidgets
+from opentoolcontroller.ui_cache import loadUiType
 import os
 import json
 from pathlib import Path
@@ -12,7 +13,7 @@ from opentoolcontroller.views.widgets.recipe_variable_table import RecipeVariabl
 
 
 
-recipe_editor_base, recipe_editor_form = uic.loadUiType("opentoolcontroller/views/RecipeEditor.ui")
+recipe_editor_base, recipe_editor_form = loadUiType("opentoolcontroller/views/RecipeEditor.ui")
 
 
 
@@ -7,6 +7,26 @@ class tool():
 
 
 
+class alr():
+    #Alert types, the int is what the alert nodes send and what's stored in the alert rows
+    MESSAGE = 0
+    WARNING = 1
+    ALARM   = 2
+
+    NAMES = ['Message', 'Warning', 'Alarm']
+
+    def name(alert_type):
+        if alert_type in [0, 1, 2]:
+            return alr.NAMES[alert_type]
+        return ''
+
+    def alertType(name):
+        if name in alr.NAMES:
+            return alr.NAMES.index(name)
+        return None
+
+
+
 class bt():
     SUCCESS = 'SUCCESS' #1
     FAILURE = 'FAILURE' #2
@@ -233,3 +253,19 @@ class defaults():
 
     MAX_HAL_READERS      = 8 
 
+    LOG_RETENTION        = 5000 #Alert and action log rows kept in memory, older ones are paged in from the csv
+    LOG_PAGE_SIZE        = 500
+
+    ALERT_REPEAT_WINDOW_S  = 60 #The same alert raised again within this is counted on its existing row
+    ALERT_LOG_INTERVAL_S   = 10 #Repeats of an alert are written to the log at most once per interval
+
+    HISTORY_SAMPLES        = 6000 #Full rate samples kept in memory per HalReader, 10 minutes at 100ms
+    HISTORY_BUCKET_S       = 10   #Width of the min/max/mean buckets
+    HISTORY_BUCKETS        = 4320 #12 hours of buckets
+    HISTORY_SPILL_PERIOD_S = 5    #How often new samples are queued to be written to the day file
+
+
+    ICON_REFRESH_HZ        = 30   #Icon changes from the behaviors are applied to the system view at most this often
+    VALUE_REFRESH_HZ       = 30   #Node control value views are refreshed at most this often, only while shown
+    BT_STATUS_REFRESH_HZ   = 30   #Status colors in the behavior editor are refreshed at most this often
+    BT_DETAIL_ZOOM         = 0.5  #Zoomed out past this behavior editor nodes are plain boxes without their widgets
@@ -1,11 +1,12 @@
 # -*- coding: utf-8 -*-
-from PyQt5 import QtCore, QtGui, uic, QtWidgets
+from PyQt5 import QtCore, QtGui, QtWidgets
+from opentoolcontroller.ui_cache import loadUiType
 import os
 
 from opentoolcontroller.views.widgets.tool_tree_view import ToolTreeView
 from opentoolcontroller.tool_model import LeafFilterProxyModel
 
-tool_control_view_base, tool_control_view_form  = uic.loadUiType("opentoolcontroller/views/ToolControlView.ui")
+tool_control_view_base, tool_control_view_form  = loadUiType("opentoolcontroller/views/ToolControlView.ui")
 
 class ToolControlView(tool_control_view_base, tool_control_view_form):
     def __init__(self, model, parent=None):
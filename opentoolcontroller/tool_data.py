@@ -13,7 +13,7 @@ from collections import deque
 from opentoolcontroller.bt_model import BTModel
 from opentoolcontroller.strings import defaults, col, typ
 from opentoolcontroller.message_box import MessageBox
-from opentoolcontroller.calibration_table_model import CalibrationTableModel
+from opentoolcontroller.calibration_table_model import CalibrationTableModel, validatedDataArray
 
 #TODO update the Recipe table to match how the calibration table works
 #from opentoolcontroller.calibration_table_model import CalibrationTableModel
@@ -30,6 +30,9 @@ def enum(enumerated):
 
 
 class Node:
+    __slots__ = ('_parent', '_children', '_name', '_description', '__weakref__') #Qt signal connections hold weak references to the nodes
+    _property_names = {} #class -> property names, see propertyNames()
+
     def __init__(self, parent=None):
         super().__init__()
         self._parent = parent
@@ -51,11 +54,22 @@ class Node:
                     kv[key] = val.fget(self)
         return kv
 
+    #Same keys and order as attrs() without calling every getter, cached since this runs for every loaded node
+    def propertyNames(self):
+        cls = self.__class__
+        if cls not in Node._property_names:
+            names = []
+            for c in cls.__mro__:
+                for key, val in sorted(iter(c.__dict__.items())):
+                    if isinstance(val, property) and key not in names:
+                        names.append(key)
+            Node._property_names[cls] = names
+
+        return Node._property_names[cls]
+
     def loadAttrs(self, data):
         try:
-            #Get all the attributes of the node
-            attrs = iter(self.attrs().items())
-            for key, value in attrs:
+            for key in self.propertyNames():
                 if key in data:
                     setattr(self, key, data[key])
 
@@ -102,6 +116,11 @@ class Node:
         child.name = child.name #Force the name to be unique
         return True
 
+    #Only for bulk loading a saved tree, the names were made unique when it was saved
+    def appendLoadedChild(self, child):
+        self._children.append(child)
+        child._parent = self
+
 
     def children(self):
         return self._children
@@ -171,6 +190,9 @@ class Node:
 
 
 class BehaviorNode(Node):
+    __slots__ = ('_state', '_behaviors', '_behavior_files', '_states', '_running_behavior', '_running_behavior_name',
+                 '_behavior_info_text', '_hal_reader_number', '_behavior_runner', '_recipe_variables')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._state = 'unknown'
@@ -266,6 +288,10 @@ class BehaviorNode(Node):
 
 
 class ToolNode(BehaviorNode):
+    __slots__ = ('_number_of_hal_readers', '_realtime_period_ms', '_gui_period_ms_1', '_gui_period_ms_2',
+                 '_gui_period_ms_3', '_gui_period_ms_4', '_gui_period_ms_5', '_gui_period_ms_6', '_gui_period_ms_7',
+                 '_gui_period_ms_8')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._number_of_hal_readers = 1
@@ -379,6 +405,8 @@ class ToolNode(BehaviorNode):
 
 
 class SystemNode(BehaviorNode):
+    __slots__ = ('_system_is_online', '_device_manual_control', '_background_svg_relative_path')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._system_is_online = False
@@ -433,6 +461,8 @@ class SystemNode(BehaviorNode):
 
 
 class DeviceNode(BehaviorNode):
+    __slots__ = ()
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -450,6 +480,10 @@ class DeviceNode(BehaviorNode):
 
 
 class DeviceIconNode(Node):
+    __slots__ = ('_x', '_y', '_rotation', '_scale', '_default_layer', '_layer', '_layers', '_has_text', '_text',
+                 '_default_text', '_text_x', '_text_y', '_font_size', '_min_font_size', '_max_font_size', '_font_color',
+                 '_svg_relative_path')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._name = 'Icon'
@@ -653,6 +687,7 @@ class DeviceIconNode(Node):
 
 
 class HalNode(Node):
+    __slots__ = ('_hal_pin', '_saved_hal_pin', '_hal_pin_type', '_queue_max_size', '_hal_queue')
     hal_pins = []  # Format (pin_name, direction, type)
 
     def __init__(self, parent=None):
@@ -663,7 +698,7 @@ class HalNode(Node):
         self._saved_hal_pin = ''
         self._hal_pin_type = None
         self._queue_max_size = 10
-        self._hal_queue = deque([], maxlen=self._queue_max_size)
+        self._hal_queue = None #Only outputs get written, made on the first put
 
 
     def typeInfo(self):
@@ -700,14 +735,17 @@ class HalNode(Node):
     def halQueueGet(self):
         try:
             return self._hal_queue.popleft()
-        except IndexError:
+        except (IndexError, AttributeError):
             return None
 
     def halQueuePut(self, value):
+        if self._hal_queue is None:
+            self._hal_queue = deque([], maxlen=self._queue_max_size)
         self._hal_queue.append(value)
 
     def halQueueClear(self):
-        self._hal_queue.clear()
+        if self._hal_queue is not None:
+            self._hal_queue.clear()
 
     def halPinType(self):
         return self._hal_pin_type
@@ -730,12 +768,14 @@ class HalNode(Node):
         def fget(self): return self._queue_max_size
         def fset(self,value):
             self._queue_max_size = int(value)
-            self._hal_queue = deque([], maxlen=self._queue_max_size)
+            self._hal_queue = None
         return locals()
     queueMaxSize= property(**queueMaxSize())
 
 
 class DigitalInputNode(HalNode):
+    __slots__ = ('_hal_val', '_off_name', '_on_name')
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -789,6 +829,8 @@ class DigitalInputNode(HalNode):
 
 
 class DigitalOutputNode(DigitalInputNode):
+    __slots__ = ('_enable_manual', '_view_only')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._name = 'Digital_Output_Node'
@@ -819,6 +861,10 @@ class DigitalOutputNode(DigitalInputNode):
 
 
 class AnalogInputNode(HalNode):
+    __slots__ = ('_hal_val', '_val', '_units', '_display_digits', '_display_scientific', '_calibration_table_model',
+                 '_calibration_data', '_xp', '_yp')
+    _default_calibration_data = ((0.0, 0.0), (1.0, 0.0)) #Same as a new CalibrationTableModel, shared until the calibration is set
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -830,9 +876,9 @@ class AnalogInputNode(HalNode):
         self._display_digits = defaults.A_DISPLAY_DIGITS
         self._display_scientific = False
 
-        self._calibration_table_model = CalibrationTableModel()
-        self._calibration_table_model.dataChanged.connect(self.updateScaleFactor)
-        self._calibration_table_model.modelReset.connect(self.updateScaleFactor)
+        #The table model is only made when something views or edits it, until then the rows live in _calibration_data
+        self._calibration_table_model = None
+        self._calibration_data = AnalogInputNode._default_calibration_data
 
         self._xp = [0,0]
         self._yp = [0,0]
@@ -842,6 +888,15 @@ class AnalogInputNode(HalNode):
         return typ.A_IN_NODE
 
     def calibrationTableModel(self):
+        if self._calibration_table_model is None:
+            table_model = CalibrationTableModel()
+            if self._calibration_data is not AnalogInputNode._default_calibration_data:
+                table_model.setDataArray(self.calibrationTableData)
+
+            table_model.dataChanged.connect(self.updateScaleFactor)
+            table_model.modelReset.connect(self.updateScaleFactor)
+            self._calibration_table_model = table_model
+
         return self._calibration_table_model
 
     def data(self, c):
@@ -852,7 +907,7 @@ class AnalogInputNode(HalNode):
         elif c is col.UNITS                   : r = self.units
         elif c is col.DISPLAY_DIGITS          : r = self.displayDigits
         elif c is col.DISPLAY_SCIENTIFIC      : r = self.displayScientific
-        elif c is col.CALIBRATION_TABLE_MODEL : r = self._calibration_table_model
+        elif c is col.CALIBRATION_TABLE_MODEL : r = self.calibrationTableModel()
 
         return r
 
@@ -879,8 +934,12 @@ class AnalogInputNode(HalNode):
 
     def updateScaleFactor(self):
         try:
-            self._xp = self._calibration_table_model.halValues()
-            self._yp = self._calibration_table_model.guiValues()
+            if self._calibration_table_model is not None:
+                self._xp = self._calibration_table_model.halValues()
+                self._yp = self._calibration_table_model.guiValues()
+            else:
+                self._xp = [row[0] for row in self._calibration_data]
+                self._yp = [row[1] for row in self._calibration_data]
         except:
             self._xp = [0,10]
             self._yp = [0,10]
@@ -914,11 +973,16 @@ class AnalogInputNode(HalNode):
 
     def calibrationTableData():
         def fget(self):
-            return self.calibrationTableModel().dataArray()
+            if self._calibration_table_model is not None:
+                return self._calibration_table_model.dataArray()
+            return [['hal_value', 'gui_value']] + [list(row) for row in self._calibration_data]
 
         def fset(self, value):
             try:
-                self.calibrationTableModel().setDataArray(value)
+                if self._calibration_table_model is not None:
+                    self._calibration_table_model.setDataArray(value)
+                else:
+                    self._calibration_data = validatedDataArray(value)
                 self.updateScaleFactor()
             except Exception as e:
                 MessageBox("Malformed calibration table data", e, value)
@@ -928,6 +992,8 @@ class AnalogInputNode(HalNode):
 
 
 class AnalogOutputNode(AnalogInputNode):
+    __slots__ = ('_max', '_min')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._name = 'Analog_Output_Node'
@@ -972,6 +1038,8 @@ class AnalogOutputNode(AnalogInputNode):
 
 
 class BoolVarNode(Node):
+    __slots__ = ('_val', '_off_name', '_on_name', '_user_manual_set', '_launch_value', '_use_launch_value')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._name = 'Bool_Var_Node'
@@ -1048,6 +1116,8 @@ class BoolVarNode(Node):
 
 
 class IntVarNode(Node):
+    __slots__ = ('_val', '_min', '_max', '_units', '_user_manual_set', '_launch_value', '_use_launch_value')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._name = 'Int_Var_Node'
@@ -1130,6 +1200,9 @@ class IntVarNode(Node):
 
 
 class FloatVarNode(Node):
+    __slots__ = ('_val', '_min', '_max', '_units', '_display_digits', '_display_scientific', '_user_manual_set',
+                 '_launch_value', '_use_launch_value')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._name = 'Float_Var_Node'
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
-from PyQt5 import QtCore, QtGui, uic, QtWidgets
+from PyQt5 import QtCore, QtGui, QtWidgets
+from opentoolcontroller.ui_cache import loadUiType
 import os
 
 from opentoolcontroller.views.widgets.tool_tree_view import ToolTreeView
@@ -9,23 +10,23 @@ from opentoolcontroller.strings import col, typ, defaults
 from opentoolcontroller.views.widgets.recipe_variable_table import RecipeVariableTable
 
 
-d_in_base,  d_in_form  = uic.loadUiType("opentoolcontroller/views/DigitalInputEditor.ui")
-d_out_base, d_out_form = uic.loadUiType("opentoolcontroller/views/DigitalOutputEditor.ui")
-a_in_base,  a_in_form  = uic.loadUiType("opentoolcontroller/views/AnalogInputEditor.ui")
-a_out_base, a_out_form = uic.loadUiType("opentoolcontroller/views/AnalogOutputEditor.ui")
+d_in_base,  d_in_form  = loadUiType("opentoolcontroller/views/DigitalInputEditor.ui")
+d_out_base, d_out_form = loadUiType("opentoolcontroller/views/DigitalOutputEditor.ui")
+a_in_base,  a_in_form  = loadUiType("opentoolcontroller/views/AnalogInputEditor.ui")
+a_out_base, a_out_form = loadUiType("opentoolcontroller/views/AnalogOutputEditor.ui")
 
-recipe_var_base, recipe_var_form = uic.loadUiType("opentoolcontroller/views/RecipeVariableEditor.ui")
-bool_var_base,  bool_var_form  = uic.loadUiType("opentoolcontroller/views/BoolVarEditor.ui")
-int_var_base, int_var_form = uic.loadUiType("opentoolcontroller/views/IntVarEditor.ui")
-float_var_base, float_var_form = uic.loadUiType("opentoolcontroller/views/FloatVarEditor.ui")
+recipe_var_base, recipe_var_form = loadUiType("opentoolcontroller/views/RecipeVariableEditor.ui")
+bool_var_base,  bool_var_form  = loadUiType("opentoolcontroller/views/BoolVarEditor.ui")
+int_var_base, int_var_form = loadUiType("opentoolcontroller/views/IntVarEditor.ui")
+float_var_base, float_var_form = loadUiType("opentoolcontroller/views/FloatVarEditor.ui")
 
-device_icon_base, device_icon_form  = uic.loadUiType("opentoolcontroller/views/DeviceIconEditor.ui")
-device_base, device_form  = uic.loadUiType("opentoolcontroller/views/DeviceEditor.ui")
-tool_base, tool_form  = uic.loadUiType("opentoolcontroller/views/ToolEditor.ui")
-system_base, system_form  = uic.loadUiType("opentoolcontroller/views/SystemEditor.ui")
-node_base, node_form  = uic.loadUiType("opentoolcontroller/views/NodeEditor.ui")
+device_icon_base, device_icon_form  = loadUiType("opentoolcontroller/views/DeviceIconEditor.ui")
+device_base, device_form  = loadUiType("opentoolcontroller/views/DeviceEditor.ui")
+tool_base, tool_form  = loadUiType("opentoolcontroller/views/ToolEditor.ui")
+system_base, system_form  = loadUiType("opentoolcontroller/views/SystemEditor.ui")
+node_base, node_form  = loadUiType("opentoolcontroller/views/NodeEditor.ui")
 
-common_editor_base, common_editor_form  = uic.loadUiType("opentoolcontroller/views/CommonEditor.ui")
+common_editor_base, common_editor_form  = loadUiType("opentoolcontroller/views/CommonEditor.ui")
 
 
 class CommonEditor(common_editor_base, common_editor_form):
@@ -13,6 +13,8 @@ class ToolModel(QtCore.QAbstractItemModel):
         self._tool_index = self.createIndex(0, 0, self._tool_node) #There's a empty index w/out a valid parent above this
         self._alert_callback = None
         self._action_log_callback = None
+        self._historian = None
+        self._path_index = None #'system.device.node': (row, node), rebuilt on the first lookup after a change
 
         self._behavior_runners = []
 
@@ -66,6 +68,13 @@ class ToolModel(QtCore.QAbstractItemModel):
     def setActionLogCallback(self, callback):
         self._action_log_callback = callback
 
+    #Recorded values of the hal nodes by nodePath(), see Historian
+    def historian(self):
+        return self._historian
+
+    def setHistorian(self, historian):
+        self._historian = historian
+
     def setLaunchValues(self):
         indexes = self.indexesOfTypes([typ.BOOL_VAR_NODE, typ.INT_VAR_NODE, typ.FLOAT_VAR_NODE])
         for index in indexes:
@@ -120,25 +129,31 @@ class ToolModel(QtCore.QAbstractItemModel):
     def loadJSON(self, json):
         try:
             if json['type_info'] == typ.TOOL_NODE:
-                self._tool_node.loadAttrs(json)
-
-                if 'children' in json:
-                    for child in json['children']:
-                        index = self.insertChild(self._tool_index, child['type_info'], None, True)
-                        index.internalPointer().loadAttrs(child)
-                        self._recurseJSON(index, child)
+                #Build the whole tree then tell the views once, instead of an insert per node
+                self.beginResetModel()
+                try:
+                    self._path_index = None
+                    self._tool_node.loadAttrs(json)
+                    self._recurseJSON(self._tool_node, json)
+                finally:
+                    self.endResetModel()
 
             return True
         except Exception as e:
             MessageBox("Failed to behavior from JSON", e)
             return False
 
-    def _recurseJSON(self, parent_index, json):
+    #Saved names are already unique so the nodes are loaded before being attached, skipping the sibling name check
+    def _recurseJSON(self, parent_node, json):
         if 'children' in json:
             for child in json['children']:
-                index = self.insertChild(parent_index, child['type_info'], None, True)
-                index.internalPointer().loadAttrs(child)
-                self._recurseJSON(index, child)
+                node = self.newNode(child['type_info'])
+                if node is None:
+                    continue
+
+                node.loadAttrs(child)
+                parent_node.appendLoadedChild(node)
+                self._recurseJSON(node, child)
 
 
     def rowCount(self, parent):
@@ -184,6 +199,23 @@ class ToolModel(QtCore.QAbstractItemModel):
             return []
 
 
+    def newNode(self, node_type):
+        if    node_type == typ.TOOL_NODE        : return ToolNode()
+        elif  node_type == typ.SYSTEM_NODE      : return SystemNode()
+        elif  node_type == typ.DEVICE_NODE      : return DeviceNode()
+        elif  node_type == typ.DEVICE_ICON_NODE : return DeviceIconNode()
+        elif  node_type == typ.D_IN_NODE        : return DigitalInputNode()
+        elif  node_type == typ.D_OUT_NODE       : return DigitalOutputNode()
+        elif  node_type == typ.A_IN_NODE        : return AnalogInputNode()
+        elif  node_type == typ.A_OUT_NODE       : return AnalogOutputNode()
+        elif  node_type == typ.BOOL_VAR_NODE    : return BoolVarNode()
+        elif  node_type == typ.INT_VAR_NODE     : return IntVarNode()
+        elif  node_type == typ.FLOAT_VAR_NODE   : return FloatVarNode()
+
+        MessageBox('Attempting to insert unknown node of type', node_type)
+        return None
+
+
     def insertChild(self, parent_index, child_type, insert_row = None, from_load = False):
         parent_node  = parent_index.internalPointer()
 
@@ -191,38 +223,30 @@ class ToolModel(QtCore.QAbstractItemModel):
             insert_row = parent_index.internalPointer().childCount()
 
         if insert_row is not False:
-            self.beginInsertRows(parent_index, insert_row, insert_row)
-
-            if    child_type == typ.TOOL_NODE        : parent_node.insertChild(insert_row, ToolNode())
-            elif  child_type == typ.SYSTEM_NODE      : parent_node.insertChild(insert_row, SystemNode())
-            elif  child_type == typ.DEVICE_NODE      : parent_node.insertChild(insert_row, DeviceNode())
-            elif  child_type == typ.DEVICE_ICON_NODE : parent_node.insertChild(insert_row, DeviceIconNode())
-            elif  child_type == typ.D_IN_NODE        : parent_node.insertChild(insert_row, DigitalInputNode())
-            elif  child_type == typ.D_OUT_NODE       : parent_node.insertChild(insert_row, DigitalOutputNode())
-            elif  child_type == typ.A_IN_NODE        : parent_node.insertChild(insert_row, AnalogInputNode())
-            elif  child_type == typ.A_OUT_NODE       : parent_node.insertChild(insert_row, AnalogOutputNode())
-            elif  child_type == typ.BOOL_VAR_NODE    : parent_node.insertChild(insert_row, BoolVarNode())
-            elif  child_type == typ.INT_VAR_NODE     : parent_node.insertChild(insert_row, IntVarNode())
-            elif  child_type == typ.FLOAT_VAR_NODE   : parent_node.insertChild(insert_row, FloatVarNode())
-
-            else: MessageBox('Attempting to insert unknown node of type', child_type)
+            new_node = self.newNode(child_type)
+            if new_node is None:
+                return None
 
+            self.beginInsertRows(parent_index, insert_row, insert_row)
+            parent_node.insertChild(insert_row, new_node)
+            self._path_index = None
             self.endInsertRows()
 
             new_child_index = self.index(insert_row, 0, parent_index)
             new_child_node = new_child_index.internalPointer()
 
 
-            #Add the node to each behavior tree
+            #Add the node to the behavior tree leaves that use it
             if parent_node.typeInfo() == typ.DEVICE_NODE and not from_load:
                 for bt_model in parent_node.behaviors():
-                    bt_model.syncToTool()
+                    bt_model.syncToToolNode(new_child_node)
 
             #Insert Device Icon for the device
             if child_type == typ.DEVICE_NODE and not from_load:
                 insert_row = 0
                 self.beginInsertRows(new_child_index, insert_row, insert_row)
                 new_child_node.insertChild(insert_row, DeviceIconNode())
+                self._path_index = None
                 self.endInsertRows()
 
 
@@ -249,18 +273,21 @@ class ToolModel(QtCore.QAbstractItemModel):
             raise ValueError("Tool Model removeRows 'count' must be > 0")
 
 
+        removed_nodes = parent_node.children()[row:row+count]
         self.beginRemoveRows(parent_index, row, row+count-1)
 
         for i in list(range(count)):
             parent_node.removeChild(row)
 
+        self._path_index = None
         self.endRemoveRows()
 
 
-        #Remove it from the behavior tree
+        #Remove it from the behavior tree leaves that used it
         if parent_node.typeInfo() == typ.DEVICE_NODE:
             for bt_model in parent_node.behaviors():
-                bt_model.syncToTool()
+                for removed_node in removed_nodes:
+                    bt_model.syncToToolNode(removed_node)
 
 
 
@@ -291,6 +318,10 @@ class ToolModel(QtCore.QAbstractItemModel):
             node = index.internalPointer()
             old_value = node.data(index.column())
             node.setData(index.column(), value)
+
+            if index.column() == col.NAME:
+                self._path_index = None
+
             self.dataChanged.emit(index, index)
 
             if index.column() == col.HAL_VALUE and node.typeInfo() in typ.HAL_NODES:
@@ -369,12 +400,12 @@ class ToolModel(QtCore.QAbstractItemModel):
             return self.createIndex(row, column, self._tool_node)
 
 
+    #One walk for all the types, sorted so they still come out grouped by type and in tree order
     def indexesOfTypes(self, index_types, parent_index=None, depth=10):
-        indexes = []
-        for index_type in index_types:
-            indexes += self.indexesOfType(index_type, parent_index, depth)
-        return indexes
+        indexes = self.indexesOfType(index_types, parent_index, depth)
+        return sorted(indexes, key=lambda index: index_types.index(index.internalPointer().typeInfo()))
 
+    #index_type can also be a list of types
     def indexesOfType(self, index_type, parent_index=None, depth=10):
         if parent_index is None:
             parent_index = self._tool_index
@@ -382,19 +413,20 @@ class ToolModel(QtCore.QAbstractItemModel):
         elif parent_index.isValid() is not True:
             parent_index = self._tool_index
 
+        index_types = index_type if isinstance(index_type, (list, tuple)) else [index_type]
 
         indexes = []
+        self._recurseIndexesOfType(index_types, parent_index.internalPointer(), depth, indexes)
+        return indexes
 
+    #Walks the nodes directly instead of going through QModelIndex.child() for every row
+    def _recurseIndexesOfType(self, index_types, parent_node, depth, indexes):
         if depth>0:
-            for row in range(self.rowCount(parent_index)):
-                index = parent_index.child(row, 0)
-
-                if index.internalPointer().typeInfo() == index_type:
-                    indexes.append(index)
+            for row, node in enumerate(parent_node.children()):
+                if node.typeInfo() in index_types:
+                    indexes.append(self.createIndex(row, 0, node))
 
-                indexes += self.indexesOfType(index_type, index, depth-1)
-
-        return indexes
+                self._recurseIndexesOfType(index_types, node, depth-1, indexes)
 
     def childrenIndexes(self, parent_index=None):
         if parent_index is None:
@@ -410,6 +442,44 @@ class ToolModel(QtCore.QAbstractItemModel):
         return indexes
 
 
+    #Qualified name of a node below the tool, 'system.device.node', the tool itself is ''
+    def nodePath(self, index):
+        names = []
+        node = index.internalPointer()
+
+        while node is not None and node is not self._tool_node:
+            names.append(node.name)
+            node = node.parent()
+
+        return '.'.join(reversed(names))
+
+    #Returns the index at the path or None, the behaviors resolve their setpoints through this when syncing.
+    #Plain indexes are fine here since the whole path index is dropped on any rename, insert or remove
+    def indexOfPath(self, path):
+        if self._path_index is None:
+            self._path_index = {}
+            self._buildPathIndex(self._tool_node, '')
+
+        if path in self._path_index:
+            row, node = self._path_index[path]
+            return self.createIndex(row, 0, node)
+
+        return None
+
+    def childIndexByName(self, parent_index, name):
+        if parent_index is None or not parent_index.isValid():
+            return None
+
+        parent_path = self.nodePath(parent_index)
+        return self.indexOfPath(parent_path + '.' + str(name) if parent_path else str(name))
+
+    def _buildPathIndex(self, parent_node, parent_path):
+        for row, node in enumerate(parent_node.children()):
+            path = parent_path + '.' + node.name if parent_path else node.name
+            self._path_index[path] = (row, node)
+            self._buildPathIndex(node, path)
+
+
 
 
 
@@ -422,11 +492,57 @@ class LeafFilterProxyModel(QtCore.QSortFilterProxyModel):
 
         This Model matches items which are descendants
         or ascendants of matching items.
+
+        - Whether a row matches itself, has a matching ancestor or a matching descendant is kept
+          per source row until the filter changes, rows are inserted/removed/moved or a name is edited
+        - Value changes don't touch the cache so refiltering a changed row is a dict lookup
     '''
 
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._filter_key = None
+        self._matches = {}        #(parent node, row): row matches the filter itself
+        self._parent_matches = {} #parent node: it or one of its ancestors matches
+        self._child_matches = {}  #(parent node, row): one of the row's descendants matches
+
+    #Connected before the base class so the cache is cleared before it refilters
+    def setSourceModel(self, model):
+        old_model = self.sourceModel()
+        if old_model is not None:
+            for signal in self._structureSignals(old_model):
+                signal.disconnect(self.clearFilterCache)
+            old_model.dataChanged.disconnect(self.sourceDataChanged)
+
+        if model is not None:
+            for signal in self._structureSignals(model):
+                signal.connect(self.clearFilterCache)
+            model.dataChanged.connect(self.sourceDataChanged)
+
+        self.clearFilterCache()
+        super().setSourceModel(model)
+
+    def _structureSignals(self, model):
+        return [model.modelReset, model.layoutChanged, model.rowsInserted, model.rowsRemoved, model.rowsMoved]
+
+    def clearFilterCache(self, *args):
+        self._matches = {}
+        self._parent_matches = {}
+        self._child_matches = {}
+
+    def sourceDataChanged(self, top_left, bottom_right, roles=[]):
+        if top_left.column() <= self.filterKeyColumn() <= bottom_right.column():
+            self.clearFilterCache()
+
+    def checkFilterKey(self):
+        reg_exp = self.filterRegExp()
+        key = (reg_exp.pattern(), reg_exp.caseSensitivity(), reg_exp.patternSyntax(), self.filterKeyColumn(), self.filterRole())
+        if key != self._filter_key:
+            self._filter_key = key
+            self.clearFilterCache()
 
     #Overriding the parent function
     def filterAcceptsRow(self, row_num, source_parent):
+        self.checkFilterKey()
 
         # Check if the current row matches
         if self.filter_accepts_row_itself(row_num, source_parent):
@@ -440,27 +556,37 @@ class LeafFilterProxyModel(QtCore.QSortFilterProxyModel):
         return self.has_accepted_children(row_num, source_parent)
 
     def filter_accepts_row_itself(self, row_num, parent):
-        return super(LeafFilterProxyModel, self).filterAcceptsRow(row_num, parent)
+        key = (parent.internalPointer(), row_num)
+        if key not in self._matches:
+            self._matches[key] = super(LeafFilterProxyModel, self).filterAcceptsRow(row_num, parent)
+        return self._matches[key]
 
     #Traverse to the root node and check if any of the ancestors match the filter
     def filter_accepts_any_parent(self, parent):
-        while parent.isValid():
-            if self.filter_accepts_row_itself(parent.row(), parent.parent()):
-                return True
-            parent = parent.parent()
-        return False
+        if not parent.isValid():
+            return False
+
+        node = parent.internalPointer()
+        if node not in self._parent_matches:
+            self._parent_matches[node] = (self.filter_accepts_row_itself(parent.row(), parent.parent())
+                                          or self.filter_accepts_any_parent(parent.parent()))
+        return self._parent_matches[node]
 
     #Starting from the current node as root, traverse all the descendants and test if any of the children match
     def has_accepted_children(self, row_num, parent):
-        model = self.sourceModel()
-        source_index = model.index(row_num, 0, parent)
-
-        children_count =  model.rowCount(source_index)
-        for i in range(children_count):
-            if self.filterAcceptsRow(i, source_index):
-                return True
-
-        return False
+        key = (parent.internalPointer(), row_num)
+        if key not in self._child_matches:
+            model = self.sourceModel()
+            source_index = model.index(row_num, 0, parent)
+
+            accepted = False
+            for i in range(model.rowCount(source_index)):
+                if self.filter_accepts_row_itself(i, source_index) or self.has_accepted_children(i, source_index):
+                    accepted = True
+                    break
+            self._child_matches[key] = accepted
+
+        return self._child_matches[key]
 
     def removeRows(self, row, count, index):
         self.sourceModel().removeRows(row, count, index)
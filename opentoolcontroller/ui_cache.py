@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+from io import StringIO
+import hashlib
+import marshal
+import os
+import sys
+
+from PyQt5 import QtWidgets, uic
+from PyQt5.uic import compiler
+
+
+#Compiling a .ui file to python is most of the time spent importing the editors, so the compiled code
+#is kept in views/__pycache__ keyed by the sha1 of the .ui file and the python version, a changed
+#.ui file is compiled again on the next start. Returns (form class, base class) like uic.loadUiType
+def loadUiType(ui_file):
+    try:
+        with open(ui_file, 'rb') as f:
+            ui_data = f.read()
+    except OSError:
+        return uic.loadUiType(ui_file)
+
+    key = hashlib.sha1(ui_data + sys.version.encode()).hexdigest()
+    cache_dir = os.path.dirname(ui_file) + '/__pycache__'
+    cache_file = cache_dir + '/' + os.path.basename(ui_file) + '.' + sys.implementation.cache_tag + '.marshal'
+
+    try:
+        with open(cache_file, 'rb') as f:
+            cached_key, code, ui_class, base_class = marshal.load(f)
+        if cached_key != key:
+            raise ValueError("Stale ui cache")
+
+    except Exception:
+        code_string = StringIO()
+        winfo = compiler.UICompiler().compileUi(ui_file, code_string, False, '_rc', '.')
+        code = compile(code_string.getvalue(), ui_file, 'exec')
+        ui_class, base_class = winfo['uiclass'], winfo['baseclass']
+
+        #Write then rename so two instances starting together can't read a partial file,
+        #a read only install just compiles every time
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_file = cache_file + '.%i.tmp' % os.getpid()
+            with open(tmp_file, 'wb') as f:
+                marshal.dump((key, code, ui_class, base_class), f)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+
+    ui_globals = {}
+    exec(code, ui_globals)
+
+    ui_base = ui_globals.get(base_class)
+    if ui_base is None:
+        ui_base = getattr(QtWidgets, base_class)
+
+    return ui_globals[ui_class], ui_base
@@ -15,12 +15,18 @@ pp = pprint.PrettyPrinter(width=82, compact=True)
 
 
 class Path(QtWidgets.QGraphicsPathItem):
+    '''Line from a parent node to a child
+        - Moving an end only records it, the path is rebuilt once when the event loop is next idle
+          so dragging a subtree, where both ends and many lines move every mouse event, builds each path once
+    '''
+
     def __init__(self, start_pos, end_pos):
         super().__init__()
         self._start_pos = start_pos
         self._end_pos = end_pos
         self._drop = 40 #diameter of fillet
         self._diam = 20 #fixed verticle drop
+        self._update_pending = False
 
         self.setPen(QtGui.QPen(QtCore.Qt.darkGray, 2.0))
         self.updateElements()
@@ -30,19 +36,32 @@ class Path(QtWidgets.QGraphicsPathItem):
 
     def setStartPos(self, pos):
         self._start_pos = pos
-        self.updateElements()
+        self.updateLater()
 
     def endPos(self):
         return self._end_pos
 
     def setEndPos(self, pos):
         self._end_pos = pos
-        self.updateElements()
+        self.updateLater()
+
+    def updateLater(self):
+        if not self._update_pending:
+            self._update_pending = True
+            QtCore.QTimer.singleShot(0, self.updatePending)
+
+    def updatePending(self):
+        if self._update_pending:
+            try:
+                self.updateElements()
+            except RuntimeError:
+                pass #Removed from the scene and deleted before the update ran
 
     def minChildY(self):
         return self._start_pos.y() + self._drop*2
 
     def updateElements(self):
+        self._update_pending = False
         start = self._start_pos
         end = self._end_pos
 
@@ -121,6 +140,8 @@ class NodeGraphicsItem(QtWidgets.QGraphicsItem):
         self._lines = []
 
         self._is_branch = False
+        self._detailed = True
+        self._shape_paths = None #(width, height, title, content, outline)
 
         self.initSizes()
         self.initAssets()
@@ -146,6 +167,7 @@ class NodeGraphicsItem(QtWidgets.QGraphicsItem):
         self._is_branch = True
         self._drag_square = DragSquare(30, self.boxHeight()-20, self.boxWidth()-60, 20, self)
         self._drag_square.setEditable(self._editable)
+        self._drag_square.setVisible(self._detailed)
 
     def setEditable(self, value):
         self._editable = bool(value)
@@ -245,6 +267,53 @@ class NodeGraphicsItem(QtWidgets.QGraphicsItem):
     def boundingRect(self):
         return QtCore.QRectF(0, 0, self.boxWidth(), self.boxHeight()).normalized()
 
+    #Zoomed out the node is a plain box with its title and status color, the title item and
+    #embedded widgets are hidden and the box is cached as a pixmap until its status changes
+    def setDetailed(self, value):
+        value = bool(value)
+        if value == self._detailed:
+            return
+
+        self._detailed = value
+        self.title_item.setVisible(value)
+        if hasattr(self, '_prox'):
+            self._prox.setVisible(value)
+        if self._is_branch:
+            self._drag_square.setVisible(value)
+
+        if value:
+            self.setCacheMode(QtWidgets.QGraphicsItem.NoCache)
+        else:
+            self.setCacheMode(QtWidgets.QGraphicsItem.DeviceCoordinateCache)
+        self.update()
+
+    def isDetailed(self):
+        return self._detailed
+
+    #The rounded outlines only change with the size so they're kept between paints
+    def shapePaths(self, width, height):
+        if self._shape_paths is None or self._shape_paths[0:2] != (width, height):
+            r = 10 #radius of edge
+
+            path_title = QtGui.QPainterPath()
+            path_title.setFillRule(QtCore.Qt.WindingFill)
+            path_title.addRoundedRect(0, 0, width, self.title_height, r, r)
+            path_title.addRect(0, self.title_height - r, r,r)
+            path_title.addRect(width - r, self.title_height - r, r, r)
+
+            path_content = QtGui.QPainterPath()
+            path_content.setFillRule(QtCore.Qt.WindingFill)
+            path_content.addRoundedRect(0, self.title_height, width, height - self.title_height, r, r)
+            path_content.addRect(0, self.title_height, r, r)
+            path_content.addRect(width - r, self.title_height, r, r)
+
+            path_outline = QtGui.QPainterPath()
+            path_outline.addRoundedRect(-1, -1, width+2, height+2, r, r)
+
+            self._shape_paths = (width, height, path_title.simplified(), path_content.simplified(), path_outline.simplified())
+
+        return self._shape_paths[2:]
+
     def setStatus(self, status):
         self._status = status
         if status == None:
@@ -264,28 +333,29 @@ class NodeGraphicsItem(QtWidgets.QGraphicsItem):
         #Painting the rounded rectanglar `Node`
         width = self.boxWidth()
         height = self.boxHeight() 
-        r = 10 #radius of edge
+
+        if not self._detailed:
+            painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
+            painter.setBrush(self._brush_background)
+            painter.drawRect(QtCore.QRectF(0, 0, width, height))
+            painter.fillRect(QtCore.QRectF(0, 0, width, self.title_height), self._brush_title)
+            painter.setPen(self._title_color)
+            painter.setFont(self._title_font2)
+            painter.drawText(QtCore.QRectF(0, 0, width, height), QtCore.Qt.AlignCenter | QtCore.Qt.TextWordWrap, self._type_info)
+            return
+
+        path_title, path_content, path_outline = self.shapePaths(width, height)
 
         # title
-        path_title = QtGui.QPainterPath()
-        path_title.setFillRule(QtCore.Qt.WindingFill)
-        path_title.addRoundedRect(0, 0, width, self.title_height, r, r)
-        path_title.addRect(0, self.title_height - r, r,r)
-        path_title.addRect(width - r, self.title_height - r, r, r)
         painter.setPen(QtCore.Qt.NoPen)
         painter.setBrush(self._brush_title)
-        painter.drawPath(path_title.simplified())
+        painter.drawPath(path_title)
 
 
         # content
-        path_content = QtGui.QPainterPath()
-        path_content.setFillRule(QtCore.Qt.WindingFill)
-        path_content.addRoundedRect(0, self.title_height, width, height - self.title_height, r, r)
-        path_content.addRect(0, self.title_height, r, r)
-        path_content.addRect(width - r, self.title_height, r, r)
         painter.setPen(QtCore.Qt.NoPen)
         painter.setBrush(self._brush_background)
-        painter.drawPath(path_content.simplified())
+        painter.drawPath(path_content)
 
 
         #Draws the center shape if used
@@ -293,17 +363,15 @@ class NodeGraphicsItem(QtWidgets.QGraphicsItem):
 
 
         # outline
-        path_outline = QtGui.QPainterPath()
-        path_outline.addRoundedRect(-1, -1, width+2, height+2, r, r)
         painter.setBrush(QtCore.Qt.NoBrush)
         if self.hovered:
             painter.setPen(self._pen_hovered)
-            painter.drawPath(path_outline.simplified())
+            painter.drawPath(path_outline)
             painter.setPen(self._pen_default)
-            painter.drawPath(path_outline.simplified())
+            painter.drawPath(path_outline)
         else:
             painter.setPen(self._pen_default if not self.isSelected() else self._pen_selected)
-            painter.drawPath(path_outline.simplified())
+            painter.drawPath(path_outline)
 
         #update drag square
         if self._is_branch: 
@@ -1,7 +1,8 @@
 #!/usr/bin/python3
 # -*- coding: utf-8 -*-
 from PyQt5 import QtGui, QtCore, QtWidgets
-from opentoolcontroller.strings import bt, col, typ
+from opentoolcontroller.strings import bt, col, typ, defaults
+from opentoolcontroller.bt_data import Node
 import math
 from opentoolcontroller.message_box import MessageBox
 #from opentoolcontroller.views.widgets.svg_widget import SVGWidget
@@ -182,6 +183,8 @@ class BTEditorWindow(QtWidgets.QMainWindow):
 
 
 class BTGraphicsView(QtWidgets.QGraphicsView):
+    zoomChanged = QtCore.pyqtSignal(float)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.zoom = 1
@@ -211,6 +214,9 @@ class BTGraphicsView(QtWidgets.QGraphicsView):
             zoom_amount = 1
 
         self.scale(zoom_amount, zoom_amount)
+        if zoom_amount != 1:
+            self.zoom *= zoom_amount
+            self.zoomChanged.emit(self.zoom)
 
         #translate so we zoom where the mouse is
         new_pos = self.mapToScene(event.pos())
@@ -252,19 +258,25 @@ class BTGraphicsScene(QtWidgets.QGraphicsScene):
         first_left = left - (left % self.gridSize)
         first_top = top - (top % self.gridSize)
 
+        #Zoomed out only the dark lines are drawn, the light ones would be a few pixels apart
+        detailed = QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform()) >= defaults.BT_DETAIL_ZOOM
+
         # compute all lines to be drawn
         lines_light, lines_dark = [], []
         for x in range(first_left, right, self.gridSize):
-            if (x % (self.gridSize*self.gridSquares) != 0): lines_light.append(QtCore.QLine(x, top, x, bottom))
+            if (x % (self.gridSize*self.gridSquares) != 0):
+                if detailed: lines_light.append(QtCore.QLine(x, top, x, bottom))
             else: lines_dark.append(QtCore.QLine(x, top, x, bottom))
 
         for y in range(first_top, bottom, self.gridSize):
-            if (y % (self.gridSize*self.gridSquares) != 0): lines_light.append(QtCore.QLine(left, y, right, y))
+            if (y % (self.gridSize*self.gridSquares) != 0):
+                if detailed: lines_light.append(QtCore.QLine(left, y, right, y))
             else: lines_dark.append(QtCore.QLine(left, y, right, y))
 
         # draw the lines
-        painter.setPen(self._pen_light)
-        painter.drawLines(*lines_light)
+        if lines_light:
+            painter.setPen(self._pen_light)
+            painter.drawLines(*lines_light)
 
         painter.setPen(self._pen_dark)
         painter.drawLines(*lines_dark)
@@ -282,10 +294,19 @@ class BTEditor(QtWidgets.QAbstractItemView):
         self._mappers = []
 
         self._editable = True
+        self._detailed = True
+
+        #Ticks only start the timer, the refresh updates the items whose node changed status since the last one
+        self._status_serial = 0
+        self._status_timer = QtCore.QTimer(self)
+        self._status_timer.setSingleShot(True)
+        self._status_timer.setInterval(int(1000 / defaults.BT_STATUS_REFRESH_HZ))
+        self._status_timer.timeout.connect(self.updateStatuses)
 
         #UI Stuff
         self._view = BTGraphicsView(self)
         self._view.setScene(self._scene)
+        self._view.zoomChanged.connect(self.setZoom)
 
         #Layout
         self.h_layout = QtWidgets.QHBoxLayout()
@@ -300,6 +321,14 @@ class BTEditor(QtWidgets.QAbstractItemView):
         for p_index, g_item in self._scene_items:
             g_item.setEditable(value)
 
+    #Nodes are only drawn with their widgets at BT_DETAIL_ZOOM and above
+    def setZoom(self, zoom):
+        detailed = zoom >= defaults.BT_DETAIL_ZOOM
+        if detailed != self._detailed:
+            self._detailed = detailed
+            for p_index, g_item in self._scene_items:
+                g_item.setDetailed(detailed)
+
     def setNewItemType(self, new_type):
         self._new_item_type = new_type
 
@@ -453,6 +482,8 @@ class BTEditor(QtWidgets.QAbstractItemView):
         item.setAddCallback(self.addGraphicItem)
 
 
+        item.bt_node = node
+        item.setDetailed(self._detailed)
         self._scene.addItem(item)
         p_index = QtCore.QPersistentModelIndex(index)
         self._scene_items.append((p_index, item))
@@ -491,14 +522,14 @@ class BTEditor(QtWidgets.QAbstractItemView):
 
 
     def updateStatuses(self):
+        serial = self._status_serial
+        self._status_serial = Node.status_serial
+
         for g_index, g_item in self._scene_items:
-            try:
-                index = QtCore.QModelIndex(g_index)
-                node = index.internalPointer()
+            node = g_item.bt_node
+            if node.statusSerial() > serial:
                 g_item.setStatus(node.status())
                 g_item.update()
-            except:
-                pass
 
     def updateStatus(self, index):
         g_item = self.gItemFromIndex(index)
@@ -530,7 +561,8 @@ class BTEditor(QtWidgets.QAbstractItemView):
                 index = index_top_left.siblingAtRow(i)
 
                 if index.column() == col.BT_STATUS:
-                    self.updateStatuses()
+                    if not self._status_timer.isActive():
+                        self._status_timer.start()
                 else:
                     self.updateNodeItem(index)
                     self.parent().setTitle(file_changed=True)
@@ -1,10 +1,18 @@
 # -*- coding: utf-8 -*-
 from PyQt5 import QtGui, QtCore, QtSvg, QtWidgets
+from opentoolcontroller.views.widgets.svg_cache import svg_cache
 
 class DeviceIconWidget(QtSvg.QGraphicsSvgItem):
+    '''The renderer comes from the svg_cache so every icon of the same file shares one, the
+       element id and its bounds are kept here so switching layers uses the cached bounds'''
+
     def __init__(self, renderer=None):
         super().__init__()
 
+        self._svg_path = None
+        self._element_id = ''
+        self._bounds = QtCore.QRectF()
+
         if renderer is not None:
             self.setSharedRenderer(renderer)
         self.setAcceptHoverEvents(True)
@@ -18,6 +26,32 @@ class DeviceIconWidget(QtSvg.QGraphicsSvgItem):
         self._selected = False
         self._movable = False
 
+    def setSvg(self, path):
+        self._svg_path = path
+        self.setSharedRenderer(svg_cache.renderer(path))
+        self.setElementId(self._element_id)
+
+    def elementId(self):
+        return self._element_id
+
+    def setElementId(self, element_id):
+        self._element_id = element_id
+
+        if self._svg_path is not None:
+            bounds = svg_cache.elementBounds(self._svg_path, element_id)
+        elif self.renderer() is not None:
+            bounds = QtCore.QRectF(QtCore.QPointF(0, 0), self.renderer().boundsOnElement(element_id).size())
+        else:
+            bounds = QtCore.QRectF()
+
+        if bounds != self._bounds:
+            self.prepareGeometryChange()
+            self._bounds = bounds
+        self.update()
+
+    def boundingRect(self):
+        return self._bounds
+
     def setCallback(self, value):
         self._callback = value
 
@@ -39,7 +73,13 @@ class DeviceIconWidget(QtSvg.QGraphicsSvgItem):
             self.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, False)
 
     def paint(self, painter, option, wid):
-        super().paint(painter, option, wid)
+        renderer = self.renderer()
+        if renderer is not None and renderer.isValid() and not self._bounds.isEmpty():
+            if self._element_id:
+                renderer.render(painter, self._element_id, self._bounds)
+            else:
+                renderer.render(painter, self._bounds)
+
         painter.setRenderHint(QtGui.QPainter.Antialiasing)
 
         if self._hovering:
@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from PyQt5 import QtCore, QtGui, QtWidgets, uic
-from opentoolcontroller.strings import col, typ, bt
+from PyQt5 import QtCore, QtGui, QtWidgets
+from opentoolcontroller.ui_cache import loadUiType
+from opentoolcontroller.strings import col, typ, bt, defaults
 from opentoolcontroller.views.widgets.scientific_spin import ScientificDoubleSpinBox
 from opentoolcontroller.views.widgets.behavior_editor_view import BTEditorWindow
+from opentoolcontroller.views.widgets.trend_view import TrendWindow
 
-node_control_view_base, node_control_view_form = uic.loadUiType("opentoolcontroller/views/NodeControlView.ui")
+node_control_view_base, node_control_view_form = loadUiType("opentoolcontroller/views/NodeControlView.ui")
 
 
 class BehaviorButton(QtWidgets.QPushButton):
@@ -129,13 +131,35 @@ class BehaviorButtonDevice(BehaviorButtonAborting):
 
 
 class NodeControlView(node_control_view_base, node_control_view_form):
+    '''Value views and behavior buttons for the children of the selected tool, system or device
+        - The value views are pooled by class, a new selection takes them back out of the layouts
+          and rebinds their mappers to the new indexes instead of building new widgets
+        - Behavior buttons are kept per behavior since they're connected to it
+        - The read only value views don't have mappers, the view watches the model and refreshes
+          the ones whose node's VALUE changed at most VALUE_REFRESH_HZ times a second. It stops
+          watching while hidden, like when another dock tab is shown, and refreshes them all when shown
+    '''
+
     def __init__(self, parent=None):
         super(node_control_view_base, self).__init__(parent)
         self.setupUi(self)
 
         self._model = None
         self._mapper = QtWidgets.QDataWidgetMapper()
+        self._behavior_button_mapper = QtWidgets.QDataWidgetMapper()
         self._current_index = None
+        self._trend_window = None
+
+        self._wid_pools = {} #widget class: [widgets not in a layout]
+        self._behavior_buttons = {} #(button class, behavior): button
+
+        self._value_views = {} #node: [value views showing it]
+        self._changed_nodes = set()
+        self._watching = False
+        self._value_timer = QtCore.QTimer(self)
+        self._value_timer.setSingleShot(True)
+        self._value_timer.setInterval(int(1000 / defaults.VALUE_REFRESH_HZ))
+        self._value_timer.timeout.connect(self.refreshValues)
 
         self._enable_run_tool_behaviors = True #False
         self._enable_run_system_behaviors = True #False
@@ -176,8 +200,7 @@ class NodeControlView(node_control_view_base, node_control_view_form):
         self._mapper.setRootIndex(parent_index)
         self._mapper.setCurrentModelIndex(index)
 
-        self._behavior_button_mapper = QtWidgets.QDataWidgetMapper()
-        self._behavior_button_mapper.setModel(self._model)
+        self._behavior_button_mapper.clearMapping()
 
         if typeInfo is typ.SYSTEM_NODE:
             self.ui_system_is_online.show()
@@ -232,22 +255,25 @@ class NodeControlView(node_control_view_base, node_control_view_form):
             child_index = index.child(row,0)
             node =  child_index.internalPointer()
 
-            wid = None
+            wid_class = None
 
             if node.typeInfo() in [typ.BOOL_VAR_NODE, typ.INT_VAR_NODE, typ.FLOAT_VAR_NODE]:
                 if node.userManualSet:
                     if setable:
-                        if   node.typeInfo() == typ.BOOL_VAR_NODE  : wid = ManualBoolSet()
-                        elif node.typeInfo() == typ.INT_VAR_NODE   : wid = ManualIntSet()
-                        elif node.typeInfo() == typ.FLOAT_VAR_NODE : wid = ManualFloatSet()
+                        if   node.typeInfo() == typ.BOOL_VAR_NODE  : wid_class = ManualBoolSet
+                        elif node.typeInfo() == typ.INT_VAR_NODE   : wid_class = ManualIntSet
+                        elif node.typeInfo() == typ.FLOAT_VAR_NODE : wid_class = ManualFloatSet
                     else:
-                        if   node.typeInfo() == typ.BOOL_VAR_NODE  : wid = ManualBoolView()
-                        elif node.typeInfo() == typ.INT_VAR_NODE   : wid = ManualIntView()
-                        elif node.typeInfo() == typ.FLOAT_VAR_NODE : wid = ManualFloatView()
-
-            if wid is not None:
-                wid.setModel(child_index.model())
-                wid.setRootIndex(index)
+                        if   node.typeInfo() == typ.BOOL_VAR_NODE  : wid_class = ManualBoolView
+                        elif node.typeInfo() == typ.INT_VAR_NODE   : wid_class = ManualIntView
+                        elif node.typeInfo() == typ.FLOAT_VAR_NODE : wid_class = ManualFloatView
+
+            if wid_class is not None:
+                wid = self.pooledWid(wid_class)
+                if wid_class in VALUE_VIEWS:
+                    self._value_views.setdefault(node, []).append(wid)
+                else:
+                    wid.setRootIndex(index)
                 wid.setCurrentModelIndex(child_index)
                 self.ui_var_views.addWidget(wid, ui_row, ui_col, 1, -1) #1 row, full width
                 ui_row += 1
@@ -278,15 +304,19 @@ class NodeControlView(node_control_view_base, node_control_view_form):
 
 
             if node.typeInfo() in [typ.TOOL_NODE, typ.SYSTEM_NODE]:
-                btn = BehaviorButtonAborting()
-                btn.setBehavior(behavior)
-                btn.setActionLog(index.model().actionLogCallback(), node.name)
-                self._behavior_button_mapper.addMapping(btn, col.RUNNING_BEHAVIOR, bytes('runningBehavior', 'ascii'))
+                btn_class = BehaviorButtonAborting
             else:
-                btn = BehaviorButtonDevice()
+                btn_class = BehaviorButtonDevice
+
+            btn = self._behavior_buttons.get((btn_class, behavior))
+            if btn is None:
+                btn = btn_class()
                 btn.setBehavior(behavior)
                 btn.setActionLog(index.model().actionLogCallback(), node.name)
-                self._behavior_button_mapper.addMapping(btn, col.RUNNING_BEHAVIOR, bytes('runningBehavior', 'ascii'))
+                self._behavior_buttons[(btn_class, behavior)] = btn
+            else:
+                btn.show()
+            self._behavior_button_mapper.addMapping(btn, col.RUNNING_BEHAVIOR, bytes('runningBehavior', 'ascii'))
 
 
             btn.enableEditBehaviors(self._enable_edit_behaviors)
@@ -302,50 +332,159 @@ class NodeControlView(node_control_view_base, node_control_view_form):
             child_index = index.child(row,0)
             node =  child_index.internalPointer()
 
-            wid = None
+            wid_class = None
 
-            if   node.typeInfo() == typ.D_IN_NODE  : wid = ManualBoolView()
-            elif node.typeInfo() == typ.D_OUT_NODE : wid = ManualBoolView()
-            elif node.typeInfo() == typ.A_IN_NODE  : wid = ManualFloatView()
-            elif node.typeInfo() == typ.A_OUT_NODE : wid = ManualFloatView()
+            if   node.typeInfo() == typ.D_IN_NODE  : wid_class = ManualBoolView
+            elif node.typeInfo() == typ.D_OUT_NODE : wid_class = ManualBoolView
+            elif node.typeInfo() == typ.A_IN_NODE  : wid_class = ManualFloatView
+            elif node.typeInfo() == typ.A_OUT_NODE : wid_class = ManualFloatView
 
 
             if node.typeInfo() in [typ.BOOL_VAR_NODE, typ.INT_VAR_NODE, typ.FLOAT_VAR_NODE]:
                 if not node.userManualSet:
-                    if   node.typeInfo() == typ.BOOL_VAR_NODE  : wid = ManualBoolView()
-                    elif node.typeInfo() == typ.INT_VAR_NODE   : wid = ManualIntView()
-                    elif node.typeInfo() == typ.FLOAT_VAR_NODE : wid = ManualFloatView()
+                    if   node.typeInfo() == typ.BOOL_VAR_NODE  : wid_class = ManualBoolView
+                    elif node.typeInfo() == typ.INT_VAR_NODE   : wid_class = ManualIntView
+                    elif node.typeInfo() == typ.FLOAT_VAR_NODE : wid_class = ManualFloatView
 
 
 
-            if wid is not None:
-                wid.setModel(child_index.model())
-                wid.setRootIndex(index)
+            if wid_class is not None:
+                wid = self.pooledWid(wid_class)
+                if wid_class in VALUE_VIEWS:
+                    self._value_views.setdefault(node, []).append(wid)
+                else:
+                    wid.setRootIndex(index)
                 wid.setCurrentModelIndex(child_index)
                 self.ui_io_views.addWidget(wid, ui_row, ui_col, 1, -1) #1 row, full width
                 ui_row += 1
+
+                if node.typeInfo() in [typ.D_IN_NODE, typ.D_OUT_NODE, typ.A_IN_NODE, typ.A_OUT_NODE]:
+                    wid.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+                    wid.io_index = QtCore.QPersistentModelIndex(child_index)
        
 
 
 
+    def ioMenu(self, index):
+        menu = QtWidgets.QMenu()
+        trend_action = menu.addAction('Trend', lambda: self.trendNode(index))
+        trend_action.setEnabled(self._model.historian() is not None)
+        menu.exec_(QtGui.QCursor.pos())
+
+    #Adds the node to the trend window, there's one per view so several nodes can be compared
+    def trendNode(self, index):
+        if not index.isValid() or self._model.historian() is None:
+            return
+
+        if self._trend_window is None:
+            self._trend_window = TrendWindow(self._model.historian())
+
+        index = QtCore.QModelIndex(index)
+        self._trend_window.addTrace(self._model.nodePath(index), index.internalPointer().name)
+        self._trend_window.show()
+        self._trend_window.raise_()
+
+    #Takes the widgets out of the layouts and puts them back in their pool, the set widgets have
+    #their mappers pointed at nothing so they aren't updated while hidden
     def clearWids(self):
+        self._value_views = {}
+        self._changed_nodes = set()
         wid_layouts = [self.ui_var_views, self.ui_behavior_buttons, self.ui_io_views]#, self.ui_bottom_wids]
 
         for layout in wid_layouts:
             for i in reversed(range(layout.count())):
                 wid = layout.takeAt(i).widget()
-                if wid is not None:
-                    wid.deleteLater()
+                if wid is None:
+                    continue
+
+                wid.hide()
+                if not isinstance(wid, BehaviorButton):
+                    if not isinstance(wid, VALUE_VIEWS):
+                        wid.setRootIndex(QtCore.QModelIndex())
+                    wid.setContextMenuPolicy(QtCore.Qt.DefaultContextMenu)
+                    wid.io_index = None
+                    self._wid_pools.setdefault(type(wid), []).append(wid)
+
+    #An unused widget of wid_class, a set widget's mapper already has the model and mapping
+    def pooledWid(self, wid_class):
+        pool = self._wid_pools.get(wid_class)
+        if pool:
+            wid = pool.pop()
+            wid.show()
+            return wid
+
+        wid = wid_class()
+        if wid_class not in VALUE_VIEWS:
+            wid.setModel(self._model)
+        wid.io_index = None
+        wid.customContextMenuRequested.connect(lambda pos, w=wid: self.ioMenu(w.io_index))
+        return wid
+
+    def dropWids(self):
+        self.clearWids()
+        for wid in [w for pool in self._wid_pools.values() for w in pool] + list(self._behavior_buttons.values()):
+            wid.deleteLater()
+
+        self._wid_pools = {}
+        self._behavior_buttons = {}
+
+
+
+
+
+    def watchValues(self, watch):
+        if self._model is None or watch == self._watching:
+            return
+
+        if watch:
+            self._model.dataChanged.connect(self.valuesChanged)
+            self._changed_nodes = set(self._value_views)
+            self.refreshValues()
+        else:
+            self._model.dataChanged.disconnect(self.valuesChanged)
+            self._value_timer.stop()
+            self._changed_nodes = set()
+
+        self._watching = watch
+
+    def valuesChanged(self, top_left, bottom_right, roles=[]):
+        if not top_left.column() <= col.VALUE <= bottom_right.column():
+            return
+
+        for row in range(top_left.row(), bottom_right.row()+1):
+            node = top_left.sibling(row, 0).internalPointer()
+            if node in self._value_views:
+                self._changed_nodes.add(node)
+                if not self._value_timer.isActive():
+                    self._value_timer.start()
 
+    def refreshValues(self):
+        changed_nodes = self._changed_nodes
+        self._changed_nodes = set()
 
+        for node in changed_nodes:
+            for wid in self._value_views.get(node, ()):
+                wid.refresh()
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.watchValues(True)
 
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.watchValues(False)
 
     def setModel(self, model):
         if hasattr(model, 'mapToSource'):
             model = model.sourceModel()
+
+        watching = self._watching
+        self.watchValues(False)
         self._model = model
+        self.dropWids()
+        self.watchValues(watching or self.isVisible())
 
+        self._behavior_button_mapper.setModel(model)
         self._mapper.setModel(model)
         self._mapper.addMapping(self.ui_name, col.NAME, bytes("text",'ascii'))
         #self._mapper.addMapping(self.ui_description, col.DESCRIPTION, bytes("text",'ascii'))
@@ -411,7 +550,7 @@ class ManualBoolView(QtWidgets.QWidget):
     def __init__(self):
         super().__init__()
         self.setSizePolicy(QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Minimum)
-        self.mapper = QtWidgets.QDataWidgetMapper()
+        self._node = None
         hbox = QtWidgets.QHBoxLayout()
         self.setLayout(hbox)
 
@@ -427,20 +566,20 @@ class ManualBoolView(QtWidgets.QWidget):
         hbox.addStretch(1)
         hbox.setContentsMargins(0,0,0,0)
 
-    def setRootIndex(self, index):
-        self.mapper.setRootIndex(index)
-
     def setCurrentModelIndex(self, index):
-        self.mapper.setCurrentModelIndex(index)
         node = index.internalPointer()
+        self._node = node
 
         #These aren't changing often so they can just be set
         self.ui_name.setText(str(node.name))
         self._off_name = node.offName
         self._on_name = node.onName
+        self.refresh()
 
-        txt = self._on_name if node.value() else self._off_name
-        self.ui_val.setText(txt)
+    #The NodeControlView calls this when the value changes
+    def refresh(self):
+        if self._node is not None:
+            self.value = self._node.data(col.VALUE)
 
 
     @QtCore.pyqtProperty(int)
@@ -453,11 +592,6 @@ class ManualBoolView(QtWidgets.QWidget):
         txt = self._on_name if value else self._off_name
         self.ui_val.setText(txt)
 
-    def setModel(self, model):
-        if hasattr(model, 'sourceModel'):model = model.sourceModel()
-        self.mapper.setModel(model)
-        self.mapper.addMapping(self, col.VALUE, bytes('value','ascii'))
-
 
 class ManualBoolSet(QtWidgets.QWidget):
     #Format "Name : bnt_off btn_on"
@@ -537,7 +671,7 @@ class ManualIntView(QtWidgets.QWidget):
     def __init__(self):
         super().__init__()
         self.setSizePolicy(QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Minimum)
-        self.mapper = QtWidgets.QDataWidgetMapper()
+        self._node = None
 
         hbox = QtWidgets.QHBoxLayout()
         self.setLayout(hbox)
@@ -554,15 +688,18 @@ class ManualIntView(QtWidgets.QWidget):
         hbox.addStretch(1)
         hbox.setContentsMargins(0,0,0,0)
 
-    def setRootIndex(self, index):
-        self.mapper.setRootIndex(index)
-
     def setCurrentModelIndex(self, index):
         node = index.internalPointer()
         self.ui_name.setText(str(node.name))
         self.ui_units.setText(str(node.units))
 
-        self.mapper.setCurrentModelIndex(index)
+        self._node = node
+        self.refresh()
+
+    #The NodeControlView calls this when the value changes
+    def refresh(self):
+        if self._node is not None:
+            self.val = self._node.data(col.VALUE)
 
 
     @QtCore.pyqtProperty(float)
@@ -579,11 +716,6 @@ class ManualIntView(QtWidgets.QWidget):
         except:
             self.ui_val.setText('')
 
-    def setModel(self, model):
-        if hasattr(model, 'sourceModel'):model = model.sourceModel()
-        self.mapper.setModel(model)
-        self.mapper.addMapping(self, col.VALUE, bytes('val','ascii')) #Only one mapping of 'self' allowed per mapper
-
 
 
 
@@ -592,7 +724,7 @@ class ManualFloatView(QtWidgets.QWidget):
     def __init__(self):
         super().__init__()
         self.setSizePolicy(QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Minimum)
-        self.mapper = QtWidgets.QDataWidgetMapper()
+        self._node = None
 
         hbox = QtWidgets.QHBoxLayout()
         self.setLayout(hbox)
@@ -612,9 +744,6 @@ class ManualFloatView(QtWidgets.QWidget):
         hbox.addStretch(1)
         hbox.setContentsMargins(0,0,0,0)
 
-    def setRootIndex(self, index):
-        self.mapper.setRootIndex(index)
-
     def setCurrentModelIndex(self, index):
         node = index.internalPointer()
         #These aren't changing often so they can just be set
@@ -623,7 +752,13 @@ class ManualFloatView(QtWidgets.QWidget):
         self._display_digits = node.displayDigits
         self._display_scientific = node.displayScientific
 
-        self.mapper.setCurrentModelIndex(index)
+        self._node = node
+        self.refresh()
+
+    #The NodeControlView calls this when the value changes
+    def refresh(self):
+        if self._node is not None:
+            self.val = self._node.data(col.VALUE)
 
 
     @QtCore.pyqtProperty(float)
@@ -645,11 +780,6 @@ class ManualFloatView(QtWidgets.QWidget):
         except:
             self.ui_val.setText('')
 
-    def setModel(self, model):
-        if hasattr(model, 'sourceModel'):model = model.sourceModel()
-        self.mapper.setModel(model)
-        self.mapper.addMapping(self, col.VALUE, bytes('val','ascii')) #Only one mapping of 'self' allowed per mapper
-
 
 
 
@@ -731,3 +861,6 @@ class ManualFloatSet(QtWidgets.QWidget):
         if hasattr(model, 'sourceModel'):model = model.sourceModel()
         self.mapper.setModel(model)
         self.mapper.addMapping(self.ui_value, col.VALUE)# bytes("text",'ascii'))
+
+
+VALUE_VIEWS = (ManualBoolView, ManualIntView, ManualFloatView)
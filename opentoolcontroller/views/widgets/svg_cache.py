@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import os
+
+from PyQt5 import QtCore, QtSvg
+
+
+class SvgCache():
+    '''Parsed svg files shared by every icon that uses them, keyed by path and modification time
+        - renderer() hands out the same QSvgRenderer for a path until the file changes on disk,
+          a changed file gets a new renderer so the icons still holding the old one aren't touched
+        - elementBounds() keeps the size of each layer, finding an element in the svg walks the document
+    '''
+
+    def __init__(self):
+        self._entries = {} #path: [mtime, QSvgRenderer, {element_id: QRectF}]
+
+    def _entry(self, path):
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = None
+
+        entry = self._entries.get(path)
+        if entry is None or entry[0] != mtime:
+            renderer = QtSvg.QSvgRenderer()
+            renderer.load(path)
+            entry = [mtime, renderer, {}]
+            self._entries[path] = entry
+
+        return entry
+
+    def renderer(self, path):
+        return self._entry(path)[1]
+
+    #Rect at 0,0 the size of the element, like QGraphicsSvgItem's boundingRect. The whole
+    #image for an empty element_id and an empty rect if the svg doesn't have it. The file
+    #isn't checked for changes here, that happens when an icon asks for the renderer
+    def elementBounds(self, path, element_id):
+        entry = self._entries.get(path)
+        if entry is None:
+            entry = self._entry(path)
+        mtime, renderer, bounds = entry
+
+        if element_id not in bounds:
+            if not element_id:
+                size = QtCore.QSizeF(renderer.defaultSize())
+            elif renderer.elementExists(element_id):
+                size = renderer.boundsOnElement(element_id).size()
+            else:
+                size = QtCore.QSizeF()
+            bounds[element_id] = QtCore.QRectF(QtCore.QPointF(0, 0), size)
+
+        return bounds[element_id]
+
+    def clear(self):
+        self._entries = {}
+
+
+svg_cache = SvgCache()
@@ -1,8 +1,9 @@
 #!/usr/bin/python3
 # -*- coding: utf-8 -*-
 from PyQt5 import QtGui, QtCore, QtWidgets, QtSvg
-from opentoolcontroller.strings import typ, col
+from opentoolcontroller.strings import typ, col, defaults
 from opentoolcontroller.views.widgets.device_icon_widget import DeviceIconWidget
+from opentoolcontroller.views.widgets.svg_cache import svg_cache
 
 class SystemGraphicsView(QtWidgets.QGraphicsView):
     def __init__(self, *args, **kwargs):
@@ -19,14 +20,79 @@ class SystemGraphicsView(QtWidgets.QGraphicsView):
         painter.drawRect(rect)
 
 
+class SystemScene(QtWidgets.QGraphicsScene):
+    '''The background and device icons of one system, kept while other systems are shown
+        - The background svg is rasterized at the view's zoom and scaled back down so it's
+          in the same scene coordinates as the unscaled image, it's only redone when the zoom
+          or the file changes
+    '''
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._device_icons = []
+        self._background = None
+        self._background_path = None
+        self._background_zoom = None
+
+    def deviceIcons(self):
+        return self._device_icons
+
+    def setBackground(self, path, zoom=1.0):
+        if self._background is not None:
+            self.removeItem(self._background)
+        self._background = None
+        self._background_path = path
+        self._background_zoom = None
+        self.setBackgroundZoom(zoom)
+
+    def setBackgroundZoom(self, zoom):
+        if self._background_path is None or zoom <= 0 or zoom == self._background_zoom:
+            return
+
+        renderer = svg_cache.renderer(self._background_path)
+        if not renderer.isValid():
+            return
+
+        size = QtCore.QSizeF(renderer.defaultSize()) * zoom
+        image = QtGui.QImage(max(1, int(round(size.width()))), max(1, int(round(size.height()))), QtGui.QImage.Format_ARGB32_Premultiplied)
+        image.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(image)
+        renderer.render(painter)
+        painter.end()
+        pixmap = QtGui.QPixmap.fromImage(image)
+
+        if self._background is None:
+            self._background = self.addPixmap(pixmap)
+            self._background.setZValue(-1)
+            self._background.setTransformationMode(QtCore.Qt.SmoothTransformation)
+        else:
+            self._background.setPixmap(pixmap)
+
+        self._background.setScale(1.0 / zoom)
+        self._background_zoom = zoom
+
+
 class SystemControlView(QtWidgets.QAbstractItemView):
+    '''Shows the device icons of the selected system over its background
+        - Each system's scene is built the first time it's shown and kept, selecting another
+          system swaps the scene and model changes update the items of whichever scene has them
+        - Adding or removing rows drops the scene of the system they're in so it's rebuilt
+        - The icon items of every built scene are mapped by their icon and device nodes, a change
+          is a single dict lookup and anything else in the tool, like the HAL values, is ignored
+        - Icon changes are queued and applied together at most ICON_REFRESH_HZ times a second,
+          an icon changed several times in between is only updated to its latest state
+    '''
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._scene_box = QtCore.QRectF(0, 0, 1000, 1000)
         self._previous_index = None
-        self._scene = QtWidgets.QGraphicsScene(self)
-        self._renderers = []
+        self._empty_scene = QtWidgets.QGraphicsScene(self)
+        self._scene = self._empty_scene
+        self._scenes = {} #system node: SystemScene
         self._device_icons = []
+        self._icon_items = {} #icon node: DeviceIconWidget, for every built scene
+        self._device_items = {} #device node: DeviceIconWidget
 
         #UI Stuff
         self._view = SystemGraphicsView(self)
@@ -42,107 +108,181 @@ class SystemControlView(QtWidgets.QAbstractItemView):
         self._current_system_index = None
         self._movable_icons = False
 
+        #The background is rasterized again once resizing stops
+        self._zoom_timer = QtCore.QTimer(self)
+        self._zoom_timer.setSingleShot(True)
+        self._zoom_timer.timeout.connect(self.updateBackgroundZoom)
+
+        self._icon_handlers = {col.SVG       : self.updateIconSvg,
+                               col.LAYER     : self.updateIconLayer,
+                               col.X         : self.updateIconPos,
+                               col.Y         : self.updateIconPos,
+                               col.POS       : self.updateIconPos,
+                               col.SCALE     : self.updateIconPos,
+                               col.ROTATION  : self.updateIconPos,
+                               col.TEXT_X    : self.updateIconPos,
+                               col.TEXT_Y    : self.updateIconPos,
+                               col.FONT_SIZE : self.updateIconPos,
+                               col.HAS_TEXT  : self.updateIconHasText,
+                               col.TEXT      : self.updateIconText}
+
+        self._pending_icons = {} #icon node: set(handlers)
+        self._icon_timer = QtCore.QTimer(self)
+        self._icon_timer.setSingleShot(True)
+        self._icon_timer.setInterval(int(1000 / defaults.ICON_REFRESH_HZ))
+        self._icon_timer.timeout.connect(self.applyIconChanges)
+
+    def setModel(self, model):
+        super().setModel(model)
+        model.modelReset.connect(self.clearScenes)
+        model.rowsRemoved.connect(self.rowsRemoved)
+
     def setMovableIcons(self, value):
         self._movable_icons = bool(value)
-        self.setSelection(self._current_system_index)
+        for scene in self._scenes.values():
+            for wid in scene.deviceIcons():
+                wid.setMovable(self._movable_icons)
 
     def movableIcons(self):
         return self._movable_icons
 
-    def resizeEvent(self, event):
-        self._view.fitInView(self._scene_box, QtCore.Qt.KeepAspectRatio)
-
-    def dataChanged(self, index_top_left, index_bottom_right, roles):
-        index = index_top_left #TODO
-        tool_model = self.model()
-
-        try:
-            #TODO not quite sure why the index isn't the same as the current_system_index, but they point to the same place
-            if index.internalPointer() == self._current_system_index.internalPointer():
-                if index.column() == col.BACKGROUND_SVG:
-                    self.setBackground(tool_model.data(index, QtCore.Qt.DisplayRole))
-
-
+    def clearScenes(self):
+        self._view.setScene(self._empty_scene)
+        self._scene = self._empty_scene
+        self._device_icons = []
+        self._current_system_index = None
+        self._icon_items = {}
+        self._device_items = {}
+        self._pending_icons = {}
 
-            elif index.internalPointer().typeInfo() == typ.DEVICE_ICON_NODE and  index.parent().parent() == self._current_system_index:
-                if index.column() == col.SVG:
-                    icon_node = index.internalPointer()
-                    wid = self._device_icons[index.parent().row()]
-                    wid.renderer().load(icon_node.svgFullPath())
-                    wid.setElementId(icon_node.layer())
+        for scene in self._scenes.values():
+            scene.deleteLater()
+        self._scenes = {}
 
-                elif index.column() == col.LAYER:
-                    icon_node = index.internalPointer()
-                    wid = self._device_icons[index.parent().row()]
-                    wid.setElementId(icon_node.layer())
+    def zoom(self):
+        return self._view.transform().m11()
 
-                elif index.column() in [col.X, col.Y, col.SCALE, col.ROTATION, col.ROTATION, col.TEXT_X, col.TEXT_Y, col.FONT_SIZE]:
-                    icon_node = index.internalPointer()
+    def updateBackgroundZoom(self):
+        if isinstance(self._scene, SystemScene):
+            self._scene.setBackgroundZoom(self.zoom())
 
-                    #Since each device has to have a single icon the parents row is the same as this index
-                    wid = self._device_icons[index.parent().row()]
-                    wid.setPos(float(icon_node.x) , float(icon_node.y))
-                    wid.setRotation(float(icon_node.rotation))
-                    wid.setScale(float(icon_node.scale))
+    def resizeEvent(self, event):
+        self._view.fitInView(self._scene_box, QtCore.Qt.KeepAspectRatio)
+        self._zoom_timer.start(100)
 
+    def setBackground(self, system_index, path):
+        scene = self._scenes.get(system_index.internalPointer())
+        if scene is not None:
+            scene.setBackground(path, self.zoom())
 
-                    if wid.text_wid:
-                        wid.text_wid.setPos(float(icon_node.x + icon_node.textX) , float(icon_node.y + icon_node.textY))
-                        wid.text_wid.setDefaultTextColor(icon_node.fontColor())
-                        font = QtGui.QFont("Helvetica", icon_node.fontSize)
-                        wid.text_wid.setFont(font)
+    def dataChanged(self, index_top_left, index_bottom_right, roles):
+        index = index_top_left #TODO
+        node = index.internalPointer()
+
+        if node in self._icon_items:
+            handler = self._icon_handlers.get(index.column())
+            if handler is not None:
+                self._pending_icons.setdefault(node, set()).add(handler)
+                if not self._icon_timer.isActive():
+                    self._icon_timer.start()
+
+        elif node in self._scenes:
+            if index.column() == col.BACKGROUND_SVG:
+                self.setBackground(index, node.backgroundSVGFullPath())
+
+    def applyIconChanges(self):
+        self._icon_timer.stop()
+        pending_icons = self._pending_icons
+        self._pending_icons = {}
+
+        for icon_node, handlers in pending_icons.items():
+            wid = self._icon_items.get(icon_node)
+            if wid is not None:
+                for handler in handlers:
+                    handler(wid, icon_node)
+
+    def updateIconSvg(self, wid, icon_node):
+        wid.setSvg(icon_node.svgFullPath())
+        wid.setElementId(icon_node.layer())
+
+    def updateIconLayer(self, wid, icon_node):
+        if wid.elementId() != icon_node.layer():
+            wid.setElementId(icon_node.layer())
 
+    def updateIconPos(self, wid, icon_node):
+        wid.setPos(float(icon_node.x) , float(icon_node.y))
+        wid.setRotation(float(icon_node.rotation))
+        wid.setScale(float(icon_node.scale))
 
-                elif index.column() in [col.TEXT]:
-                    icon_node = index.internalPointer()
-                    wid = self._device_icons[index.parent().row()]
-                    if wid.text_wid:
-                        wid.text_wid.setPlainText(icon_node.text())
+        if wid.text_wid:
+            wid.text_wid.setPos(float(icon_node.x + icon_node.textX) , float(icon_node.y + icon_node.textY))
+            wid.text_wid.setDefaultTextColor(icon_node.fontColor())
+            font = QtGui.QFont("Helvetica", icon_node.fontSize)
+            wid.text_wid.setFont(font)
 
+    def updateIconHasText(self, wid, icon_node):
+        if icon_node.hasText:
+            if not wid.text_wid:
+                font = QtGui.QFont("Helvetica", icon_node.fontSize)
+                text_wid = wid.scene().addText(icon_node.text(), font)
+                text_wid.setPos(float(icon_node.x + icon_node.textX) , float(icon_node.y + icon_node.textY))
+                text_wid.setDefaultTextColor(icon_node.fontColor())
+                wid.text_wid = text_wid
 
-                elif index.column() in [col.HAS_TEXT]:
-                    icon_node = index.internalPointer()
-                    wid = self._device_icons[index.parent().row()]
+        else:
+            if wid.text_wid:
+                wid.scene().removeItem(wid.text_wid)
+                wid.text_wid = None
 
-                    if icon_node.hasText:
-                        if not wid.text_wid:
-                            font = QtGui.QFont("Helvetica", icon_node.fontSize)
-                            text_wid = self._scene.addText(icon_node.text(), font)
-                            text_wid.setPos(float(icon_node.x + icon_node.textX) , float(icon_node.y + icon_node.textY))
-                            text_wid.setDefaultTextColor(icon_node.fontColor())
-                            wid.text_wid = text_wid
+    def updateIconText(self, wid, icon_node):
+        if wid.text_wid and wid.text_wid.toPlainText() != icon_node.text():
+            wid.text_wid.setPlainText(icon_node.text())
 
-                    else:
-                        if wid.text_wid:
-                            self._scene.removeItem(wid.text_wid)
-                            wid.text_wid = None
 
 
-        except:
-            pass
+    def rowsAboutToBeRemoved(self, parent_index, start, end):
+        if hasattr(parent_index.model(), 'mapToSource'):
+            parent_index = parent_index.model().mapToSource(parent_index)
 
+        self.applyIconChanges()
+        self.dropScenes(parent_index, start, end)
 
+    def rowsRemoved(self, parent_index, start, end):
+        if self._current_system_index is not None and self._current_system_index.isValid():
+            self.displaySystem(self._current_system_index)
 
-    def rowsAboutToBeRemoved(self, parent_index, start, end):
+    def rowsInserted(self, parent_index, start, end):
         if hasattr(parent_index.model(), 'mapToSource'):
             parent_index = parent_index.model().mapToSource(parent_index)
 
-        if parent_index == self._current_system_index:
-            model = parent_index.model()
+        self.dropScenes(parent_index, start, end)
+        self.displaySystem(self._current_system_index)
 
-            device_indexes = []
-            for i in range(start, end+1):
-                device_indexes.append(model.index(i, 0, parent_index))
+    #Drops the scenes of the system parent_index is in, or of the systems in the rows if it's above them
+    def dropScenes(self, parent_index, start, end):
+        index = parent_index
+        while index.isValid() and index.internalPointer().typeInfo() != typ.SYSTEM_NODE:
+            index = index.parent()
 
-            for device_index in device_indexes:
-                wid = self._device_icons[device_index.row()]
-                self._scene.removeItem(wid)
+        if index.isValid():
+            nodes = [index.internalPointer()]
+        else:
+            nodes = [self.model().index(row, 0, parent_index).internalPointer() for row in range(start, end+1)]
 
-            del self._device_icons[start:end+1]
+        for node in nodes:
+            scene = self._scenes.pop(node, None)
+            if scene is None:
+                continue
 
+            if scene is self._scene:
+                self._view.setScene(self._empty_scene)
+                self._scene = self._empty_scene
+                self._device_icons = []
 
-    def rowsInserted(self, parent_index, start, end):
-        self.displaySystem(self._current_system_index)
+            for items in [self._icon_items, self._device_items]:
+                for item_node in [n for n, wid in items.items() if wid.scene() is scene]:
+                    del items[item_node]
+            scene.deleteLater()
 
     #This abstract view needs to emit a currentChanged(
     def setSelection(self, index):
@@ -171,7 +311,9 @@ class SystemControlView(QtWidgets.QAbstractItemView):
             for icon in self._device_icons:
                 icon.clearSelected()
 
-            self._device_icons[index.row()].setSelected()
+            wid = self._device_items.get(node)
+            if wid is not None:
+                wid.setSelected()
 
         self.setCurrentIndex(index)
 
@@ -179,22 +321,31 @@ class SystemControlView(QtWidgets.QAbstractItemView):
         self.model().setData(index.siblingAtColumn(col.POS), pos, QtCore.Qt.EditRole)
 
     def displaySystem(self, system_index):
-        self._view.resetTransform() #Needed?
-        self._scene.clear()
-        self._device_icons = []
-
-        if system_index == None:
+        if system_index is None or not system_index.isValid():
+            self._view.setScene(self._empty_scene)
+            self._scene = self._empty_scene
+            self._device_icons = []
             return
 
         system_node = system_index.internalPointer()
-        svg_image = system_node.backgroundSVGFullPath()
-        movable = self.movableIcons()
+        if system_node not in self._scenes:
+            self._scenes[system_node] = self.buildScene(system_index)
 
-        background = QtGui.QPixmap(svg_image)
-        #background = background.scaled(int(self._scene_box.width()), int(self._scene_box.height()), QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
-        self._scene.addPixmap(background)
+        self._scene = self._scenes[system_node]
+        self._device_icons = self._scene.deviceIcons()
+        self._view.setScene(self._scene)
+
+        #Resize the view
+        self._view.fitInView(self._scene_box, QtCore.Qt.KeepAspectRatio)
+        self.updateBackgroundZoom()
 
+    def buildScene(self, system_index):
+        scene = SystemScene(self)
+        system_node = system_index.internalPointer()
+        movable = self.movableIcons()
 
+        self._view.fitInView(self._scene_box, QtCore.Qt.KeepAspectRatio)
+        scene.setBackground(system_node.backgroundSVGFullPath(), self.zoom())
 
         #Add the Device Icons
         icon_indexes = self.model().indexesOfType(typ.DEVICE_ICON_NODE, system_index)
@@ -203,37 +354,32 @@ class SystemControlView(QtWidgets.QAbstractItemView):
 
             icon_node = icon_index.internalPointer()
 
-            renderer = QtSvg.QSvgRenderer(self)
-            renderer.load(icon_node.svgFullPath())
-
-
-            wid = DeviceIconWidget(renderer)
+            wid = DeviceIconWidget()
+            wid.setSvg(icon_node.svgFullPath())
             wid.setCallback(self.setSelection)
             wid.setPosCallback(self.setIconPosition)
             wid.setIndex(icon_index)
             wid.setElementId(icon_node.layer())
             wid.setMovable(movable)
-            
-            
 
-            #wid.setPos(float(icon_node.x) , float(icon_node.y))
             wid.setPos(icon_node.pos())
             wid.setRotation(float(icon_node.rotation))
             wid.setScale(float(icon_node.scale))
 
-            self._device_icons.append(wid)
-            self._scene.addItem(wid)
+            scene.deviceIcons().append(wid)
+            scene.addItem(wid)
+            self._icon_items[icon_node] = wid
+            self._device_items[icon_index.parent().internalPointer()] = wid
 
             wid.text_wid = None
             if icon_node.hasText:
                 font = QtGui.QFont("Helvetica", icon_node.fontSize)
-                text_wid = self._scene.addText(icon_node.text(), font)
+                text_wid = scene.addText(icon_node.text(), font)
                 text_wid.setPos(float(icon_node.x + icon_node.textX) , float(icon_node.y + icon_node.textY))
                 text_wid.setDefaultTextColor(icon_node.fontColor())
                 wid.text_wid = text_wid
 
-        #Resize the view
-        self._view.fitInView(self._scene_box, QtCore.Qt.KeepAspectRatio)
+        return scene
 
 
 
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+import numpy as np
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+def polygonFromArrays(x, y):
+    #Fills the QPolygonF's memory directly, a QPointF is two doubles
+    polygon = QtGui.QPolygonF(len(x))
+    if len(x) > 0:
+        pointer = polygon.data()
+        pointer.setsize(len(x) * 16)
+        buffer = np.frombuffer(pointer, dtype=np.float64)
+        buffer[0::2] = x
+        buffer[1::2] = y
+    return polygon
+
+
+class TrendPlot(QtWidgets.QWidget):
+    '''Strip chart of node values from the Historian, each trace is scaled to the full height
+        - The time span is split into a column per pixel, each column keeps the min and max of its
+          samples and is drawn as a vertical line so no spike is lost however many samples there are
+        - Columns are aligned to multiples of the column width so the ones already filled stay valid
+          as time moves on, a refresh only recomputes the columns since the last one
+        - Older than the full rate samples kept in memory the historian's min/max buckets are used
+        - Drawing is a QPainter polyline per trace, the polygons are only rebuilt when data changes
+    '''
+
+    COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
+              '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
+
+    def __init__(self, historian, parent=None):
+        super().__init__(parent)
+        self.setMinimumSize(200, 100)
+        self.setAttribute(QtCore.Qt.WA_OpaquePaintEvent)
+
+        self._historian = historian
+        self._span_s = 60.0
+        self._traces = [] #[name, label, color, mins, maxs, polygon]
+
+        self._columns = 0
+        self._column_s = 1.0
+        self._first_column = None #Absolute column number, int(time // column_s), of the leftmost column
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start(50)
+
+    def spanS(self):
+        return self._span_s
+
+    def setSpanS(self, span_s):
+        self._span_s = float(span_s)
+        self._first_column = None
+        self.refresh()
+
+    def traceNames(self):
+        return [trace[0] for trace in self._traces]
+
+    def addTrace(self, name, label=None):
+        if name in self.traceNames():
+            return
+
+        color = QtGui.QColor(self.COLORS[len(self._traces) % len(self.COLORS)])
+        self._traces.append([name, label or name, color, None, None, QtGui.QPolygonF()])
+        self._first_column = None
+        self.refresh()
+
+    def clearTraces(self):
+        self._traces = []
+        self.update()
+
+    def refresh(self, now=None):
+        if not self._traces or not self.isVisible():
+            return
+
+        if now is None:
+            now = datetime.now().timestamp()
+
+        columns = self.width()
+        column_s = self._span_s / columns
+        last_column = int(now // column_s)
+
+        shift = None
+        if self._first_column is not None and columns == self._columns and column_s == self._column_s:
+            shift = last_column - (self._first_column + columns - 1)
+
+        #Everything is refilled when the size or span changes, or the clock jumped
+        if shift is None or shift < 0 or shift >= columns:
+            self._columns = columns
+            self._column_s = column_s
+            self._first_column = last_column - columns + 1
+            for trace in self._traces:
+                trace[3] = np.full(columns, np.nan)
+                trace[4] = np.full(columns, np.nan)
+            start_column = self._first_column
+
+        elif shift == 0:
+            start_column = last_column #Same columns, the last one may have new samples
+
+        else:
+            for trace in self._traces:
+                for values in trace[3:5]:
+                    values[:-shift] = values[shift:]
+                    values[-shift:] = np.nan
+            start_column = self._first_column + columns - 1 #The partly filled one before the shift
+            self._first_column += shift
+
+        for trace in self._traces:
+            self._fillColumns(trace, start_column * column_s)
+            trace[5] = self._tracePolygon(trace)
+
+        self.update()
+
+    def _fillColumns(self, trace, start):
+        name, mins, maxs = trace[0], trace[3], trace[4]
+
+        times, values = self._historian.samples(name, start)
+        sources = [(times, values, values)]
+
+        #Anything older than the oldest sample in memory comes from the buckets
+        first_time = self._historian.firstSampleTime(name)
+        if first_time is None or first_time > start:
+            bucket_times, bucket_mins, bucket_maxs, bucket_means = self._historian.buckets(name, start, first_time)
+            sources.append((bucket_times, bucket_mins, bucket_maxs))
+
+        for times, source_mins, source_maxs in sources:
+            if len(times) == 0:
+                continue
+
+            columns = (times // self._column_s).astype(np.int64) - self._first_column
+            keep = (columns >= 0) & (columns < len(mins))
+            columns, source_mins, source_maxs = columns[keep], source_mins[keep], source_maxs[keep]
+            if len(columns) == 0:
+                continue
+
+            #Times are sorted so each column's samples are contiguous
+            unique, starts = np.unique(columns, return_index=True)
+            mins[unique] = np.fmin(mins[unique], np.minimum.reduceat(source_mins, starts))
+            maxs[unique] = np.fmax(maxs[unique], np.maximum.reduceat(source_maxs, starts))
+
+    def _tracePolygon(self, trace):
+        mins, maxs = trace[3], trace[4]
+        filled = np.nonzero(~np.isnan(mins))[0]
+        if len(filled) == 0:
+            return QtGui.QPolygonF()
+
+        low = mins[filled].min()
+        high = maxs[filled].max()
+        if high == low:
+            low, high = low - 0.5, high + 0.5
+
+        margin = 4
+        scale = (self.height() - 2*margin) / (high - low)
+
+        x = np.repeat(filled.astype(np.float64) + 0.5, 2)
+        y = np.empty(2 * len(filled))
+        y[0::2] = self.height() - margin - (mins[filled] - low) * scale
+        y[1::2] = self.height() - margin - (maxs[filled] - low) * scale
+        return polygonFromArrays(x, y)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._first_column = None
+        self.refresh()
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtCore.Qt.white)
+
+        for i, trace in enumerate(self._traces):
+            name, label, color, mins, maxs, polygon = trace
+            painter.setPen(QtGui.QPen(color, 1))
+            painter.drawPolyline(polygon)
+
+            text = label
+            if maxs is not None and not np.isnan(maxs[-1]):
+                text += ' : %g' % maxs[-1]
+            painter.drawText(6, 14 + 14*i, text)
+
+        painter.setPen(QtCore.Qt.gray)
+        painter.drawText(self.rect().adjusted(4, 0, -4, -2), QtCore.Qt.AlignBottom | QtCore.Qt.AlignLeft, '-%gs' % self._span_s)
+        painter.drawText(self.rect().adjusted(4, 0, -4, -2), QtCore.Qt.AlignBottom | QtCore.Qt.AlignRight, 'now')
+
+
+class TrendWindow(QtWidgets.QWidget):
+    SPANS = [('1 min', 60), ('10 min', 600), ('1 hour', 3600), ('12 hours', 43200)]
+
+    def __init__(self, historian, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('Trend')
+        self.resize(800, 400)
+
+        self._plot = TrendPlot(historian)
+
+        self._span_box = QtWidgets.QComboBox()
+        for text, span_s in self.SPANS:
+            self._span_box.addItem(text, span_s)
+        self._span_box.currentIndexChanged.connect(lambda i: self._plot.setSpanS(self._span_box.itemData(i)))
+
+        self._clear_btn = QtWidgets.QPushButton('Clear')
+        self._clear_btn.clicked.connect(self._plot.clearTraces)
+
+        grid = QtWidgets.QGridLayout()
+        self.setLayout(grid)
+        grid.addWidget(self._span_box, 0, 0)
+        grid.addWidget(self._clear_btn, 0, 2)
+        grid.addWidget(self._plot, 1, 0, 1, 3)
+        grid.setColumnStretch(1, 1)
+
+    def plot(self):
+        return self._plot
+
+    def addTrace(self, name, label=None):
+        self._plot.addTrace(name, label)
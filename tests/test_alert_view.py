@@ -0,0 +1,183 @@
+import pytest
+from datetime import datetime
+from PyQt5 import QtCore
+from opentoolcontroller.strings import defaults
+from opentoolcontroller.alert_view import AlertTableModel, ActionLogTableModel, LogFilterProxyModel
+
+
+@pytest.fixture
+def alert_model(qtbot, tmp_path, monkeypatch):
+    (tmp_path / 'logs').mkdir()
+    monkeypatch.setattr(defaults, 'TOOL_DIR', str(tmp_path))
+    model = AlertTableModel(retention=20)
+    yield model
+    model.closeLog()
+
+
+def alertTexts(model):
+    return [model.data(model.index(row, 4), QtCore.Qt.DisplayRole) for row in range(model.rowCount())]
+
+
+def test_retention(alert_model):
+    for i in range(50):
+        alert_model.addAlert(2, 'chamber', 'valve', 'alert %d' % i)
+
+    assert 20 <= alert_model.rowCount() < 22
+    assert alertTexts(alert_model)[-1] == 'alert 49'
+
+
+def test_clear_callback_after_trim(alert_model):
+    clear_callback, set_user_clearable = alert_model.addAlert(2, 'chamber', 'valve', 'kept')
+    for i in range(5):
+        alert_model.addAlert(2, 'chamber', 'valve', 'alert %d' % i)
+    clear_callback()
+    assert alert_model.store().row(0)[6] == True
+
+    for i in range(50):
+        alert_model.addAlert(2, 'chamber', 'valve', 'alert %d' % i)
+    clear_callback() #dropped, does nothing
+
+
+def test_load_older(alert_model):
+    for i in range(50):
+        alert_model.addAlert(1, 'chamber', 'valve', 'alert %d' % i)
+
+    first_row = 50 - alert_model.rowCount()
+    assert alert_model.loadOlder(10) == 10
+    assert alertTexts(alert_model)[:11] == ['alert %d' % i for i in range(first_row-10, first_row+1)]
+    assert alert_model.loadOlder() == first_row - 10
+    assert alert_model.loadOlder() == 0
+
+
+def test_paged_rows_kept_when_trimmed(alert_model, monkeypatch):
+    monkeypatch.setattr(defaults, 'ALERT_LOG_INTERVAL_S', 0)
+    for i in range(50):
+        alert_model.addAlert(1, 'chamber', 'valve', 'alert %d' % i)
+        alert_model.addAlert(1, 'chamber', 'valve', 'alert %d' % i) #A repeat line in the log
+
+    paged = alert_model.loadOlder(10)
+    older = alertTexts(alert_model)[:paged]
+    for i in range(50, 100):
+        alert_model.addAlert(1, 'chamber', 'valve', 'alert %d' % i)
+
+    assert alertTexts(alert_model)[:paged] == older
+    assert alertTexts(alert_model)[-1] == 'alert 99'
+    assert alert_model.rowCount() - paged < 22
+
+    #Paging carries on from the last page regardless of what was trimmed or logged since
+    alert_model.loadOlder(10)
+    texts = alertTexts(alert_model)[:20]
+    assert texts[10:] == older
+    assert len(set(texts)) == len(texts)
+
+
+def test_dropped_callback_after_paging(alert_model, qtbot):
+    clear_callback, set_user_clearable = alert_model.addAlert(2, 'chamber', 'valve', 'trimmed')
+    for i in range(30):
+        alert_model.addAlert(2, 'chamber', 'valve', 'alert %d' % i)
+    first_row = 31 - alert_model.rowCount()
+    assert alert_model.loadOlder() == first_row
+    assert alertTexts(alert_model)[0] == 'trimmed'
+
+    with qtbot.assertNotEmitted(alert_model.dataChanged):
+        clear_callback() #The id isn't reused by a paged row
+
+
+def test_paged_rows_capped(alert_model):
+    for i in range(100):
+        alert_model.addAlert(1, 'chamber', 'valve', 'alert %d' % i)
+
+    first_row = 100 - alert_model.rowCount()
+    live = alert_model.rowCount()
+    for page in range(5):
+        assert alert_model.loadOlder(10) == 10
+
+    #The oldest rows paged are kept, the newest ones past the limit are dropped
+    assert alert_model.store().pagedCount() == 20
+    assert alert_model.rowCount() == live + 20
+    assert alertTexts(alert_model)[:20] == ['alert %d' % i for i in range(first_row-50, first_row-30)]
+
+
+def test_load_older_actions(qtbot, tmp_path, monkeypatch):
+    (tmp_path / 'logs').mkdir()
+    monkeypatch.setattr(defaults, 'TOOL_DIR', str(tmp_path))
+    model = ActionLogTableModel(retention=20)
+    model.setCurrentUser(lambda: 'admin')
+    for i in range(40):
+        model.addAction('action %d' % i)
+
+    first_row = 40 - model.rowCount()
+    assert model.loadOlder() == first_row
+    assert [model.data(model.index(row, 2), QtCore.Qt.DisplayRole) for row in range(40)] == ['action %d' % i for i in range(40)]
+    model.closeLog()
+
+
+def test_search(alert_model):
+    proxy = LogFilterProxyModel()
+    proxy.setSourceModel(alert_model)
+    alert_model.addAlert(2, 'chamber', 'valve', 'Pressure high')
+    alert_model.addAlert(1, 'loadlock', 'pump', 'Pressure low')
+    alert_model.addAlert(0, 'chamber', 'gauge', 'Door open')
+
+    proxy.setSearchText('Pressure')
+    assert proxy.rowCount() == 2
+    proxy.setSearchText('ressure hi')
+    assert proxy.rowCount() == 1
+    proxy.setSearchText('pressure')
+    assert proxy.rowCount() == 0
+
+    proxy.setSearchText('')
+    proxy.setColumnFilter(2, 'chamber')
+    assert proxy.rowCount() == 2
+
+    alert_model.addAlert(2, 'chamber', 'valve', 'Vent failed')
+    alert_model.addAlert(2, 'loadlock', 'valve', 'Vent failed')
+    assert proxy.rowCount() == 3
+
+
+def test_repeats_collapse(alert_model, monkeypatch):
+    monkeypatch.setattr(defaults, 'ALERT_LOG_INTERVAL_S', 3600)
+    clear_callback, set_user_clearable = alert_model.addAlert(2, 'chamber', 'valve', 'Stuck')
+    clear_callback()
+    for i in range(100):
+        callbacks = alert_model.addAlert(2, 'chamber', 'valve', 'Stuck')
+    alert_model.addAlert(2, 'chamber', 'pump', 'Stuck')
+
+    assert alert_model.rowCount() == 2
+    assert alertTexts(alert_model)[0] == 'Stuck (x101)'
+    assert alert_model.store().row(0)[6] == False
+
+    callbacks[0]()
+    assert alert_model.store().row(0)[6] == True
+
+    alert_model.closeLog()
+    with open(alert_model._log_writer.logFile()) as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 4
+    assert lines[3].endswith('Stuck (repeated 100 times)')
+
+
+def test_sorted_by_timestamp(alert_model, monkeypatch):
+    proxy = LogFilterProxyModel()
+    proxy.setSourceModel(alert_model)
+    proxy.setSortRole(QtCore.Qt.UserRole)
+    proxy.sort(1, QtCore.Qt.DescendingOrder)
+
+    alert_model.addAlert(2, 'chamber', 'valve', 'New year')
+    alert_model.store().row(0)[8] = datetime(2026, 1, 1).timestamp()
+    alert_model.addAlert(2, 'chamber', 'valve', 'Old year')
+    alert_model.store().row(1)[8] = datetime(2025, 12, 31).timestamp()
+    proxy.invalidate()
+
+    assert proxy.data(proxy.index(0, 4), QtCore.Qt.DisplayRole) == 'New year'
+    assert proxy.data(proxy.index(0, 1), QtCore.Qt.DisplayRole) == '01/01/2026, 00:00:00'
+    assert proxy.data(proxy.index(0, 0), QtCore.Qt.DisplayRole) == 'Alarm'
+
+
+def test_dropped_log_rows_raise_alert(alert_model):
+    alert_model._log_writer.close() #Nothing takes rows off the queue now
+    for i in range(10001):
+        alert_model.addAlert(1, 'chamber', 'valve', 'alert %d' % i)
+
+    assert alertTexts(alert_model)[-1] == 'Dropped 1 log rows, the disk is not keeping up'
+    assert alert_model.data(alert_model.index(alert_model.rowCount()-1, 0), QtCore.Qt.DisplayRole) == 'Warning'
@@ -0,0 +1,74 @@
+import pytest
+from PyQt5 import QtCore
+from opentoolcontroller.tool_model import ToolModel
+from opentoolcontroller.bt_model import BTModel
+from opentoolcontroller.views.widgets.behavior_editor_view import BTEditor
+from opentoolcontroller.strings import bt, typ
+
+
+@pytest.fixture
+def editor(qtbot):
+    model = ToolModel()
+    model.loadJSON({"type_info": typ.TOOL_NODE, "name": "Tool", "children": [
+        {"type_info": typ.SYSTEM_NODE, "name": "chamber", "children": [
+            {"type_info": typ.DEVICE_NODE, "name": "valve"},
+        ]},
+    ]})
+
+    bt_model = BTModel()
+    bt_model.loadJSON({"type_info": typ.ROOT_SEQUENCE_NODE, "name": "open", "children": [
+        {"type_info": typ.WAIT_TIME_NODE, "wait_time": 10.0, "pos": [10.0, 20.0]},
+        {"type_info": typ.SEQUENCE_NODE, "pos": [30.0, 20.0], "children": [
+            {"type_info": typ.SUCCESS_NODE, "pos": [40.0, 80.0]},
+        ]},
+    ]})
+    bt_model.setToolModel(model)
+    bt_model.setToolIndex(model.indexOfPath('chamber.valve'))
+
+    editor = BTEditor()
+    editor.setModel(bt_model)
+    qtbot.addWidget(editor)
+    return editor
+
+
+def test_only_changed_statuses_updated(editor, qtbot):
+    updated = []
+    items = {}
+    for p_index, g_item in editor._scene_items:
+        items[g_item.bt_node.typeInfo()] = g_item
+        g_item.setStatus = lambda status, g_item=g_item, set_status=g_item.setStatus: (updated.append(g_item), set_status(status))
+
+    editor.model().tick()
+    assert updated == [] #Waits for the refresh timer
+    qtbot.waitUntil(lambda: len(updated) == 2)
+    assert set(updated) == {items[typ.ROOT_SEQUENCE_NODE], items[typ.WAIT_TIME_NODE]}
+    assert items[typ.WAIT_TIME_NODE]._status == bt.RUNNING
+
+    #Still waiting, nothing changed so nothing is repainted
+    updated.clear()
+    editor.model().tick()
+    editor.updateStatuses()
+    assert updated == []
+
+
+def test_zoomed_out_nodes_hide_widgets(editor):
+    wait_item = [g_item for p_index, g_item in editor._scene_items if g_item.bt_node.typeInfo() == typ.WAIT_TIME_NODE][0]
+    assert wait_item._prox.isVisible()
+
+    editor.setZoom(0.3)
+    assert not wait_item.isDetailed()
+    assert not wait_item._prox.isVisible()
+    assert not wait_item.title_item.isVisible()
+
+    editor.setZoom(1.0)
+    assert wait_item._prox.isVisible()
+
+
+def test_path_rebuilt_once_per_event_loop(editor, qtbot):
+    path = editor._paths[0][1]
+    end = path.path().currentPosition()
+
+    path.setEndPos(end + QtCore.QPointF(50, 0))
+    path.setEndPos(end + QtCore.QPointF(100, 0))
+    assert path.path().currentPosition() == end
+    qtbot.waitUntil(lambda: path.path().currentPosition() == end + QtCore.QPointF(100, 0))
@@ -0,0 +1,52 @@
+import numpy as np
+from datetime import datetime
+from opentoolcontroller.historian import Historian, HistoryGroup
+
+
+def test_ring_keeps_newest():
+    group = HistoryGroup(['chamber.gauge', 'chamber.valve'], capacity=10, bucket_s=1, bucket_capacity=5)
+    for i in range(25):
+        group.append(100.0 + i*0.1, [i, i % 2])
+
+    times, values = group.samples('chamber.gauge')
+    assert len(times) == 10
+    assert list(values) == list(range(15, 25))
+
+    times, values = group.samples('chamber.valve', start=101.95, end=102.25)
+    assert list(values) == [0, 1, 0]
+
+
+def test_buckets():
+    group = HistoryGroup(['gauge'], capacity=100, bucket_s=1, bucket_capacity=5)
+    for i in range(30):
+        group.append(100.0 + i*0.25, [i])
+
+    times, mins, maxs, means = group.buckets('gauge')
+    assert list(times) == [102.0, 103.0, 104.0, 105.0, 106.0, 107.0] #5 kept plus the one being filled
+    assert list(mins) == [8, 12, 16, 20, 24, 28]
+    assert list(maxs) == [11, 15, 19, 23, 27, 29]
+    assert means[-1] == 28.5
+
+
+def test_spill_and_read(tmp_path):
+    historian = Historian(str(tmp_path / 'history'), spill_period_s=0)
+    start = datetime(2026, 3, 1, 23, 59, 50).timestamp()
+    pumps = historian.addGroup(['pump.speed', 'pump.current'])
+    gauges = historian.addGroup(['chamber.pressure'])
+
+    for i in range(400):
+        t = start + i*0.1
+        pumps.append(t, [i, -i])
+        gauges.append(t, [i*2])
+        if i % 50 == 49:
+            historian.spill(now=t)
+    historian.close()
+
+    assert len(list((tmp_path / 'history').glob('history_2026_03_0*.bin'))) == 2
+
+    times, values = historian.read('pump.current', start, start + 40)
+    assert list(values) == [-i for i in range(400)]
+
+    times, values = historian.read('chamber.pressure', start + 5, start + 15)
+    assert np.allclose(times, [start + i*0.1 for i in range(50, 151)])
+    assert list(values) == [i*2 for i in range(50, 151)]
@@ -0,0 +1,28 @@
+import sys
+from opentoolcontroller.import_timer import ImportTimer
+
+
+def test_self_and_cumulative_times(tmp_path, monkeypatch):
+    (tmp_path / 'timed_outer.py').write_text('import time, timed_inner\ntime.sleep(0.02)\n')
+    (tmp_path / 'timed_inner.py').write_text('import time\ntime.sleep(0.05)\nVALUE = 1\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    timer = ImportTimer()
+    timer.install()
+    try:
+        import timed_outer
+    finally:
+        timer.uninstall()
+        sys.modules.pop('timed_outer', None)
+        sys.modules.pop('timed_inner', None)
+
+    times = timer.times()
+    assert times['timed_inner'][0] >= 0.05
+    assert 0.02 <= times['timed_outer'][0] < 0.05 #The inner import isn't counted
+    assert times['timed_outer'][1] >= 0.07
+    assert timed_outer.timed_inner.VALUE == 1
+    assert timed_outer.__loader__.__class__.__name__ == 'SourceFileLoader'
+
+    report = timer.report(1)
+    assert len(report) == 2
+    assert report[1].endswith('timed_inner')
@@ -0,0 +1,74 @@
+import csv
+import json
+import pickle
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from opentoolcontroller.log_query import LogQuery, LOG_TIME_FORMAT, parseLogTime
+
+
+HEADER = ['Type', 'Time', 'System', 'Device', 'Alert']
+
+
+def writeLog(tmp_path, month, rows, mode='w'):
+    with open(tmp_path / ('alerts_' + month + '.csv'), mode, newline='') as f:
+        writer = csv.writer(f)
+        if mode == 'w':
+            writer.writerow(HEADER)
+        writer.writerows(rows)
+
+
+def alertRow(time, system, alert):
+    return ['Alarm', time.strftime(LOG_TIME_FORMAT), system, 'valve', alert]
+
+
+def newQuery(tmp_path):
+    return LogQuery(str(tmp_path), 'alerts', HEADER, [0, 2, 3], 1)
+
+
+def test_query_by_system_and_time(tmp_path):
+    start = datetime(2026, 1, 1)
+    rows = [alertRow(start + timedelta(hours=i), 'chamber_%d' % (i % 3), 'alert %d' % i) for i in range(24*60)]
+    writeLog(tmp_path, '2026_01', [r for r in rows if r[1].startswith('01/')])
+    writeLog(tmp_path, '2026_02', [r for r in rows if r[1].startswith('02/')])
+    writeLog(tmp_path, '2025_12', [alertRow(datetime(2025, 12, 31), 'chamber_0', 'old')])
+
+    result = newQuery(tmp_path).query(datetime(2026, 1, 31), datetime(2026, 2, 1, 23, 59), {2: 'chamber_1'})
+    rows = result.rows(0, len(result))
+
+    assert len(rows) == 16
+    assert rows[0][4] == 'alert 766' #newest first
+    assert all(row[2] == 'chamber_1' for row in rows)
+    assert not (tmp_path / 'alerts_2025_12.csv.idx').exists()
+
+
+def test_index_reused_and_extended(tmp_path):
+    writeLog(tmp_path, '2026_03', [alertRow(datetime(2026, 3, 1, 0, i), 'chamber', 'alert %d' % i) for i in range(10)])
+    assert len(newQuery(tmp_path).query()) == 10
+    assert (tmp_path / 'alerts_2026_03.csv.idx').is_file()
+
+    writeLog(tmp_path, '2026_03', [alertRow(datetime(2026, 3, 2), 'chamber', 'new\nline')], mode='a')
+    with patch('opentoolcontroller.log_query.parseLogTime', wraps=parseLogTime) as mock_parse:
+        result = newQuery(tmp_path).query(column_values={2: 'chamber'})
+
+    assert mock_parse.call_count == 1 #only the new row is parsed
+    assert len(result) == 11
+    assert result.rows(0, 2)[0][4] == 'new\nline'
+    assert result.rows(10, 5) == [alertRow(datetime(2026, 3, 1), 'chamber', 'alert 0')]
+
+
+class Unsafe():
+    def __reduce__(self):
+        return (print, ('unpickled',))
+
+
+def test_index_never_unpickled(tmp_path, capsys):
+    writeLog(tmp_path, '2026_04', [alertRow(datetime(2026, 4, 1, 0, i), 'chamber', 'alert %d' % i) for i in range(5)])
+    with open(tmp_path / 'alerts_2026_04.csv.idx', 'wb') as f:
+        pickle.dump(Unsafe(), f)
+
+    assert len(newQuery(tmp_path).query(column_values={2: 'chamber'})) == 5
+    assert 'unpickled' not in capsys.readouterr().out
+
+    with open(tmp_path / 'alerts_2026_04.csv.idx', 'rb') as f:
+        assert json.loads(f.readline())['count'] == 5
+    assert len(newQuery(tmp_path).query(column_values={2: 'chamber'})) == 5
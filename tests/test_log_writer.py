@@ -0,0 +1,70 @@
+import csv
+from opentoolcontroller.log_writer import LogWriter
+
+
+def readRows(log_file):
+    with open(log_file, newline='') as f:
+        return list(csv.reader(f))
+
+
+def test_rows_written_on_close(tmp_path):
+    writer = LogWriter(str(tmp_path), 'alerts', ['Type', 'Alert'])
+    for i in range(100):
+        writer.write(['Alarm', 'alert %d' % i])
+    writer.close()
+
+    rows = readRows(writer.logFile())
+    assert rows[0] == ['Type', 'Alert']
+    assert rows[1:] == [['Alarm', 'alert %d' % i] for i in range(100)]
+
+
+def test_header_only_for_new_file(tmp_path):
+    writer = LogWriter(str(tmp_path), 'actions', ['Time', 'Action'])
+    writer.write(['1', 'first'])
+    writer.close()
+
+    writer = LogWriter(str(tmp_path), 'actions', ['Time', 'Action'])
+    writer.write(['2', 'second'])
+    writer.close()
+
+    assert readRows(writer.logFile()) == [['Time', 'Action'], ['1', 'first'], ['2', 'second']]
+
+
+def test_monthly_rotation(tmp_path, monkeypatch):
+    writer = LogWriter(str(tmp_path), 'alerts', ['Alert'])
+    month = ['2024_01']
+    monkeypatch.setattr(writer, 'month', lambda: month[0])
+
+    writer.write(['january'])
+    writer.flush()
+    month[0] = '2024_02'
+    writer.write(['february'])
+    writer.close()
+
+    assert readRows(writer.logFile('2024_01')) == [['Alert'], ['january']]
+    assert readRows(writer.logFile('2024_02')) == [['Alert'], ['february']]
+
+
+def test_full_queue_drops_rows(tmp_path):
+    writer = LogWriter(str(tmp_path), 'alerts', ['Alert'], max_queue_size=1)
+    writer.close()
+
+    writer.write(['kept'])
+    writer.write(['dropped'])
+    assert writer.droppedRows() == 1
+
+
+def test_dropped_rows_reported(tmp_path, monkeypatch):
+    writer = LogWriter(str(tmp_path), 'alerts', ['Alert'], max_queue_size=1, report_period_s=3600)
+    reports = []
+    writer.setDroppedCallback(lambda prefix, dropped_rows: reports.append((prefix, dropped_rows)))
+    writer.close()
+
+    writer.write(['kept'])
+    writer.write(['dropped'])
+    writer.write(['dropped'])
+    assert reports == [('alerts', 1)] #Once per report period
+
+    writer._report_period_s = 0
+    writer.write(['dropped'])
+    assert reports == [('alerts', 1), ('alerts', 3)]
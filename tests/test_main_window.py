@@ -0,0 +1,92 @@
+import json
+import subprocess
+import sys
+import pytest
+from PyQt5 import QtCore
+from opentoolcontroller.main import Window, LazyDockWidget
+from opentoolcontroller.strings import typ
+
+
+@pytest.fixture
+def tool_dir(tmp_path):
+    #Keeps the saved dock layout of a real session from changing which dock is shown
+    QtCore.QSettings.setPath(QtCore.QSettings.NativeFormat, QtCore.QSettings.UserScope, str(tmp_path / 'settings'))
+
+    tool = {"type_info": typ.TOOL_NODE, "name": "Tool", "children": [
+        {"type_info": typ.SYSTEM_NODE, "name": "chamber", "children": [
+            {"type_info": typ.DEVICE_NODE, "name": "valve", "children": [
+                {"type_info": typ.D_IN_NODE, "name": "open_sensor"},
+            ]},
+        ]},
+    ]}
+    auth = {"users": {"user": {"password_hash": "04f8996da763b7a969b1028ee3007569eaf3a635486ddab211d512c85b9df8fb",
+                               "run_behaviors": True, "edit_behavior": False, "edit_tool": False,
+                               "clear_alerts": False, "edit_users": False, "timeout_minutes": 10}},
+            "password_policy": {"min_length": 8, "require_special_chars": True, "require_numbers": True,
+                                "session_timeout_minutes": 30}}
+
+    with open(tmp_path / 'tool_config.json', 'w') as f:
+        json.dump(tool, f)
+    with open(tmp_path / 'auth_config.json', 'w') as f:
+        json.dump(auth, f)
+    return tmp_path
+
+
+def window(qtbot, tool_dir, **kwargs):
+    window = Window(str(tool_dir), **kwargs)
+    qtbot.addWidget(window)
+    window.show()
+    qtbot.waitExposed(window)
+    return window
+
+
+def dock(window, object_name):
+    return [d for d in window.docks() if d.objectName() == object_name][0]
+
+
+def test_dock_built_when_first_shown(qtbot, tool_dir):
+    win = window(qtbot, tool_dir)
+    alerts = dock(win, 'alerts')
+    assert isinstance(alerts, LazyDockWidget)
+    assert not alerts.isBuilt()
+    assert alerts.widget() is None
+    assert win._alert_view is None
+
+    alerts.raise_()
+    qtbot.waitUntil(alerts.isBuilt)
+    assert alerts.widget() is win._alert_view
+
+
+def test_privileges_applied_to_dock_built_after_login(qtbot, tool_dir):
+    win = window(qtbot, tool_dir)
+    assert win._login_model.login('user', 'user')
+
+    dock(win, 'editor').raise_()
+    dock(win, 'alerts').raise_()
+    qtbot.waitUntil(lambda: win._tool_editor is not None and win._alert_view is not None)
+    assert not win._tool_editor._node_editor.isEnabled()
+    assert not win._alert_view._clear_btn.isEnabled()
+
+
+def test_operator_mode_has_no_editors(qtbot, tool_dir):
+    win = window(qtbot, tool_dir, editors=False)
+    names = [d.objectName() for d in win.docks()]
+    assert 'editor' not in names
+    assert 'recipe_editor' not in names
+
+    for d in win.docks():
+        d.raise_()
+    qtbot.wait(10)
+    assert win._tool_editor is None
+    assert win._recipe_editor is None
+
+
+#Operator panels never build the editors so importing main shouldn't load them
+def test_editors_not_imported_with_main():
+    code = 'import sys, opentoolcontroller.main; print(" ".join(sys.modules))'
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    modules = result.stdout.split()
+
+    assert 'opentoolcontroller.tool_control_view' in modules
+    assert 'opentoolcontroller.tool_editor' not in modules
+    assert 'opentoolcontroller.recipe_editor' not in modules
@@ -0,0 +1,77 @@
+import pytest
+from opentoolcontroller.tool_model import ToolModel
+from opentoolcontroller.views.widgets.node_control_view import NodeControlView, ManualBoolView, ManualFloatView
+from opentoolcontroller.strings import col, typ
+
+
+@pytest.fixture
+def view(qtbot):
+    def device(name):
+        return {"type_info": typ.DEVICE_NODE, "name": name, "children": [
+            {"type_info": typ.D_IN_NODE, "name": name + "_open"},
+            {"type_info": typ.A_IN_NODE, "name": name + "_pressure",
+             "calibrationTableData": [["hal_value", "gui_value"], [0.0, 0.0], [10.0, 1000.0]]},
+        ]}
+
+    model = ToolModel()
+    model.loadJSON({"type_info": typ.TOOL_NODE, "name": "Tool", "children": [
+        {"type_info": typ.SYSTEM_NODE, "name": "chamber", "children": [device("valve_a"), device("valve_b")]},
+    ]})
+
+    view = NodeControlView()
+    view.setModel(model)
+    qtbot.addWidget(view)
+    return view
+
+
+def ioViews(view):
+    layout = view.ui_io_views
+    return [layout.itemAt(i).widget() for i in range(layout.count())]
+
+
+def test_views_reused_between_devices(view):
+    model = view.model()
+    valve_a, valve_b = model.indexesOfType(typ.DEVICE_NODE)
+
+    view.setSelection(valve_a)
+    wids_a = ioViews(view)
+    assert [type(w) for w in wids_a] == [ManualBoolView, ManualFloatView]
+    assert wids_a[0].ui_name.text() == 'valve_a_open'
+
+    view.setSelection(valve_b)
+    wids_b = ioViews(view)
+    assert set(map(id, wids_b)) == set(map(id, wids_a))
+    assert wids_b[0].ui_name.text() == 'valve_b_open'
+    assert wids_b[0].io_index.data() == 'valve_b_open'
+
+    #Only the shown device's views follow the model
+    view.show()
+    pressure_a = model.indexesOfType(typ.A_IN_NODE, valve_a)[0]
+    pressure_b = model.indexesOfType(typ.A_IN_NODE, valve_b)[0]
+    model.setData(pressure_a.siblingAtColumn(col.HAL_VALUE), 5.0)
+    view.refreshValues()
+    assert wids_b[1].val == 0.0
+    model.setData(pressure_b.siblingAtColumn(col.HAL_VALUE), 2.5)
+    view.refreshValues()
+    assert wids_b[1].val == 250.0
+
+
+def test_values_refreshed_only_while_shown(view, qtbot):
+    model = view.model()
+    valve_a = model.indexesOfType(typ.DEVICE_NODE)[0]
+    pressure = model.indexesOfType(typ.A_IN_NODE, valve_a)[0].siblingAtColumn(col.HAL_VALUE)
+    view.setSelection(valve_a)
+    wid = ioViews(view)[1]
+
+    view.show()
+    model.setData(pressure, 5.0)
+    assert wid.val == 0.0 #Waits for the refresh timer
+    qtbot.waitUntil(lambda: wid.val == 500.0)
+
+    view.hide()
+    model.setData(pressure, 2.5)
+    qtbot.wait(100)
+    assert wid.val == 500.0
+
+    view.show()
+    assert wid.val == 250.0
@@ -0,0 +1,44 @@
+import os
+import shutil
+from PyQt5 import QtCore
+from opentoolcontroller.views.widgets.svg_cache import SvgCache
+from opentoolcontroller.views.widgets.device_icon_widget import DeviceIconWidget
+
+
+def test_renderer_shared_until_file_changes(qtbot, tmp_path):
+    path = str(tmp_path / 'valve.svg')
+    shutil.copy('opentoolcontroller/resources/icons/valves/valve.svg', path)
+    cache = SvgCache()
+
+    renderer = cache.renderer(path)
+    assert renderer.isValid()
+    assert cache.renderer(path) is renderer
+
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    assert cache.renderer(path) is not renderer
+
+
+def test_element_bounds(qtbot):
+    path = 'opentoolcontroller/resources/icons/general/unknown.svg'
+    cache = SvgCache()
+    renderer = cache.renderer(path)
+
+    bounds = cache.elementBounds(path, '1')
+    assert bounds.topLeft() == QtCore.QPointF(0, 0)
+    assert bounds.size() == renderer.boundsOnElement('1').size()
+    assert cache.elementBounds(path, '1') is bounds
+
+    assert cache.elementBounds(path, '').size() == QtCore.QSizeF(renderer.defaultSize())
+    assert cache.elementBounds(path, 'missing').isEmpty()
+
+
+def test_icons_share_renderer(qtbot):
+    path = 'opentoolcontroller/resources/icons/general/unknown.svg'
+    icons = [DeviceIconWidget() for i in range(3)]
+    for icon in icons:
+        icon.setSvg(path)
+        icon.setElementId('2')
+
+    assert icons[0].renderer() is icons[1].renderer() is icons[2].renderer()
+    assert icons[0].boundingRect().size() == icons[0].renderer().boundsOnElement('2').size()
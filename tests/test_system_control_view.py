@@ -0,0 +1,122 @@
+import pytest
+from PyQt5 import QtCore
+from opentoolcontroller.tool_model import ToolModel
+from opentoolcontroller.views.widgets.system_control_view import SystemControlView
+from opentoolcontroller.strings import col, typ
+
+
+@pytest.fixture
+def tool_json():
+    def system(name):
+        return {
+            "type_info": typ.SYSTEM_NODE,
+            "name": name,
+            "children": [
+                {"type_info": typ.DEVICE_NODE, "name": "valve_%d" % i, "children": [
+                    {"type_info": typ.DEVICE_ICON_NODE, "name": "Icon", "svg": "opentoolcontroller/resources/icons/valves/valve.svg"},
+                ]} for i in range(3)
+            ]
+        }
+
+    return {"type_info": typ.TOOL_NODE, "name": "Tool", "children": [system("chamber_a"), system("chamber_b")]}
+
+
+@pytest.fixture
+def view(qtbot, tool_json):
+    model = ToolModel()
+    model.loadJSON(tool_json)
+    view = SystemControlView()
+    view.setModel(model)
+    qtbot.addWidget(view)
+    return view
+
+
+def test_scene_kept_per_system(view):
+    model = view.model()
+    chamber_a, chamber_b = model.indexesOfType(typ.SYSTEM_NODE)
+
+    view.setSelection(chamber_a)
+    scene_a = view._view.scene()
+    icon = scene_a.deviceIcons()[0]
+    assert len(scene_a.deviceIcons()) == 3
+
+    view.setSelection(chamber_b)
+    assert view._view.scene() is not scene_a
+
+    view.setSelection(chamber_a)
+    assert view._view.scene() is scene_a
+    assert scene_a.deviceIcons()[0] is icon
+
+    view.setMovableIcons(True)
+    assert view._view.scene() is scene_a
+    assert icon.movable()
+
+
+def test_changes_reach_hidden_scene(view):
+    model = view.model()
+    chamber_a, chamber_b = model.indexesOfType(typ.SYSTEM_NODE)
+
+    view.setSelection(chamber_a)
+    scene_a = view._view.scene()
+    view.setSelection(chamber_b)
+
+    icon_index = model.indexesOfType(typ.DEVICE_ICON_NODE, chamber_a)[1]
+    model.setData(icon_index.siblingAtColumn(col.X), 123.0)
+    view.applyIconChanges()
+    assert scene_a.deviceIcons()[1].pos().x() == 123.0
+
+
+def test_icon_changes_batched(qtbot, view):
+    model = view.model()
+    chamber_a = model.indexesOfType(typ.SYSTEM_NODE)[0]
+    view.setSelection(chamber_a)
+
+    icon_index = model.indexesOfType(typ.DEVICE_ICON_NODE, chamber_a)[0]
+    icon = view._view.scene().deviceIcons()[0]
+    first_layer = icon.elementId()
+    layers = icon_index.internalPointer().layers()
+
+    for layer in layers + layers:
+        model.setData(icon_index.siblingAtColumn(col.LAYER), layer)
+    assert icon.elementId() == first_layer
+
+    qtbot.waitUntil(lambda: icon.elementId() == layers[-1])
+
+
+def test_removed_device_rebuilds_scene(view):
+    model = view.model()
+    chamber_a = model.indexesOfType(typ.SYSTEM_NODE)[0]
+
+    view.setSelection(chamber_a)
+    scene_a = view._view.scene()
+
+    model.removeRows(0, 1, chamber_a)
+    assert view._view.scene() is not scene_a
+    assert len(view._view.scene().deviceIcons()) == 2
+
+
+def test_items_found_by_node(qtbot):
+    icon = {"type_info": typ.DEVICE_ICON_NODE, "name": "Icon"}
+    model = ToolModel()
+    model.loadJSON({"type_info": typ.TOOL_NODE, "name": "Tool", "children": [
+        {"type_info": typ.SYSTEM_NODE, "name": "chamber", "children": [
+            {"type_info": typ.BOOL_VAR_NODE, "name": "is_pumped"},
+            {"type_info": typ.DEVICE_NODE, "name": "gauge", "children": [{"type_info": typ.FLOAT_VAR_NODE, "name": "pressure"}]},
+            {"type_info": typ.DEVICE_NODE, "name": "valve", "children": [dict(icon)]},
+        ]},
+    ]})
+    view = SystemControlView()
+    view.setModel(model)
+    qtbot.addWidget(view)
+
+    chamber = model.indexesOfType(typ.SYSTEM_NODE)[0]
+    valve = model.indexesOfType(typ.DEVICE_NODE, chamber)[1]
+    view.setSelection(valve)
+    wid = view._view.scene().deviceIcons()[0]
+    assert wid._selected
+
+    icon_index = model.indexesOfType(typ.DEVICE_ICON_NODE, chamber)[0]
+    model.setData(icon_index.siblingAtColumn(col.Y), 55.0)
+    model.setData(model.indexesOfType(typ.BOOL_VAR_NODE, chamber)[0].siblingAtColumn(col.VALUE), True)
+    view.applyIconChanges()
+    assert wid.pos().y() == 55.0
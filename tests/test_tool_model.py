@@ -0,0 +1,271 @@
+import pytest
+import json
+from PyQt5 import QtCore, QtWidgets
+from opentoolcontroller.tool_model import ToolModel, LeafFilterProxyModel
+from opentoolcontroller.bt_model import BTModel, TickRecorder
+from opentoolcontroller.strings import col, typ
+
+
+@pytest.fixture
+def tool_json():
+    return {
+        "type_info": typ.TOOL_NODE,
+        "name": "Tool",
+        "children": [
+            {
+                "type_info": typ.SYSTEM_NODE,
+                "name": "chamber",
+                "children": [
+                    {
+                        "type_info": typ.DEVICE_NODE,
+                        "name": "valve",
+                        "children": [
+                            {"type_info": typ.DEVICE_ICON_NODE, "name": "Icon"},
+                            {"type_info": typ.D_IN_NODE, "name": "open_sensor"},
+                            {"type_info": typ.D_OUT_NODE, "name": "open_valve"},
+                            {"type_info": typ.A_IN_NODE, "name": "pressure",
+                             "calibrationTableData": [["hal_value", "gui_value"], [0.0, 0.0], [10.0, 1000.0]]},
+                            {"type_info": typ.FLOAT_VAR_NODE, "name": "setpoint", "min": 0.0, "max": 10.0},
+                        ]
+                    },
+                    {"type_info": typ.BOOL_VAR_NODE, "name": "is_pumped"},
+                ]
+            },
+            {"type_info": typ.INT_VAR_NODE, "name": "wafer_count"},
+        ]
+    }
+
+
+@pytest.fixture
+def behavior_json():
+    return {
+        "type_info": typ.ROOT_SEQUENCE_NODE,
+        "name": "open",
+        "children": [
+            {"type_info": typ.WAIT_TIME_NODE, "wait_time": 1.5, "pos": [10.0, 20.0]},
+            {"type_info": typ.SEQUENCE_NODE, "pos": [30.0, 20.0], "children": [
+                {"type_info": typ.SUCCESS_NODE, "pos": [40.0, 80.0]},
+            ]},
+        ]
+    }
+
+
+class TestToolModelLoad:
+    def test_load_builds_tree(self, qtbot, tool_json):
+        model = ToolModel()
+        assert model.loadJSON(tool_json)
+
+        assert [i.internalPointer().name for i in model.indexesOfType(typ.DEVICE_NODE)] == ['valve']
+        assert len(model.indexesOfTypes(typ.HAL_NODES)) == 3
+        device = model.indexesOfType(typ.DEVICE_NODE)[0].internalPointer()
+        assert device.parent().name == 'chamber'
+        assert device.child(4).max == 10.0
+
+    def test_load_is_single_reset(self, qtbot, tool_json):
+        model = ToolModel()
+        inserted = []
+        resets = []
+        model.rowsInserted.connect(lambda *args: inserted.append(args))
+        model.modelReset.connect(lambda: resets.append(True))
+
+        model.loadJSON(tool_json)
+
+        assert inserted == []
+        assert len(resets) == 1
+
+    def test_load_round_trip(self, qtbot, tool_json):
+        model = ToolModel()
+        model.loadJSON(tool_json)
+
+        reloaded = ToolModel()
+        reloaded.loadJSON(json.loads(model.asJSON()))
+        assert json.loads(reloaded.asJSON()) == json.loads(model.asJSON())
+
+
+class TestBTModelLoad:
+    def test_load_builds_tree(self, qtbot, behavior_json):
+        model = BTModel()
+        inserted = []
+        model.rowsInserted.connect(lambda *args: inserted.append(args))
+
+        assert model.loadJSON(behavior_json)
+        assert inserted == []
+        assert model.name() == 'open'
+
+        sequence = model.indexesOfType(typ.SEQUENCE_NODE)[0].internalPointer()
+        assert sequence.child(0).typeInfo() == typ.SUCCESS_NODE
+        assert sequence.child(0).rootNode() is model.rootIndex().internalPointer()
+        assert model.indexesOfType(typ.WAIT_TIME_NODE)[0].internalPointer().wait_time == 1.5
+
+    def test_indexes_by_type(self, qtbot, behavior_json):
+        model = BTModel()
+        model.loadJSON(behavior_json)
+
+        indexes = model.indexesByType()
+        assert set(indexes) == {typ.WAIT_TIME_NODE, typ.SEQUENCE_NODE, typ.SUCCESS_NODE}
+        for index_type, type_indexes in indexes.items():
+            assert type_indexes == model.indexesOfType(index_type)
+
+        sequence_index = indexes[typ.SEQUENCE_NODE][0]
+        assert model.indexesOfType(typ.SUCCESS_NODE, sequence_index) == indexes[typ.SUCCESS_NODE]
+        assert model.indexesOfType(typ.WAIT_TIME_NODE, sequence_index) == []
+        assert model.parent(indexes[typ.SUCCESS_NODE][0]) == sequence_index
+
+    def test_load_round_trip(self, qtbot, behavior_json):
+        model = BTModel()
+        model.loadJSON(behavior_json)
+
+        reloaded = BTModel()
+        reloaded.loadJSON(json.loads(model.asJSON()))
+        assert json.loads(reloaded.asJSON()) == json.loads(model.asJSON())
+
+    def test_sort_children_by_x_pos(self, qtbot, behavior_json):
+        model = BTModel()
+        model.loadJSON(behavior_json)
+        root_index = model.rootIndex()
+        wait_index = model.indexesOfType(typ.WAIT_TIME_NODE)[0]
+        wait_p_index = QtCore.QPersistentModelIndex(wait_index)
+
+        signals = []
+        model.layoutChanged.connect(lambda *args: signals.append('layout'))
+        model.rowsMoved.connect(lambda *args: signals.append('moved'))
+
+        model.setData(wait_index.siblingAtColumn(col.POS), (50.0, 20.0))
+        types = [child.typeInfo() for child in root_index.internalPointer().children()]
+        assert types == [typ.SEQUENCE_NODE, typ.WAIT_TIME_NODE]
+        assert signals == ['layout']
+        assert wait_p_index.row() == 1
+        assert QtCore.QModelIndex(wait_p_index).internalPointer().typeInfo() == typ.WAIT_TIME_NODE
+
+        #Already in order
+        model.setData(QtCore.QModelIndex(wait_p_index).siblingAtColumn(col.POS), (60.0, 20.0))
+        assert signals == ['layout']
+
+
+class TestToolModelPathIndex:
+    def test_index_of_path(self, qtbot, tool_json):
+        model = ToolModel()
+        model.loadJSON(tool_json)
+
+        index = model.indexOfPath('chamber.valve.pressure')
+        assert index.internalPointer().typeInfo() == typ.A_IN_NODE
+        assert model.nodePath(index) == 'chamber.valve.pressure'
+        assert model.indexOfPath('chamber.valve.missing') is None
+
+        device_index = model.indexOfPath('chamber.valve')
+        assert model.childIndexByName(device_index, 'setpoint').internalPointer().max == 10.0
+
+    def test_rename_insert_remove(self, qtbot, tool_json):
+        model = ToolModel()
+        model.loadJSON(tool_json)
+        device_index = model.indexOfPath('chamber.valve')
+
+        model.setData(device_index.siblingAtColumn(col.NAME), 'gate')
+        assert model.indexOfPath('chamber.valve') is None
+        device_index = model.indexOfPath('chamber.gate')
+
+        new_index = model.insertChild(device_index, typ.BOOL_VAR_NODE)
+        new_name = new_index.internalPointer().name
+        assert model.indexOfPath('chamber.gate.' + new_name).internalPointer() is new_index.internalPointer()
+
+        model.removeRows(new_index.row(), 1, device_index)
+        assert model.indexOfPath('chamber.gate.' + new_name) is None
+
+
+class TestLeafFilterProxyModel:
+    def proxyNames(self, proxy, parent=QtCore.QModelIndex()):
+        names = []
+        for row in range(proxy.rowCount(parent)):
+            index = proxy.index(row, 0, parent)
+            names += [index.data()] + self.proxyNames(proxy, index)
+        return names
+
+    def test_filter_cache(self, qtbot, tool_json):
+        model = ToolModel()
+        model.loadJSON(tool_json)
+        proxy = LeafFilterProxyModel()
+        proxy.setSourceModel(model)
+        proxy.setDynamicSortFilter(True)
+        proxy.setFilterCaseSensitivity(QtCore.Qt.CaseInsensitive)
+
+        #Ancestors and descendants of a match are kept
+        proxy.setFilterRegExp('VALVE')
+        assert self.proxyNames(proxy) == ['Tool', 'chamber', 'valve', 'Icon', 'open_sensor', 'open_valve', 'pressure', 'setpoint']
+
+        #Value changes keep the cached results, a name edit refilters
+        pressure_index = model.indexOfPath('chamber.valve.pressure')
+        model.setData(pressure_index.siblingAtColumn(col.HAL_VALUE), 5.0)
+        assert proxy._matches
+
+        proxy.setFilterRegExp('sensor')
+        assert self.proxyNames(proxy) == ['Tool', 'chamber', 'valve', 'open_sensor']
+
+        model.setData(model.indexOfPath('chamber.valve.open_sensor'), 'open_switch')
+        model.setData(model.indexOfPath('chamber.is_pumped'), 'pump_sensor')
+        names = self.proxyNames(proxy)
+        assert 'pump_sensor' in names and 'open_switch' not in names
+
+        proxy.setFilterRegExp('wafer')
+        assert self.proxyNames(proxy) == ['Tool', 'wafer_count']
+
+
+class TestBehaviorToolSync:
+    def test_edit_only_resyncs_leaves_that_use_it(self, qtbot, tool_json, behavior_json):
+        model = ToolModel()
+        model.loadJSON(tool_json)
+        device_index = model.indexOfPath('chamber.valve')
+
+        behavior_json['children'].append({"type_info": typ.SET_NODE, "pos": [50.0, 20.0]})
+        behavior_json['children'].append({"type_info": typ.TOLERANCE_NODE, "pos": [60.0, 20.0]})
+        bt_model = BTModel()
+        bt_model.loadJSON(behavior_json)
+        bt_model.setToolModel(model)
+        bt_model.setToolIndex(device_index)
+        bt_model.syncToTool()
+        device_index.internalPointer().setBehaviors([bt_model])
+
+        set_node = bt_model.indexesOfType(typ.SET_NODE)[0].internalPointer()
+        tolerance_node = bt_model.indexesOfType(typ.TOLERANCE_NODE)[0].internalPointer()
+        assert sorted(c.setName for c in set_node.children()) == ['open_valve', 'setpoint']
+        tolerance_children = len(tolerance_node.children())
+
+        new_index = model.insertChild(device_index, typ.D_OUT_NODE)
+        new_name = new_index.internalPointer().name
+        assert sorted(c.setName for c in set_node.children()) == sorted(['open_valve', 'setpoint', new_name])
+        assert len(tolerance_node.children()) == tolerance_children
+
+        model.removeRows(new_index.row(), 1, device_index)
+        assert sorted(c.setName for c in set_node.children()) == ['open_valve', 'setpoint']
+
+
+class TestAnalogCalibration:
+    def test_calibration_model_is_lazy(self, qtbot, tool_json):
+        model = ToolModel()
+        model.loadJSON(tool_json)
+        node = model.indexOfPath('chamber.valve.pressure').internalPointer()
+
+        assert node._calibration_table_model is None
+        assert node.halToDisplay(5.0) == 500.0
+
+        table = node.data(col.CALIBRATION_TABLE_MODEL)
+        assert table.dataArray() == [["hal_value", "gui_value"], [0.0, 0.0], [10.0, 1000.0]]
+
+        table.setData(table.index(1, 1), 2000.0)
+        assert node.halToDisplay(5.0) == 1000.0
+        assert node.calibrationTableData[2] == [10.0, 2000.0]
+
+
+class TestTickRecorder:
+    def test_percentiles(self):
+        recorder = TickRecorder()
+        for i in range(1, 1001):
+            recorder.record(i * 10.0) #10us to 10ms
+
+        assert recorder.count() == 1000
+        assert recorder.maxUS() == 10000.0
+        assert abs(recorder.percentileUS(50) - 5000) / 5000 < 0.07
+        assert abs(recorder.percentileUS(99) - 9900) / 9900 < 0.07
+        assert recorder.percentileUS(100) == 10000.0
+
+        recorder.reset()
+        assert recorder.percentileUS(50) == 0.0
@@ -0,0 +1,30 @@
+import numpy as np
+from opentoolcontroller.historian import Historian
+from opentoolcontroller.views.widgets.trend_view import TrendPlot
+
+
+def test_columns_keep_min_max(qtbot, tmp_path):
+    historian = Historian(str(tmp_path / 'history'))
+    group = historian.addGroup(['chamber.gauge'])
+    for i in range(1000):
+        group.append(1000.0 + i*0.01, [100.0 if i == 500 else 1.0])
+
+    plot = TrendPlot(historian)
+    qtbot.addWidget(plot)
+    plot._timer.stop()
+    plot.resize(100, 50)
+    plot.show()
+    plot.setSpanS(10)
+    plot.addTrace('chamber.gauge')
+    plot.refresh(now=1009.995)
+
+    name, label, color, mins, maxs, polygon = plot._traces[0]
+    assert np.nanmax(maxs) == 100.0 #the single sample spike survives decimation
+    assert np.nanmin(mins) == 1.0
+    assert polygon.size() == 2 * np.count_nonzero(~np.isnan(mins))
+
+    #Moving on a column only adds the new samples
+    group.append(1010.05, [5.0])
+    plot.refresh(now=1010.05)
+    assert plot._traces[0][4][-1] == 5.0
+    historian.close()
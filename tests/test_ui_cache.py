@@ -0,0 +1,30 @@
+import shutil
+from unittest.mock import patch
+from PyQt5 import QtWidgets
+from opentoolcontroller import ui_cache
+from opentoolcontroller.ui_cache import loadUiType
+
+
+def test_compiled_once(qtbot, tmp_path):
+    ui_file = str(tmp_path / 'Login.ui')
+    shutil.copy('opentoolcontroller/views/Login.ui', ui_file)
+
+    form, base = loadUiType(ui_file)
+    assert issubclass(base, QtWidgets.QWidget)
+
+    widget = base()
+    qtbot.addWidget(widget)
+    form().setupUi(widget)
+
+    with patch.object(ui_cache.compiler, 'UICompiler') as compiler:
+        cached_form, cached_base = loadUiType(ui_file)
+    assert compiler.call_count == 0
+    assert cached_base is base
+    assert cached_form.__name__ == form.__name__
+
+    #A changed .ui file is compiled again
+    with open(ui_file, 'a') as f:
+        f.write('\n')
+    with patch.object(ui_cache.compiler, 'UICompiler', wraps=ui_cache.compiler.UICompiler) as compiler:
+        loadUiType(ui_file)
+    assert compiler.call_count == 1